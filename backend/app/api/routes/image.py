@@ -6,7 +6,9 @@ from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
 
 from app.schemas.responses import ImageAnalysisResult, ImageAnalysisDetails, ErrorResponse
 from app.models.image_analyzer import get_image_analyzer
-from app.utils.file_handler import save_upload, delete_file
+from app.utils.file_handler import spool_upload
+from app.utils.cache import get_result_cache, make_cache_key
+from app.utils.cascade import Cascade
 from app.utils.explainer import explain_image_analysis, get_verdict
 
 
@@ -34,17 +36,25 @@ async def analyze_image(
     - AI-generated image
     - Manipulated/edited image
     """
-    file_path = None
+    upload = None
     
     try:
-        # Save uploaded file
-        file_path, file_id = await save_upload(file, "image")
+        # Buffer and hash the upload; repeats are served from the cache
+        cascade = Cascade("image")
+        upload = await spool_upload(file, "image")
+        cache = get_result_cache()
+        cache_key = make_cache_key("image", upload.digest)
+        cached = await cache.get(cache_key) if cascade.enabled("cache") else None
+        if cached is not None:
+            cascade.record("cache")
+            upload.discard()
+            return ImageAnalysisResult(**cached)
         
         # Get analyzer
         analyzer = get_image_analyzer()
         
-        # Run analysis
-        result = analyzer.analyze(file_path)
+        # Run analysis (small uploads are decoded straight from memory)
+        result = await analyzer.analyze_async(upload.source)
         
         # Generate explanations
         risk_score, explanations, action = explain_image_analysis(
@@ -54,15 +64,16 @@ async def analyze_image(
         )
         
         # Schedule file cleanup
-        background_tasks.add_task(delete_file, file_path)
+        background_tasks.add_task(upload.discard)
         
         # Build response
-        return ImageAnalysisResult(
+        response = ImageAnalysisResult(
             risk_score=risk_score,
             verdict=get_verdict(risk_score),
             explanations=explanations,
             action=action,
             content_type="image",
+            degraded=result.get("degraded", False),
             details=ImageAnalysisDetails(
                 real_probability=result["real_probability"],
                 ai_generated=result["ai_generated"],
@@ -70,13 +81,19 @@ async def analyze_image(
             )
         )
         
+        # Only cache real verdicts, not error fallbacks
+        if not result.get("failed"):
+            await cache.set(cache_key, response.model_dump(mode="json"))
+        
+        return response
+        
     except HTTPException:
-        if file_path:
-            delete_file(file_path)
+        if upload:
+            upload.discard()
         raise
     except Exception as e:
-        if file_path:
-            delete_file(file_path)
+        if upload:
+            upload.discard()
         raise HTTPException(
             status_code=500,
             detail=f"Analysis failed: {str(e)}"
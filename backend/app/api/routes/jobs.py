@@ -0,0 +1,135 @@
+"""
+Sentinel AI - Job Status Routes
+GET /jobs/{job_id} endpoints for analyses queued with mode=async
+"""
+import asyncio
+import json
+import time
+
+from celery.result import AsyncResult
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.schemas.responses import JobStatusResponse
+from app.workers.celery_app import celery_app
+from app.workers.job_registry import JobNotFound, job_error, job_exists
+from app.utils.executor import run_blocking
+from app.config import settings
+
+
+router = APIRouter()
+
+# Celery states mapped onto the public job statuses
+STATUS_MAP = {
+    "PENDING": "queued",
+    "RECEIVED": "queued",
+    "STARTED": "running",
+    "RETRY": "running",
+    "SUCCESS": "completed",
+    "FAILURE": "failed",
+    "REVOKED": "failed"
+}
+
+TERMINAL_STATUSES = {"completed", "failed"}
+
+
+def get_job_status(job_id: str) -> JobStatusResponse:
+    """
+    Read a job's state from the Celery result backend.
+    
+    Celery reports unknown IDs as PENDING too, so a pending job must also
+    be in the job registry. Jobs that gave up after their retries are
+    reported as failed from the registry until their record expires.
+    
+    Raises:
+        JobNotFound: If the id was never submitted or has expired
+    """
+    job = AsyncResult(job_id, app=celery_app)
+    if job.state == "PENDING" and not job_exists(job_id):
+        raise JobNotFound(job_id)
+    status = STATUS_MAP.get(job.state, "queued")
+    
+    if status not in TERMINAL_STATUSES:
+        error = job_error(job_id)
+        if error is not None:
+            return JobStatusResponse(job_id=job_id, status="failed", error=error)
+    
+    if status == "completed":
+        return JobStatusResponse(job_id=job_id, status=status, result=job.result)
+    if status == "failed":
+        return JobStatusResponse(job_id=job_id, status=status, error=str(job.result))
+    return JobStatusResponse(job_id=job_id, status=status)
+
+
+async def fetch_job_status(job_id: str) -> JobStatusResponse:
+    """Read a job's status without blocking the event loop; 404 for unknown ids."""
+    try:
+        return await run_blocking("celery", get_job_status, job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+
+async def wait_for_job(job_id: str, timeout: float) -> JobStatusResponse:
+    """Poll a job until it finishes or the timeout elapses."""
+    deadline = time.monotonic() + timeout
+    while True:
+        status = await fetch_job_status(job_id)
+        if status.status in TERMINAL_STATUSES or time.monotonic() >= deadline:
+            return status
+        await asyncio.sleep(settings.job_poll_interval_seconds)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Get analysis job status",
+    description="Returns the current status of a queued analysis, with the result once completed."
+)
+async def get_job(job_id: str):
+    """Fetch the current status of a job."""
+    return await fetch_job_status(job_id)
+
+
+@router.get(
+    "/{job_id}/wait",
+    response_model=JobStatusResponse,
+    summary="Long-poll an analysis job",
+    description="Blocks until the job completes or fails, or until the timeout elapses."
+)
+async def wait_job(
+    job_id: str,
+    timeout: float = Query(30, gt=0, description="Maximum seconds to wait")
+):
+    """Wait for a job to finish and return its status."""
+    timeout = min(timeout, settings.job_wait_max_seconds)
+    return await wait_for_job(job_id, timeout)
+
+
+@router.get(
+    "/{job_id}/events",
+    summary="Stream analysis job status",
+    description="Server-Sent Events stream that emits a status event on every change until the job finishes."
+)
+async def job_events(job_id: str):
+    """Stream job status changes as Server-Sent Events."""
+    # Unknown ids get a 404 before the stream starts
+    first = await fetch_job_status(job_id)
+    
+    async def event_stream():
+        deadline = time.monotonic() + settings.job_wait_max_seconds
+        last_status = None
+        status = first
+        while True:
+            if status.status != last_status:
+                last_status = status.status
+                yield f"event: status\ndata: {json.dumps(status.model_dump(mode='json'))}\n\n"
+            if status.status in TERMINAL_STATUSES or time.monotonic() >= deadline:
+                return
+            await asyncio.sleep(settings.job_poll_interval_seconds)
+            status = await fetch_job_status(job_id)
+            
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
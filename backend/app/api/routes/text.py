@@ -1,22 +1,76 @@
 """
 Sentinel AI - Text Analysis Route
-POST /analyze/text endpoint
+POST /analyze/text and POST /analyze/text/batch endpoints
 """
+from typing import Dict, Optional, Tuple
+
 from fastapi import APIRouter, HTTPException
 
 from app.schemas.responses import (
     TextAnalysisRequest,
     TextAnalysisResult,
-    TextAnalysisDetails,
+    TextBatchRequest,
+    TextBatchResult,
     ErrorResponse
 )
 from app.models.text_analyzer import get_text_analyzer
-from app.utils.explainer import explain_text_analysis, get_verdict
+from app.utils.explainer import build_text_result
+from app.utils.cache import get_result_cache, make_cache_key, hash_text
+from app.utils.cascade import Cascade
+from app.utils.similarity import get_text_index, simhash
+from app.config import settings
 
 
 router = APIRouter()
 
 
+async def lookup_known_text(text: str, cascade: Cascade) -> Tuple[Optional[Dict], str, Optional[int]]:
+    """
+    Look a text up in the exact cache, then the near-duplicate index.
+    
+    Args:
+        text: Text to look up
+        cascade: The request's cascade; records the tier on a hit
+        
+    Returns:
+        Tuple of (cached_payload or None, cache_key, simhash fingerprint or None)
+    """
+    # Serve repeats of the same message straight from the cache
+    cache_key = make_cache_key("text", hash_text(text))
+    if cascade.enabled("cache"):
+        cached = await get_result_cache().get(cache_key)
+        if cached is not None:
+            cascade.record("cache")
+            return cached, cache_key, None
+            
+    # Near-duplicates of known messages (same campaign, different name
+    # or link) reuse the stored verdict as well
+    fingerprint = None
+    if (
+        settings.near_duplicate_enabled
+        and cascade.enabled("similar")
+        and len(text) >= settings.near_duplicate_min_chars
+    ):
+        fingerprint = simhash(text)
+        similar = get_text_index().lookup(fingerprint)
+        if similar is not None:
+            cascade.record("similar")
+            return similar, cache_key, fingerprint
+            
+    return None, cache_key, fingerprint
+
+
+async def remember_text(scores: Dict, result: TextAnalysisResult, cache_key: str, fingerprint: Optional[int]):
+    """Store a fresh verdict in the cache and near-duplicate index."""
+    # Only cache real verdicts, not error fallbacks
+    if scores.get("failed"):
+        return
+    payload = result.model_dump(mode="json")
+    await get_result_cache().set(cache_key, payload)
+    if fingerprint is not None:
+        get_text_index().add(fingerprint, payload)
+
+
 @router.post(
     "/text",
     response_model=TextAnalysisResult,
@@ -37,35 +91,80 @@ async def analyze_text(request: TextAnalysisRequest):
     - Impersonation attempts
     """
     try:
+        # Check cache and near-duplicate index
+        cascade = Cascade("text")
+        known, cache_key, fingerprint = await lookup_known_text(request.text, cascade)
+        if known is not None:
+            return TextAnalysisResult(**known)
+            
         # Get analyzer
         analyzer = get_text_analyzer()
         
         # Run analysis
-        scores = analyzer.analyze(request.text)
+        scores = await analyzer.analyze_async(request.text)
+        if not scores.get("failed"):
+            cascade.record(scores.get("tier", "remote"))
         
-        # Generate explanations
-        risk_score, explanations, action = explain_text_analysis(
-            ai_likelihood=scores["ai_likelihood"],
-            scam_intent=scores["scam_intent"],
-            urgency=scores["urgency"],
-            financial=scores["financial_request"],
-            impersonation=scores["impersonation"]
-        )
+        # Generate explanations and build response
+        result = build_text_result(scores)
+        
+        await remember_text(scores, result, cache_key, fingerprint)
+        
+        return result
         
-        # Build response
-        return TextAnalysisResult(
-            risk_score=risk_score,
-            verdict=get_verdict(risk_score),
-            explanations=explanations,
-            action=action,
-            content_type="text",
-            details=TextAnalysisDetails(
-                ai_likelihood=scores["ai_likelihood"],
-                scam_intent=scores["scam_intent"],
-                urgency_level=scores["urgency"],
-                financial_request=scores["financial_request"],
-                impersonation=scores["impersonation"]
-            )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Analysis failed: {str(e)}"
+        )
+
+
+@router.post(
+    "/text/batch",
+    response_model=TextBatchResult,
+    responses={
+        400: {"model": ErrorResponse},
+        500: {"model": ErrorResponse}
+    },
+    summary="Analyze many texts in one request",
+    description="Analyzes up to 100 texts. Duplicates are analyzed once and several texts are packed into each model request."
+)
+async def analyze_text_batch(request: TextBatchRequest):
+    """
+    Analyze a batch of texts. Results are returned in request order.
+    """
+    try:
+        # Dedupe on the normalized content hash
+        unique: Dict[str, str] = {}
+        for text in request.texts:
+            unique.setdefault(hash_text(text), text)
+            
+        results: Dict[str, TextAnalysisResult] = {}
+        pending = []
+        for digest, text in unique.items():
+            cascade = Cascade("text")
+            known, cache_key, fingerprint = await lookup_known_text(text, cascade)
+            if known is not None:
+                results[digest] = TextAnalysisResult(**known)
+            else:
+                pending.append((digest, text, cache_key, fingerprint, cascade))
+                
+        # Pack everything that missed into as few model requests as possible
+        # (texts with clear-cut scam signals are answered locally)
+        if pending:
+            analyzer = get_text_analyzer()
+            all_scores = await analyzer.analyze_batch_async([text for _, text, _, _, _ in pending])
+            
+            for (digest, _, cache_key, fingerprint, cascade), scores in zip(pending, all_scores):
+                if not scores.get("failed"):
+                    cascade.record(scores.get("tier", "remote"))
+                result = build_text_result(scores)
+                await remember_text(scores, result, cache_key, fingerprint)
+                results[digest] = result
+                
+        # Fan results back out to the original order
+        return TextBatchResult(
+            results=[results[hash_text(text)] for text in request.texts]
         )
         
     except Exception as e:
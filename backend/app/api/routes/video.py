@@ -2,12 +2,20 @@
 Sentinel AI - Video Analysis Route
 POST /analyze/video endpoint
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from typing import Literal, Union
 
-from app.schemas.responses import VideoAnalysisResult, VideoAnalysisDetails, ErrorResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Query, Response
+
+from app.schemas.responses import VideoAnalysisResult, JobSubmission, ErrorResponse
 from app.models.video_analyzer import get_video_analyzer
-from app.utils.file_handler import save_upload, delete_file
-from app.utils.explainer import explain_video_analysis, get_verdict
+from app.utils.file_handler import spool_upload, delete_file
+from app.utils.cache import get_result_cache, make_cache_key
+from app.utils.cascade import Cascade
+from app.utils.explainer import build_video_result
+from app.utils.executor import run_blocking
+from app.utils.media_probe import MediaTooLongError, enforce_duration
+from app.workers.job_registry import submit_job
+from app.workers.tasks import analyze_video_task
 from app.config import settings
 
 
@@ -16,8 +24,9 @@ router = APIRouter()
 
 @router.post(
     "/video",
-    response_model=VideoAnalysisResult,
+    response_model=Union[VideoAnalysisResult, JobSubmission],
     responses={
+        202: {"model": JobSubmission},
         400: {"model": ErrorResponse},
         413: {"model": ErrorResponse},
         500: {"model": ErrorResponse}
@@ -27,6 +36,11 @@ router = APIRouter()
 )
 async def analyze_video(
     background_tasks: BackgroundTasks,
+    response: Response,
+    mode: Literal["sync", "async"] = Query(
+        "sync",
+        description="'async' queues the analysis and returns a job ID immediately"
+    ),
     file: UploadFile = File(..., description="Video file (MP4, MOV, ≤8 seconds)")
 ):
     """
@@ -35,17 +49,43 @@ async def analyze_video(
     - Deepfake detection
     - Frame-by-frame analysis
     """
-    file_path = None
+    upload = None
     
     try:
-        # Save uploaded file
-        file_path, file_id = await save_upload(file, "video")
+        # Buffer and hash the upload; repeats are served from the cache
+        cascade = Cascade("video")
+        upload = await spool_upload(file, "video")
+        cache = get_result_cache()
+        cache_key = make_cache_key("video", upload.digest)
+        cached = await cache.get(cache_key) if cascade.enabled("cache") else None
+        if cached is not None:
+            cascade.record("cache")
+            upload.discard()
+            return VideoAnalysisResult(**cached)
+        
+        # Write to disk only now: the analyzer and Celery workers need a path
+        file_path = await upload.materialize()
+        
+        # Reject (or trim) over-long media from its header before any expensive stage
+        try:
+            probe = await run_blocking("default", enforce_duration, file_path, "video")
+        except MediaTooLongError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        upload.path = file_path = probe["path"]
+        if probe["trimmed_from"] is not None:
+            response.headers["X-Media-Trimmed-From"] = f"{probe['trimmed_from']:.2f}"
+        
+        # Hand off to the Celery pool; the worker explains and cleans up
+        if mode == "async":
+            job = await run_blocking("celery", submit_job, analyze_video_task, file_path)
+            response.status_code = 202
+            return JobSubmission(job_id=job.id, status_url=f"/jobs/{job.id}")
         
         # Get analyzer
         analyzer = get_video_analyzer()
         
         # Run analysis
-        result = analyzer.analyze(file_path)
+        result = await analyzer.analyze_async(file_path)
         
         # Check duration limit
         if result["duration_seconds"] > settings.max_video_duration_seconds:
@@ -54,37 +94,25 @@ async def analyze_video(
                 detail=f"Video too long. Maximum duration: {settings.max_video_duration_seconds} seconds"
             )
         
-        # Generate explanations
-        risk_score, explanations, action = explain_video_analysis(
-            real_probability=result["real_probability"],
-            deepfake_likelihood=result["deepfake_likelihood"]
-        )
-        
         # Schedule file cleanup
         background_tasks.add_task(delete_file, file_path)
         
-        # Build response
-        return VideoAnalysisResult(
-            risk_score=risk_score,
-            verdict=get_verdict(risk_score),
-            explanations=explanations,
-            action=action,
-            content_type="video",
-            details=VideoAnalysisDetails(
-                real_probability=result["real_probability"],
-                deepfake_likelihood=result["deepfake_likelihood"],
-                frames_analyzed=result["frames_analyzed"]
-            ),
-            duration_seconds=result["duration_seconds"]
-        )
+        # Generate explanations and build response
+        analysis_result = build_video_result(result)
+        
+        # Only cache real verdicts, not error fallbacks
+        if not result.get("failed"):
+            await cache.set(cache_key, analysis_result.model_dump(mode="json"))
+        
+        return analysis_result
         
     except HTTPException:
-        if file_path:
-            delete_file(file_path)
+        if upload:
+            upload.discard()
         raise
     except Exception as e:
-        if file_path:
-            delete_file(file_path)
+        if upload:
+            upload.discard()
         raise HTTPException(
             status_code=500,
             detail=f"Analysis failed: {str(e)}"
@@ -0,0 +1,39 @@
+"""
+Sentinel AI - Webhook Routes
+POST /webhooks/assemblyai completion callbacks for submitted transcripts
+"""
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
+
+from app.config import settings
+from app.utils.transcripts import WEBHOOK_AUTH_HEADER, get_transcript_tracker
+
+
+router = APIRouter()
+
+
+@router.post(
+    "/assemblyai",
+    summary="AssemblyAI transcript webhook",
+    description="Called by AssemblyAI when a submitted transcript completes or fails."
+)
+async def assemblyai_webhook(
+    request: Request,
+    secret: Optional[str] = Header(None, alias=WEBHOOK_AUTH_HEADER)
+):
+    """Complete the waiting audio analysis for a finished transcript."""
+    expected = settings.assemblyai_webhook_secret
+    if not expected or not hmac.compare_digest((secret or "").encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+        
+    try:
+        payload = await request.json()
+        transcript_id = str(payload["transcript_id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Expected JSON with a transcript_id")
+        
+    # The status is re-read from AssemblyAI, so a forged body cannot fake a result
+    await get_transcript_tracker().notify(transcript_id)
+    return {"received": True}
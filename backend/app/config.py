@@ -5,7 +5,7 @@ Loads environment variables and provides app-wide settings.
 import os
 from pathlib import Path
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -24,6 +24,7 @@ class Settings(BaseSettings):
     max_upload_size_mb: int = 50
     upload_dir: Path = Path("/tmp/uploads")
     file_retention_seconds: int = 300
+    upload_spool_threshold_mb: int = 8  # larger uploads spill to upload_dir
     
     # Application
     debug: bool = False
@@ -33,12 +34,176 @@ class Settings(BaseSettings):
     max_text_length: int = 10000
     max_audio_duration_seconds: int = 30
     max_video_duration_seconds: int = 8
+    media_duration_policy: str = "reject"  # over-long media: "reject" (400) or "trim" to the limit
+    
+    # Video frame selection
+    video_frame_budget: int = 3
+    video_frame_selection: str = "scene"  # "uniform" or "scene"
+    video_scene_candidates: int = 48
+    video_require_faces: bool = False
+    video_sample_fps: Optional[float] = None  # uniform only; unset = spread over clip
+    
+    # Media preprocessing before upload to the model
+    media_max_edge: int = 1024
+    video_frame_max_edge: int = 768
+    media_format: str = "JPEG"  # "JPEG" or "WEBP"
+    media_quality: int = 85
+    
+    # Local audio pre-screen (clips scored outside the band skip AssemblyAI)
+    audio_prescreen_enabled: bool = True
+    audio_prescreen_model_path: Optional[Path] = None  # default: ml/inference/models/audio_prescreen.json
+    audio_prescreen_real_below: float = 0.10
+    audio_prescreen_synthetic_above: float = 0.90
+    
+    # Local image forensics (ELA / FFT / noise residual)
+    image_forensics_mode: str = "fuse"  # "off", "fuse" or "substitute"
+    image_forensics_model_path: Optional[Path] = None  # default: ml/inference/models/image_forensics.json
+    image_forensics_weight: float = 0.3
+    
+    # Analysis cascade: cheap tiers tried before the remote model
+    # (comma-separated subset of cache, similar, local)
+    cascade_text_tiers: str = "cache,similar"  # add "local" to let strong rule hits skip Gemini
+    cascade_image_tiers: str = "cache,similar,local"
+    cascade_audio_tiers: str = "cache,local"
+    cascade_video_tiers: str = "cache,similar"
+    image_forensics_confident_below: float = 0.05
+    image_forensics_confident_above: float = 0.95
+    
+    # Structured model output (extra requests only when JSON fails to parse)
+    gemini_parse_retries: int = 1
+    
+    # Upstream concurrency (threads per backend executor)
+    gemini_max_workers: int = 128
+    assemblyai_max_workers: int = 64
+    default_max_workers: int = 32
+    local_inference_processes: int = 2
+    
+    # Upstream clients (configured once, connection pools shared by all analyzers)
+    gemini_model: str = "gemini-2.5-flash"
+    gemini_transport: str = "grpc"  # "grpc" (one multiplexed HTTP/2 channel) or "rest"
+    gemini_api_endpoint: Optional[str] = None  # override, e.g. a local stub (rest transport)
+    assemblyai_base_url: Optional[str] = None  # override, e.g. a local stub
+    assemblyai_max_connections: int = 64
+    upstream_http2: bool = True  # needs the h2 package
+    upstream_keepalive_seconds: float = 30.0
+    upstream_warmup: bool = True  # open connections at startup
+    
+    # Upstream rate limiting (AIMD concurrency per process; a request rate,
+    # when set, and its retry-after pauses are shared through Redis)
+    upstream_limiter_enabled: bool = True
+    upstream_limiter_redis_enabled: bool = True  # only for backends with a rate above 0
+    gemini_rate_per_second: float = 0.0  # 0 = no request-rate cap
+    gemini_rate_burst: int = 20
+    assemblyai_rate_per_second: float = 0.0
+    assemblyai_rate_burst: int = 5
+    upstream_min_concurrency: int = 2
+    upstream_backoff_factor: float = 0.5  # limit multiplier on each 429
+    upstream_rate_limit_retries: int = 3
+    upstream_retry_after_seconds: float = 1.0  # doubled per retry when no retry-after is given
+    upstream_priority_order: str = "text,image,audio,video"  # first is served first
+    
+    # Request deadlines and hedged Gemini requests
+    request_deadline_seconds: Optional[float] = None  # used without an X-Deadline-Ms header; unset = none
+    request_deadline_max_seconds: float = 120.0
+    hedging_enabled: bool = True
+    hedge_percentile: float = 95.0  # hedge once a call is slower than this latency percentile
+    hedge_min_samples: int = 20  # latencies observed before hedging starts
+    hedge_window: int = 500
+    
+    # Circuit breakers per upstream backend (open = answer from local signals)
+    breaker_enabled: bool = True
+    breaker_window: int = 20  # recent calls considered
+    breaker_min_calls: int = 10
+    breaker_failure_rate: float = 0.5  # share of failed or slow calls that opens the breaker
+    breaker_open_seconds: float = 30.0  # before a half-open probe
+    gemini_slow_call_seconds: float = 30.0
+    assemblyai_slow_call_seconds: float = 120.0
+    
+    # Async AssemblyAI transcription (no thread held while a transcript runs)
+    assemblyai_async_enabled: bool = True
+    assemblyai_poll_interval_seconds: float = 1.0  # shared poller interval without a webhook
+    assemblyai_webhook_url: Optional[str] = None  # public URL of POST /webhooks/assemblyai
+    assemblyai_webhook_secret: Optional[str] = None  # required: webhooks stay off without it
+    assemblyai_webhook_poll_seconds: float = 30.0  # safety-net polling when webhooks are on
+    assemblyai_transcript_timeout_seconds: float = 300.0
+    
+    # Transcription backend: "assemblyai" or "local" (faster-whisper on CPU,
+    # falling back to AssemblyAI when the model is unavailable)
+    transcription_backend: str = "assemblyai"
+    local_stt_model: str = "tiny"  # model size or path to a CTranslate2 model
+    local_stt_model_dir: Optional[Path] = None  # default: ml/inference/models/whisper
+    local_stt_download: bool = False  # fetch missing models into local_stt_model_dir
+    local_stt_compute_type: str = "int8"
+    local_stt_threads: int = 0  # CTranslate2 threads; 0 = library default
+    local_stt_beam_size: int = 1
+    local_stt_language: Optional[str] = None  # unset = detected once per batch
+    local_stt_batch_size: int = 8
+    local_stt_batch_wait_ms: int = 20
+    local_stt_workers: int = 1  # batches decoded at the same time
+    
+    # Result cache
+    cache_enabled: bool = True
+    cache_max_entries: int = 10000
+    cache_ttl_seconds: int = 86400
+    cache_redis_enabled: bool = False
+    
+    # Near-duplicate text index
+    near_duplicate_enabled: bool = True
+    near_duplicate_similarity: float = 0.90
+    near_duplicate_min_chars: int = 40
+    near_duplicate_max_entries: int = 100000
+    near_duplicate_index_path: Optional[Path] = None
+    
+    # Perceptual-hash index for images and video frames
+    perceptual_index_enabled: bool = True
+    perceptual_max_distance: int = 6
+    perceptual_max_entries: int = 50000
+    
+    # Rule-based scam signals for text
+    text_rules_mode: str = "merge"  # "merge" with the model, "substitute" (rules only) or "off"
+    text_rules_confident_above: float = 0.95  # only with "local" in cascade_text_tiers
+    text_rules_weight: float = 0.2  # share of the rule signals blended into the model's
+    
+    # Text batching
+    text_batch_prompt_size: int = 10
+    text_microbatch_enabled: bool = True
+    text_microbatch_wait_ms: int = 10
+    
+    # Prometheus metrics (GET /metrics)
+    metrics_enabled: bool = True
+    metrics_celery_queues: str = "celery"  # broker lists reported as queue depth
+    
+    # Async analysis jobs
+    job_poll_interval_seconds: float = 0.5
+    job_wait_max_seconds: int = 60
+    job_record_ttl_seconds: int = 86400  # submitted ids are known this long (Celery keeps results a day)
+    job_file_retention_seconds: int = 3600  # queued jobs' inputs are kept at least this long
     
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins from comma-separated string."""
         return [origin.strip() for origin in self.cors_origins.split(",")]
     
+    @property
+    def upstream_priority_list(self) -> List[str]:
+        """Parse the upstream queue priority order from comma-separated string."""
+        return [modality.strip() for modality in self.upstream_priority_order.split(",") if modality.strip()]
+    
+    @property
+    def assemblyai_webhooks_enabled(self) -> bool:
+        """Webhooks need both a public URL and a shared secret."""
+        return bool(self.assemblyai_webhook_url and self.assemblyai_webhook_secret)
+    
+    @property
+    def metrics_celery_queue_list(self) -> List[str]:
+        """Parse the Celery queues to report from comma-separated string."""
+        return [queue.strip() for queue in self.metrics_celery_queues.split(",") if queue.strip()]
+    
+    def cascade_tiers(self, modality: str) -> List[str]:
+        """Parse the enabled cascade tiers for a modality."""
+        tiers = getattr(self, f"cascade_{modality}_tiers")
+        return [tier.strip() for tier in tiers.split(",") if tier.strip()]
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -4,12 +4,27 @@ Entry point for the backend API.
 """
 import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.api.routes import text, audio, image, video
+from app.api.routes import text, audio, image, video, jobs, webhooks
 from app.utils.file_handler import cleanup_old_files
+from app.utils.executor import run_blocking, shutdown_executors
+from app.utils.clients import get_clients
+from app.utils.cache import get_result_cache
+from app.utils.similarity import get_text_index
+from app.utils.perceptual_hash import get_image_index, get_frame_index
+from app.utils.cascade import get_cascade_stats
+from app.utils.rate_limiter import limiter_stats
+from app.utils.deadline import DeadlineMiddleware
+from app.utils.hedging import get_latency_tracker
+from app.utils.circuit_breaker import breaker_stats
+from app.utils.metrics import MetricsMiddleware, render_metrics
+from app.utils.transcripts import get_transcript_tracker
+from ml.inference.speech_to_text import get_local_transcriber
+from ml.inference.image_forensics import get_forensics_engine
+from ml.inference.audio_prescreen import get_audio_prescreen
 
 
 @asynccontextmanager
@@ -22,6 +37,26 @@ async def lifespan(app: FastAPI):
     print("🚀 Sentinel AI starting up...")
     print(f"📁 Upload directory: {settings.upload_dir}")
     
+    # Restore the near-duplicate index from the last run
+    if settings.near_duplicate_index_path:
+        loaded = get_text_index().load(settings.near_duplicate_index_path)
+        print(f"🔎 Loaded {loaded} near-duplicate text fingerprints")
+    
+    # Configure upstream SDKs once and open their connections
+    if settings.upstream_warmup:
+        await run_blocking("default", get_clients().warm)
+    
+    # Load the local speech-to-text model once, before the first request
+    if settings.transcription_backend == "local":
+        await run_blocking("default", get_local_transcriber)
+    
+    # Load the local forensics and pre-screen models now, so a missing
+    # model is reported once at startup rather than on the first upload
+    if settings.image_forensics_mode != "off":
+        await run_blocking("default", get_forensics_engine)
+    if settings.audio_prescreen_enabled:
+        await run_blocking("default", get_audio_prescreen)
+    
     # Start background cleanup task
     cleanup_task = asyncio.create_task(periodic_cleanup())
     
@@ -34,6 +69,12 @@ async def lifespan(app: FastAPI):
         await cleanup_task
     except asyncio.CancelledError:
         pass
+    await get_transcript_tracker().close()
+    shutdown_executors()
+    get_clients().close()
+    
+    if settings.near_duplicate_index_path:
+        get_text_index().save(settings.near_duplicate_index_path)
 
 
 async def periodic_cleanup():
@@ -60,11 +101,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Start each request's deadline from the X-Deadline-Ms header
+app.add_middleware(DeadlineMiddleware)
+
+# Time analysis requests and count those in flight
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Register API routes
 app.include_router(text.router, prefix="/analyze", tags=["Analysis"])
 app.include_router(audio.router, prefix="/analyze", tags=["Analysis"])
 app.include_router(image.router, prefix="/analyze", tags=["Analysis"])
 app.include_router(video.router, prefix="/analyze", tags=["Analysis"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+
+# Webhook callbacks are only accepted with a shared secret configured
+if settings.assemblyai_webhooks_enabled:
+    app.include_router(webhooks.router, prefix="/webhooks", tags=["Webhooks"])
+elif settings.assemblyai_webhook_url:
+    print("⚠️  ASSEMBLYAI_WEBHOOK_URL is set without ASSEMBLYAI_WEBHOOK_SECRET; webhooks disabled, polling instead")
 
 
 @app.get("/health")
@@ -73,6 +128,32 @@ async def health_check():
     return {"status": "healthy", "service": "sentinel-ai"}
 
 
+@app.get("/stats")
+async def stats():
+    """Runtime counters for caches and other shared components."""
+    return {
+        "cache": get_result_cache().stats(),
+        "near_duplicate_text": get_text_index().stats(),
+        "perceptual_image": get_image_index().stats(),
+        "perceptual_video_frames": get_frame_index().stats(),
+        "cascade": get_cascade_stats().stats(),
+        "upstream": limiter_stats(),
+        "hedging": get_latency_tracker().stats(),
+        "circuit_breakers": breaker_stats(),
+        "transcripts": get_transcript_tracker().stats()
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: stage latencies, caches, upstreams and queues."""
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    # Reading the Celery queue depth talks to Redis, so keep it off the loop
+    body, content_type = await run_blocking("default", render_metrics)
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API info."""
@@ -84,6 +165,7 @@ async def root():
             "text": "POST /analyze/text",
             "audio": "POST /analyze/audio",
             "image": "POST /analyze/image",
-            "video": "POST /analyze/video"
+            "video": "POST /analyze/video",
+            "job": "GET /jobs/{job_id}"
         }
     }
@@ -2,11 +2,24 @@
 Sentinel AI - Audio Analyzer
 Real AI-powered audio deepfake detection using AssemblyAI.
 """
-import os
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
 import assemblyai as aai
 
+from app.config import settings
+from app.utils.cascade import Cascade, is_confident
+from app.utils.clients import get_clients
+from app.utils.circuit_breaker import LOCAL_FALLBACK_ERRORS
+from app.utils.batcher import MicroBatcher
+from app.utils.deadline import wait_with_deadline
+from app.utils.executor import run_blocking
+from app.utils.hedging import upstream_call
+from app.utils.metrics import observe_stage
+from app.utils.response_parser import AudioVerdict, generate_structured
+from app.utils.transcripts import WEBHOOK_AUTH_HEADER, get_transcript_tracker
+from ml.inference.audio_prescreen import get_audio_prescreen
+from ml.inference.speech_to_text import LocalTranscriber, get_local_transcriber
+
 
 class AudioAnalyzer:
     """
@@ -14,12 +27,10 @@ class AudioAnalyzer:
     """
     
     def __init__(self):
-        """Initialize the audio analyzer with AssemblyAI."""
-        api_key = os.getenv("ASSEMBLYAI_API_KEY")
-        if not api_key:
-            raise ValueError("ASSEMBLYAI_API_KEY not found in environment variables")
-        
-        aai.settings.api_key = api_key
+        """Initialize the audio analyzer with the shared AssemblyAI and Gemini clients."""
+        self.client = get_clients().assemblyai()
+        self.model = get_clients().gemini_model()
+        self._stt_batcher = None
         self.loaded = True
     
     def analyze(self, file_path: Path) -> Dict:
@@ -33,28 +44,164 @@ class AudioAnalyzer:
             Dict with analysis results including probabilities
         """
         try:
-            # Transcribe and analyze audio
-            config = aai.TranscriptionConfig(
-                speech_model=aai.SpeechModel.best,
-                language_detection=True
-            )
-            
-            transcriber = aai.Transcriber(config=config)
-            transcript = transcriber.transcribe(str(file_path))
-            
-            if transcript.status == aai.TranscriptStatus.error:
-                raise Exception(f"Transcription failed: {transcript.error}")
+            cascade = Cascade("audio")
             
-            # Analyze the transcription and audio characteristics
-            text = transcript.text or ""
-            confidence = transcript.confidence or 0.5
+            # Clear-cut clips are resolved locally without AssemblyAI
+            local = self._prescreen(file_path) if cascade.enabled("local") else None
+            if local is not None and local["prescreen_confident"]:
+                return cascade.answer("local", local)
             
-            # Use Gemini to analyze the transcribed text for suspicious content
-            import google.generativeai as genai
-            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-            model = genai.GenerativeModel('gemini-2.5-flash')
+            try:
+                return cascade.answer("remote", self._analyze_remote(file_path))
+            except LOCAL_FALLBACK_ERRORS as e:
+                return self._fallback(local, e, cascade)
+                
+        except Exception as e:
+            return self._failed_result(e)
+    
+    def _fallback(self, local: Optional[Dict], error: Exception, cascade: Cascade) -> Dict:
+        """Answer from the inconclusive pre-screen when the upstream is unavailable."""
+        if local is None:
+            raise error
+        local["reasoning"] = f"{error}; based on the local voice pre-screen only. {local['reasoning']}"
+        local["degraded"] = True
+        local["failed"] = True
+        return cascade.answer("local", local)
+    
+    def _failed_result(self, error: Exception) -> Dict:
+        """Neutral result returned when analysis failed."""
+        print(f"Audio analysis failed: {error}")
+        return {
+            "real_probability": 0.5,
+            "deepfake_probability": 0.25,
+            "scam_probability": 0.25,
+            "reasoning": f"Analysis failed: {str(error)}",
+            "transcription": "",
+            "confidence": 0.0,
+            "human_voice": 0.5,
+            "tts_likelihood": 0.25,
+            "voice_cloning": 0.25,
+            "duration_seconds": 0.0,
+            "degraded": isinstance(error, LOCAL_FALLBACK_ERRORS),
+            "failed": True
+        }
+    
+    def _transcription_config(self, webhook: bool = False) -> aai.TranscriptionConfig:
+        """AssemblyAI settings, with the completion webhook when requested and configured."""
+        config = aai.TranscriptionConfig(
+            speech_model=aai.SpeechModel.best,
+            language_detection=True
+        )
+        if webhook and settings.assemblyai_webhooks_enabled:
+            config.set_webhook(
+                settings.assemblyai_webhook_url,
+                WEBHOOK_AUTH_HEADER,
+                settings.assemblyai_webhook_secret
+            )
+        return config
+    
+    def _local_stt(self) -> Optional[LocalTranscriber]:
+        """The local transcriber when selected and loaded, else None (use AssemblyAI)."""
+        if settings.transcription_backend != "local":
+            return None
+        stt = get_local_transcriber()
+        return stt if stt.loaded else None
+    
+    async def _transcribe_local_batch(self, paths: List[Path]) -> List[Dict]:
+        """Decode a micro-batch of clips on the local transcription executor."""
+        transcripts = await run_blocking("stt", get_local_transcriber().transcribe_batch, paths)
+        observe_stage("audio", "transcribe", transcripts[0]["elapsed_ms"] / 1000.0)
+        return transcripts
+    
+    def _analyze_remote(self, file_path: Path) -> Dict:
+        """Transcribe (locally or with AssemblyAI, blocking until done) and judge the transcript."""
+        stt = self._local_stt()
+        if stt is not None:
+            try:
+                transcript = stt.transcribe(file_path)
+                observe_stage("audio", "transcribe", transcript["elapsed_ms"] / 1000.0)
+                return self._judge(transcript["text"], transcript["confidence"], transcript["duration_seconds"])
+            except LOCAL_FALLBACK_ERRORS:
+                raise
+            except Exception as e:
+                print(f"Local transcription failed, using AssemblyAI: {e}")
+                
+        transcriber = aai.Transcriber(client=self.client, config=self._transcription_config())
+        # Bounded by the request deadline; transcriptions are never hedged
+        transcript = upstream_call(
+            "assemblyai", transcriber.transcribe, str(file_path), modality="audio", hedge=False
+        )
+        
+        if transcript.status == aai.TranscriptStatus.error:
+            raise Exception(f"Transcription failed: {transcript.error}")
+        
+        return self._judge(
+            transcript.text or "",
+            transcript.confidence or 0.5,
+            float(transcript.audio_duration or 0.0)
+        )
+    
+    def _submit(self, file_path: Path) -> str:
+        """Upload the clip and queue its transcription without waiting for it."""
+        transcriber = aai.Transcriber(client=self.client, config=self._transcription_config(webhook=True))
+        transcript = upstream_call(
+            "assemblyai", transcriber.submit, str(file_path), modality="audio", hedge=False
+        )
+        if transcript.status == aai.TranscriptStatus.error:
+            raise Exception(f"Transcription failed: {transcript.error}")
+        return transcript.id
+    
+    async def _analyze_remote_async(self, file_path: Path) -> Dict:
+        """Transcribe without holding a thread per clip, then judge the transcript."""
+        if self._local_stt() is not None:
+            if self._stt_batcher is None:
+                self._stt_batcher = MicroBatcher(
+                    self._transcribe_local_batch,
+                    max_batch_size=settings.local_stt_batch_size,
+                    max_wait_ms=settings.local_stt_batch_wait_ms
+                )
+            try:
+                transcript = await wait_with_deadline(self._stt_batcher.submit(file_path))
+                return await run_blocking(
+                    "gemini",
+                    self._judge,
+                    transcript["text"],
+                    transcript["confidence"],
+                    transcript["duration_seconds"]
+                )
+            except LOCAL_FALLBACK_ERRORS:
+                raise
+            except Exception as e:
+                print(f"Local transcription failed, using AssemblyAI: {e}")
+                
+        # AssemblyAI: submit, then wait on the shared tracker
+        transcript_id = await run_blocking("assemblyai", self._submit, file_path)
+        transcript = await get_transcript_tracker().wait(transcript_id)
+        if transcript["status"] == "error":
+            raise Exception(f"Transcription failed: {transcript.get('error')}")
+        
+        return await run_blocking(
+            "gemini",
+            self._judge,
+            transcript.get("text") or "",
+            transcript.get("confidence") or 0.5,
+            float(transcript.get("audio_duration") or 0.0)
+        )
+    
+    def _judge(self, text: str, confidence: float, duration_seconds: float) -> Dict:
+        """
+        Judge a transcript with Gemini.
+        
+        Args:
+            text: Transcribed speech
+            confidence: AssemblyAI transcription confidence
+            duration_seconds: Clip duration reported by AssemblyAI
             
-            prompt = f"""Analyze this audio transcription for signs of:
+        Returns:
+            Dict with analysis results including probabilities
+        """
+        # Use Gemini to analyze the transcribed text for suspicious content
+        prompt = f"""Analyze this audio transcription for signs of:
 1. Voice cloning or deepfake audio
 2. Scam or phishing attempts
 3. Social engineering
@@ -69,89 +216,150 @@ Look for:
 - Impersonation attempts
 - Suspicious requests
 
-Provide analysis in this format:
-VERDICT: [Deepfake/Scam/Suspicious/Legitimate]
-RISK_SCORE: [0-100]
-REASONING: [Brief explanation]
-
-Be specific about audio and content indicators."""
+Score risk_score from 0 to 100. Be specific in the reasoning about audio
+and content indicators."""
 
-            response = model.generate_content(prompt)
-            analysis_text = response.text
-            
-            # Parse response
-            verdict = "Legitimate"
-            risk_score = 20
-            reasoning = analysis_text
-            
-            if "VERDICT:" in analysis_text:
-                verdict_line = [line for line in analysis_text.split('\n') if 'VERDICT:' in line][0]
-                verdict = verdict_line.split('VERDICT:')[1].strip().split()[0]
-            
-            if "RISK_SCORE:" in analysis_text:
-                risk_line = [line for line in analysis_text.split('\n') if 'RISK_SCORE:' in line][0]
-                try:
-                    risk_score = int(''.join(filter(str.isdigit, risk_line.split('RISK_SCORE:')[1])))
-                except:
-                    risk_score = 50
+        parsed = generate_structured(self.model, prompt, AudioVerdict, modality="audio")
+        verdict = parsed.verdict
+        risk_score = parsed.risk_score
+        reasoning = parsed.reasoning
+        
+        # Factor in transcription confidence
+        if confidence < 0.7:
+            risk_score = min(100, risk_score + 20)
+            reasoning += f" Low transcription confidence ({confidence:.2f}) suggests possible audio manipulation."
+        
+        risk_decimal = risk_score / 100.0
+        
+        if "DEEPFAKE" in verdict.upper() or "CLONED" in verdict.upper():
+            result = {
+                "real_probability": 1.0 - risk_decimal,
+                "deepfake_probability": risk_decimal * 0.8,
+                "scam_probability": risk_decimal * 0.2,
+                "reasoning": reasoning,
+                "transcription": text,
+                "confidence": confidence
+            }
+        elif "SCAM" in verdict.upper():
+            result = {
+                "real_probability": 1.0 - risk_decimal,
+                "deepfake_probability": risk_decimal * 0.3,
+                "scam_probability": risk_decimal * 0.7,
+                "reasoning": reasoning,
+                "transcription": text,
+                "confidence": confidence
+            }
+        elif "SUSPICIOUS" in verdict.upper():
+            result = {
+                "real_probability": 1.0 - risk_decimal,
+                "deepfake_probability": risk_decimal * 0.5,
+                "scam_probability": risk_decimal * 0.5,
+                "reasoning": reasoning,
+                "transcription": text,
+                "confidence": confidence
+            }
+        else:  # Legitimate
+            result = {
+                "real_probability": 1.0 - risk_decimal,
+                "deepfake_probability": risk_decimal * 0.5,
+                "scam_probability": risk_decimal * 0.5,
+                "reasoning": reasoning,
+                "transcription": text,
+                "confidence": confidence
+            }
+        
+        # Fields read by the response builder
+        result["human_voice"] = result["real_probability"]
+        result["tts_likelihood"] = result["deepfake_probability"]
+        result["voice_cloning"] = result["deepfake_probability"]
+        result["duration_seconds"] = duration_seconds
+        
+        return result
+    
+    def _prescreen(self, file_path: Path) -> Optional[Dict]:
+        """
+        Score the clip with the local librosa pre-screen.
+        
+        Args:
+            file_path: Path to audio file
             
-            if "REASONING:" in analysis_text:
-                reasoning = analysis_text.split('REASONING:')[1].strip()
+        Returns:
+            A complete local result (prescreen_confident is True if the
+            synthetic probability is outside the escalation band), or None
+            if the pre-screen is unavailable
+        """
+        if not settings.audio_prescreen_enabled:
+            return None
+        
+        prescreen = get_audio_prescreen()
+        if not prescreen.loaded:
+            return None
+        
+        try:
+            # Decode just past the limit so over-long clips are still detected
+            screened = prescreen.screen(file_path, settings.max_audio_duration_seconds + 1)
+        except Exception as e:
+            print(f"Audio pre-screen failed, escalating: {e}")
+            return None
+        observe_stage("audio", "local", screened["elapsed_ms"] / 1000.0)
+        
+        synthetic = screened["synthetic_probability"]
+        band = (settings.audio_prescreen_real_below, settings.audio_prescreen_synthetic_above)
+        confident = is_confident(synthetic, band)
+        
+        if confident:
+            label = "synthetic" if synthetic >= settings.audio_prescreen_synthetic_above else "natural"
+            reasoning = f"Local voice pre-screen found clearly {label} speech characteristics "
+        else:
+            reasoning = "Local voice pre-screen was inconclusive "
+        return {
+            "real_probability": 1.0 - synthetic,
+            "deepfake_probability": synthetic,
+            "scam_probability": 0.0,
+            "reasoning": reasoning + f"(synthetic probability {synthetic:.2f}).",
+            "transcription": "",
+            "confidence": 0.0,
+            "human_voice": 1.0 - synthetic,
+            "tts_likelihood": synthetic,
+            "voice_cloning": synthetic,
+            "duration_seconds": screened["duration_seconds"],
+            "prescreen_ms": screened["elapsed_ms"],
+            "prescreen_confident": confident
+        }
+    
+    async def analyze_async(self, file_path: Path) -> Dict:
+        """
+        Analyze audio without blocking the event loop.
+        
+        The transcription is submitted and awaited through the shared
+        transcript tracker (webhook or poller), so no thread is held while
+        AssemblyAI works. With assemblyai_async_enabled off, :meth:`analyze`
+        runs on the bounded AssemblyAI executor instead.
+        
+        Args:
+            file_path: Path to audio file
             
-            # Factor in transcription confidence
-            if confidence < 0.7:
-                risk_score = min(100, risk_score + 20)
-                reasoning += f" Low transcription confidence ({confidence:.2f}) suggests possible audio manipulation."
+        Returns:
+            Dict with analysis results including probabilities
+        """
+        if not settings.assemblyai_async_enabled:
+            return await run_blocking("assemblyai", self.analyze, file_path)
             
-            risk_decimal = risk_score / 100.0
+        try:
+            cascade = Cascade("audio")
             
-            if "DEEPFAKE" in verdict.upper() or "CLONED" in verdict.upper():
-                return {
-                    "real_probability": 1.0 - risk_decimal,
-                    "deepfake_probability": risk_decimal * 0.8,
-                    "scam_probability": risk_decimal * 0.2,
-                    "reasoning": reasoning,
-                    "transcription": text,
-                    "confidence": confidence
-                }
-            elif "SCAM" in verdict.upper():
-                return {
-                    "real_probability": 1.0 - risk_decimal,
-                    "deepfake_probability": risk_decimal * 0.3,
-                    "scam_probability": risk_decimal * 0.7,
-                    "reasoning": reasoning,
-                    "transcription": text,
-                    "confidence": confidence
-                }
-            elif "SUSPICIOUS" in verdict.upper():
-                return {
-                    "real_probability": 1.0 - risk_decimal,
-                    "deepfake_probability": risk_decimal * 0.5,
-                    "scam_probability": risk_decimal * 0.5,
-                    "reasoning": reasoning,
-                    "transcription": text,
-                    "confidence": confidence
-                }
-            else:  # Legitimate
-                return {
-                    "real_probability": 1.0 - risk_decimal,
-                    "deepfake_probability": risk_decimal * 0.5,
-                    "scam_probability": risk_decimal * 0.5,
-                    "reasoning": reasoning,
-                    "transcription": text,
-                    "confidence": confidence
-                }
+            # Clear-cut clips are resolved locally without AssemblyAI
+            local = await run_blocking("default", self._prescreen, file_path) if cascade.enabled("local") else None
+            if local is not None and local["prescreen_confident"]:
+                return cascade.answer("local", local)
+                
+            try:
+                return cascade.answer("remote", await self._analyze_remote_async(file_path))
+            except LOCAL_FALLBACK_ERRORS as e:
+                return self._fallback(local, e, cascade)
                 
         except Exception as e:
-            print(f"Audio analysis failed: {e}")
-            return {
-                "real_probability": 0.5,
-                "deepfake_probability": 0.25,
-                "scam_probability": 0.25,
-                "reasoning": f"Analysis failed: {str(e)}",
-                "transcription": "",
-                "confidence": 0.0
-            }
+            return self._failed_result(e)
 
 
 # Singleton instance
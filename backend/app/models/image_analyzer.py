@@ -2,10 +2,23 @@
 Sentinel AI - Image Analyzer
 Real AI-powered deepfake and AI-generated image detection using Google Gemini Vision API.
 """
-import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict
-import google.generativeai as genai
+from typing import BinaryIO, Dict, Optional, Union
+import numpy as np
+
+from app.config import settings
+from app.utils.executor import run_blocking, get_process_pool, reset_process_pool
+from app.utils.media import prepare_image
+from app.utils.metrics import time_stage
+from app.utils.cascade import Cascade, is_confident
+from app.utils.clients import get_clients
+from app.utils.circuit_breaker import LOCAL_FALLBACK_ERRORS
+from app.utils.deadline import remaining
+from app.utils.response_parser import ImageVerdict, generate_structured
+from app.utils.perceptual_hash import get_image_index, phash
+from ml.inference.image_forensics import get_forensics_engine, score_image
 
 
 class ImageAnalyzer:
@@ -15,30 +28,51 @@ class ImageAnalyzer:
     """
     
     def __init__(self):
-        """Initialize the image analyzer with Gemini API."""
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        """Initialize the image analyzer with the shared Gemini client."""
+        self.model = get_clients().gemini_model()
         self.loaded = True
     
-    def analyze(self, file_path: Path) -> Dict:
+    def analyze(self, source: Union[Path, BinaryIO]) -> Dict:
         """
         Analyze image for AI generation or manipulation using Gemini Vision.
         
         Args:
-            file_path: Path to image file
+            source: Path to image file or an in-memory file object
             
         Returns:
             Dict with analysis results including probabilities
         """
         try:
-            from PIL import Image
+            cascade = Cascade("image")
+            
+            # Decode downscaled and re-encode without metadata for upload
+            with time_stage("image", "decode"):
+                img, blob = prepare_image(source)
+            
+            # Known near-duplicates reuse the stored verdict
+            fingerprint = None
+            if settings.perceptual_index_enabled and cascade.enabled("similar"):
+                fingerprint = phash(img)
+                known = get_image_index().lookup(fingerprint)
+                if known is not None:
+                    return cascade.answer("similar", known)
             
-            # Load image
-            img = Image.open(file_path)
+            # Local forensics answer alone when confident (or when substituting)
+            ai_probability = None
+            if cascade.enabled("local"):
+                forensics = self._submit_forensics(img)
+                if forensics is not None:
+                    with time_stage("image", "local"):
+                        ai_probability = self._forensics_probability(forensics)
+            
+            band = (settings.image_forensics_confident_below, settings.image_forensics_confident_above)
+            if ai_probability is not None and (
+                settings.image_forensics_mode == "substitute" or is_confident(ai_probability, band)
+            ):
+                result = self._local_result(ai_probability)
+                if fingerprint is not None:
+                    get_image_index().add(fingerprint, result)
+                return cascade.answer("local", result)
             
             # Craft a detailed prompt for AI detection
             prompt = """Analyze this image carefully and determine if it's AI-generated, manipulated, or real.
@@ -53,63 +87,59 @@ Look for these signs of AI generation:
 - Unusual text or writing
 - Blending or morphing effects
 
-Provide your analysis in this exact format:
-VERDICT: [AI-Generated/Manipulated/Real]
-CONFIDENCE: [0-100]
-REASONING: [Brief explanation of key indicators you found]
-
-Be thorough and specific about what you observe."""
+Give your confidence in the verdict from 0 to 100. Be thorough and
+specific in the reasoning about what you observe."""
 
-            # Get analysis from Gemini
-            response = self.model.generate_content([prompt, img])
-            analysis_text = response.text
-            
-            # Parse the response
-            verdict = "Real"
-            confidence = 50
-            reasoning = analysis_text
-            
-            # Extract verdict
-            if "VERDICT:" in analysis_text:
-                verdict_line = [line for line in analysis_text.split('\n') if 'VERDICT:' in line][0]
-                verdict = verdict_line.split('VERDICT:')[1].strip().split()[0]
-            
-            # Extract confidence
-            if "CONFIDENCE:" in analysis_text:
-                conf_line = [line for line in analysis_text.split('\n') if 'CONFIDENCE:' in line][0]
-                try:
-                    confidence = int(''.join(filter(str.isdigit, conf_line.split('CONFIDENCE:')[1])))
-                except:
-                    confidence = 50
-            
-            # Extract reasoning
-            if "REASONING:" in analysis_text:
-                reasoning = analysis_text.split('REASONING:')[1].strip()
+            # Get a schema-constrained verdict from Gemini; past the deadline
+            # or during an outage fall back to the uncertain forensic verdict
+            try:
+                parsed = generate_structured(self.model, [prompt, blob], ImageVerdict, modality="image")
+            except LOCAL_FALLBACK_ERRORS as e:
+                if ai_probability is None:
+                    raise
+                result = self._local_result(ai_probability)
+                result["reasoning"] = f"{e}; based on local forensics only. {result['reasoning']}"
+                result["degraded"] = True
+                result["failed"] = True
+                return cascade.answer("local", result)
+            verdict = parsed.verdict
+            confidence = parsed.confidence
+            reasoning = parsed.reasoning
             
             # Convert to probabilities
             confidence_decimal = confidence / 100.0
             
             if "AI" in verdict.upper() or "GENERATED" in verdict.upper():
-                return {
+                result = {
                     "real_probability": 1.0 - confidence_decimal,
                     "ai_generated": confidence_decimal * 0.8,
                     "manipulated": confidence_decimal * 0.2,
                     "reasoning": reasoning
                 }
             elif "MANIPULATED" in verdict.upper() or "EDITED" in verdict.upper():
-                return {
+                result = {
                     "real_probability": 1.0 - confidence_decimal,
                     "ai_generated": confidence_decimal * 0.3,
                     "manipulated": confidence_decimal * 0.7,
                     "reasoning": reasoning
                 }
             else:  # Real
-                return {
+                result = {
                     "real_probability": confidence_decimal,
                     "ai_generated": (1.0 - confidence_decimal) * 0.5,
                     "manipulated": (1.0 - confidence_decimal) * 0.5,
                     "reasoning": reasoning
                 }
+            
+            # Blend in the uncertain local forensic verdict
+            if ai_probability is not None:
+                result = self._fuse(result, ai_probability)
+            
+            # Remember the verdict for re-encoded or resized copies
+            if fingerprint is not None:
+                get_image_index().add(fingerprint, result)
+            
+            return cascade.answer("remote", result)
                 
         except Exception as e:
             print(f"Image analysis failed: {e}")
@@ -118,8 +148,72 @@ Be thorough and specific about what you observe."""
                 "real_probability": 0.5,
                 "ai_generated": 0.25,
                 "manipulated": 0.25,
-                "reasoning": f"Analysis failed: {str(e)}"
+                "reasoning": f"Analysis failed: {str(e)}",
+                "degraded": isinstance(e, LOCAL_FALLBACK_ERRORS),
+                "failed": True
             }
+    
+    def _local_result(self, ai_probability: float) -> Dict:
+        """Result from the local forensic verdict alone."""
+        return {
+            "real_probability": 1.0 - ai_probability,
+            "ai_generated": ai_probability,
+            "manipulated": 0.0,
+            "reasoning": f"Local forensic analysis (ELA, spectral and noise residual) "
+                         f"estimated an AI-generation probability of {ai_probability:.2f}.",
+            "forensics_probability": ai_probability
+        }
+    
+    def _submit_forensics(self, img) -> Optional[Future]:
+        """Start local forensics in the process pool if a model is available."""
+        if settings.image_forensics_mode == "off":
+            return None
+        if not get_forensics_engine().loaded:
+            return None
+        try:
+            return get_process_pool().submit(score_image, np.asarray(img))
+        except BrokenProcessPool:
+            print("Image forensics pool broken; restarting it")
+            reset_process_pool()
+            return None
+    
+    def _forensics_probability(self, forensics: Future) -> Optional[float]:
+        """Wait for the local forensic verdict; None if it failed."""
+        try:
+            left = remaining()
+            return forensics.result(timeout=None if left is None else max(0.0, left))["ai_probability"]
+        except Exception as e:
+            print(f"Image forensics failed: {e}")
+            return None
+    
+    def _fuse(self, result: Dict, ai_probability: float) -> Dict:
+        """
+        Mix the local AI-generation probability into the remote verdict.
+        
+        Probabilities are blended with image_forensics_weight and still sum
+        to one.
+        """
+        weight = settings.image_forensics_weight
+        fused = dict(result)
+        fused["real_probability"] = (1.0 - weight) * result["real_probability"] + weight * (1.0 - ai_probability)
+        fused["ai_generated"] = (1.0 - weight) * result["ai_generated"] + weight * ai_probability
+        fused["manipulated"] = (1.0 - weight) * result["manipulated"]
+        fused["forensics_probability"] = ai_probability
+        return fused
+    
+    async def analyze_async(self, source: Union[Path, BinaryIO]) -> Dict:
+        """
+        Analyze image without blocking the event loop.
+        
+        Runs :meth:`analyze` on the bounded Gemini executor.
+        
+        Args:
+            source: Path to image file or an in-memory file object
+            
+        Returns:
+            Dict with analysis results including probabilities
+        """
+        return await run_blocking("gemini", self.analyze, source)
 
 
 # Singleton instance
@@ -2,9 +2,38 @@
 Sentinel AI - Text Analyzer
 Real AI-powered scam and AI-generated text detection using Google Gemini API.
 """
-import os
-from typing import Dict
-import google.generativeai as genai
+import asyncio
+import json
+from typing import Dict, List, Optional, Sequence
+
+from app.config import settings
+from app.utils.batcher import MicroBatcher
+from app.utils.cascade import tier_enabled
+from app.utils.clients import get_clients
+from app.utils.circuit_breaker import LOCAL_FALLBACK_ERRORS
+from app.utils.deadline import clear_deadline, wait_with_deadline
+from app.utils.executor import run_blocking
+from app.utils.metrics import time_stage
+from app.utils.response_parser import TextBatchItem, TextVerdict, generate_items, generate_structured
+from app.utils.scam_signals import extract_signals
+
+
+# Prompt used when several texts are packed into one request
+BATCH_PROMPT = """Analyze each of the {count} numbered text messages below and determine if it's:
+1. AI-generated text
+2. A scam, phishing attempt, or social engineering
+3. Legitimate human-written content
+
+Look for urgency tactics, requests for money or credentials, too-good-to-be-true
+offers, suspicious links, impersonal language, AI-like patterns, emotional
+manipulation and authority impersonation.
+
+Respond with one JSON object per message, using its number as "id". Score
+risk_score from 0 to 100 and urgency, financial_request and impersonation
+from 0.0 to 1.0.
+
+Messages:
+{messages}"""
 
 
 class TextAnalyzer:
@@ -14,13 +43,9 @@ class TextAnalyzer:
     """
     
     def __init__(self):
-        """Initialize the text analyzer with Gemini API."""
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        """Initialize the text analyzer with the shared Gemini client."""
+        self.model = get_clients().gemini_model()
+        self._batcher = None
         self.loaded = True
     
     def analyze(self, text: str) -> Dict:
@@ -54,85 +79,292 @@ Look for these indicators:
 - Emotional manipulation
 - Authority impersonation
 
-Provide your analysis in this exact format:
-VERDICT: [Scam/AI-Generated/Suspicious/Legitimate]
-RISK_SCORE: [0-100]
-REASONING: [Brief explanation of key indicators]
-
-Be specific about what makes this text suspicious or safe."""
+Score risk_score from 0 to 100 and urgency, financial_request and
+impersonation from 0.0 to 1.0. Be specific in the reasoning about what
+makes this text suspicious or safe."""
 
-            # Get analysis from Gemini
-            response = self.model.generate_content(prompt)
-            analysis_text = response.text
+            # Get a schema-constrained verdict from Gemini
+            verdict = generate_structured(self.model, prompt, TextVerdict, modality="text")
             
-            # Parse the response
-            verdict = "Legitimate"
-            risk_score = 20
-            reasoning = analysis_text
+            return self._to_scores(
+                verdict.verdict,
+                verdict.risk_score,
+                verdict.reasoning,
+                signals=verdict.model_dump()
+            )
+                
+        except LOCAL_FALLBACK_ERRORS:
+            raise
+        except Exception as e:
+            print(f"Text analysis failed: {e}")
+            # Return uncertain results on error
+            return self._failed_scores(e)
+    
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Analyze several texts with a single Gemini request.
+        
+        Args:
+            texts: Text contents to analyze
             
-            # Extract verdict
-            if "VERDICT:" in analysis_text:
-                verdict_line = [line for line in analysis_text.split('\n') if 'VERDICT:' in line][0]
-                verdict = verdict_line.split('VERDICT:')[1].strip().split()[0]
+        Returns:
+            List of result dicts in the same order as texts
+        """
+        try:
+            # Items that fail to parse are re-requested on their own
+            items = generate_items(
+                self.model,
+                lambda indices: self._batch_prompt([texts[i] for i in indices]),
+                range(len(texts)),
+                TextBatchItem,
+                modality="text"
+            )
             
-            # Extract risk score
-            if "RISK_SCORE:" in analysis_text:
-                risk_line = [line for line in analysis_text.split('\n') if 'RISK_SCORE:' in line][0]
-                try:
-                    risk_score = int(''.join(filter(str.isdigit, risk_line.split('RISK_SCORE:')[1])))
-                except:
-                    risk_score = 50
+            results = []
+            for i in range(len(texts)):
+                item = items.get(i)
+                if item is None:
+                    results.append(self._failed_scores(f"no result for item {i + 1}"))
+                    continue
+                results.append(self._to_scores(
+                    item.verdict,
+                    item.risk_score,
+                    item.reasoning,
+                    signals=item.model_dump()
+                ))
+            return results
             
-            # Extract reasoning
-            if "REASONING:" in analysis_text:
-                reasoning = analysis_text.split('REASONING:')[1].strip()
+        except LOCAL_FALLBACK_ERRORS:
+            raise
+        except Exception as e:
+            print(f"Batch text analysis failed: {e}")
+            return [self._failed_scores(e) for _ in texts]
+    
+    def _batch_prompt(self, texts: Sequence[str]) -> str:
+        """Number the texts into one batch prompt."""
+        messages = "\n".join(
+            f"[{i}] {json.dumps(text, ensure_ascii=False)}" for i, text in enumerate(texts, start=1)
+        )
+        return BATCH_PROMPT.format(count=len(texts), messages=messages)
+    
+    def _to_scores(
+        self,
+        verdict: str,
+        risk_score: int,
+        reasoning: str,
+        signals: Optional[Dict] = None
+    ) -> Dict:
+        """Convert a verdict and 0-100 risk score into probability scores."""
+        risk_score = min(100, max(0, risk_score))
+        risk_decimal = risk_score / 100.0
+        verdict = verdict.upper()
+        
+        # Split the risk between scam and AI-generated by verdict
+        if "SCAM" in verdict or "PHISHING" in verdict:
+            scam_share, ai_share = 0.7, 0.3
+        elif "AI" in verdict or "GENERATED" in verdict:
+            scam_share, ai_share = 0.2, 0.8
+        else:  # Suspicious / Legitimate
+            scam_share, ai_share = 0.5, 0.5
+        
+        def signal(name: str) -> float:
+            try:
+                return min(1.0, max(0.0, float((signals or {}).get(name, 0.0))))
+            except (TypeError, ValueError):
+                return 0.0
+        
+        return {
+            "safe_probability": 1.0 - risk_decimal,
+            "scam_probability": risk_decimal * scam_share,
+            "ai_generated": risk_decimal * ai_share,
+            "reasoning": reasoning,
+            "risk_score": risk_score,
+            # Fields read by the response builder
+            "ai_likelihood": risk_decimal * ai_share,
+            "scam_intent": risk_decimal * scam_share,
+            "urgency": signal("urgency"),
+            "financial_request": signal("financial_request"),
+            "impersonation": signal("impersonation")
+        }
+    
+    def _failed_scores(self, error) -> Dict:
+        """Uncertain scores returned when analysis fails."""
+        return {
+            "safe_probability": 0.5,
+            "scam_probability": 0.25,
+            "ai_generated": 0.25,
+            "reasoning": f"Analysis failed: {str(error)}",
+            "risk_score": 50,
+            "ai_likelihood": 0.25,
+            "scam_intent": 0.25,
+            "urgency": 0.0,
+            "financial_request": 0.0,
+            "impersonation": 0.0,
+            "failed": True
+        }
+    
+    def _signals(self, text: str) -> Optional[Dict]:
+        """Rule-based scam signals, or None when rules are off."""
+        if settings.text_rules_mode == "off":
+            return None
+        with time_stage("text", "local"):
+            return extract_signals(text)
+    
+    def _local_scores(self, signals: Optional[Dict]) -> Optional[Dict]:
+        """
+        Answer from rule-based signals alone when they are conclusive.
+        
+        Returns:
+            Scores tagged with the "local" tier, or None to escalate
+        """
+        if signals is None:
+            return None
+        if settings.text_rules_mode == "substitute":
+            return self._rule_scores(signals)
+        # Keyword hits alone only decide when explicitly enabled as a tier
+        if not tier_enabled("text", "local") or signals["scam_score"] < settings.text_rules_confident_above:
+            return None
+        return self._rule_scores(signals)
+    
+    def _degraded_scores(self, signals: Optional[Dict], error: Exception) -> Dict:
+        """Flagged rule-based scores returned when Gemini is unavailable or too slow."""
+        if signals is None:
+            return {**self._failed_scores(error), "degraded": True}
+        scores = self._rule_scores(signals)
+        scores["reasoning"] = f"{error}; based on local scam signals only. {scores['reasoning']}"
+        scores["degraded"] = True
+        # Not a real verdict: keep it out of the cache
+        scores["failed"] = True
+        return scores
+    
+    def _rule_scores(self, signals: Dict) -> Dict:
+        """Scores derived from rule-based signals alone."""
+        scam = signals["scam_score"]
+        matched = [phrase for found in signals["matches"].values() for phrase in found]
+        if matched:
+            reasoning = "Matched scam patterns: " + ", ".join(matched[:8]) + "."
+        else:
+            reasoning = "No scam patterns matched."
+        
+        return {
+            "safe_probability": 1.0 - scam,
+            "scam_probability": scam,
+            "ai_generated": 0.0,
+            "reasoning": reasoning,
+            "risk_score": int(round(scam * 100)),
+            "ai_likelihood": 0.0,
+            "scam_intent": scam,
+            "urgency": signals["urgency"],
+            "financial_request": signals["financial_request"],
+            "impersonation": signals["impersonation"],
+            "urls": signals["urls"],
+            "phones": signals["phones"],
+            "tier": "local"
+        }
+    
+    def _merge_signals(self, scores: Dict, signals: Optional[Dict]) -> Dict:
+        """
+        Blend the rule-based signal scores into the model's as a weak prior.
+        
+        The model's reading wins: rule hits only weigh text_rules_weight,
+        so a keyword match cannot override a model that saw a legitimate
+        message, and the rules decide only signals the model did not score.
+        """
+        if signals is None:
+            return scores
+        merged = dict(scores)
+        weight = settings.text_rules_weight
+        for name in ("urgency", "financial_request", "impersonation"):
+            if name in scores:
+                merged[name] = (1.0 - weight) * scores[name] + weight * signals[name]
+            else:
+                merged[name] = signals[name]
+        merged["urls"] = signals["urls"]
+        merged["phones"] = signals["phones"]
+        return merged
+    
+    def _analyze_chunk(self, texts: List[str]) -> List[Dict]:
+        """Analyze one prompt's worth of texts (single texts use the full prompt)."""
+        if len(texts) == 1:
+            return [self.analyze(texts[0])]
+        return self.analyze_batch(texts)
+    
+    async def analyze_async(self, text: str) -> Dict:
+        """
+        Analyze text without blocking the event loop.
+        
+        Rule-based signals run first; they answer alone only when the
+        "local" text tier is enabled and they are conclusive.
+        Otherwise the text goes to Gemini on the bounded executor; with
+        micro-batching enabled, concurrent calls are coalesced into shared
+        batch prompts. Past the request deadline or while Gemini's circuit
+        is open, flagged rule-based scores are returned instead.
+        
+        Args:
+            text: Text content to analyze
             
-            # Convert to probabilities
-            risk_decimal = risk_score / 100.0
+        Returns:
+            Dict with analysis results including probabilities
+        """
+        signals = self._signals(text)
+        local = self._local_scores(signals)
+        if local is not None:
+            return local
+        
+        try:
+            if settings.text_microbatch_enabled:
+                if self._batcher is None:
+                    self._batcher = MicroBatcher(
+                        self._run_shared_chunk,
+                        max_batch_size=settings.text_batch_prompt_size,
+                        max_wait_ms=settings.text_microbatch_wait_ms
+                    )
+                scores = await wait_with_deadline(self._batcher.submit(text))
+            else:
+                scores = await wait_with_deadline(run_blocking("gemini", self.analyze, text))
+        except LOCAL_FALLBACK_ERRORS as e:
+            return self._degraded_scores(signals, e)
+        return self._merge_signals(scores, signals)
+    
+    async def analyze_batch_async(self, texts: List[str]) -> List[Dict]:
+        """
+        Analyze many texts, packing up to text_batch_prompt_size per prompt.
+        
+        Args:
+            texts: Text contents to analyze
             
-            if "SCAM" in verdict.upper() or "PHISHING" in verdict.upper():
-                return {
-                    "safe_probability": 1.0 - risk_decimal,
-                    "scam_probability": risk_decimal * 0.7,
-                    "ai_generated": risk_decimal * 0.3,
-                    "reasoning": reasoning,
-                    "risk_score": risk_score
-                }
-            elif "AI" in verdict.upper() or "GENERATED" in verdict.upper():
-                return {
-                    "safe_probability": 1.0 - risk_decimal,
-                    "scam_probability": risk_decimal * 0.2,
-                    "ai_generated": risk_decimal * 0.8,
-                    "reasoning": reasoning,
-                    "risk_score": risk_score
-                }
-            elif "SUSPICIOUS" in verdict.upper():
-                return {
-                    "safe_probability": 1.0 - risk_decimal,
-                    "scam_probability": risk_decimal * 0.5,
-                    "ai_generated": risk_decimal * 0.5,
-                    "reasoning": reasoning,
-                    "risk_score": risk_score
-                }
-            else:  # Legitimate
-                return {
-                    "safe_probability": 1.0 - risk_decimal,
-                    "scam_probability": risk_decimal * 0.5,
-                    "ai_generated": risk_decimal * 0.5,
-                    "reasoning": reasoning,
-                    "risk_score": risk_score
-                }
-                
-        except Exception as e:
-            print(f"Text analysis failed: {e}")
-            # Return uncertain results on error
-            return {
-                "safe_probability": 0.5,
-                "scam_probability": 0.25,
-                "ai_generated": 0.25,
-                "reasoning": f"Analysis failed: {str(e)}",
-                "risk_score": 50
-            }
+        Returns:
+            List of result dicts in the same order as texts
+        """
+        signals = [self._signals(text) for text in texts]
+        results: List[Optional[Dict]] = [self._local_scores(s) for s in signals]
+        pending = [i for i, result in enumerate(results) if result is None]
+        
+        size = settings.text_batch_prompt_size
+        remote = [texts[i] for i in pending]
+        chunks = [remote[i:i + size] for i in range(0, len(remote), size)]
+        try:
+            chunk_results = await wait_with_deadline(
+                asyncio.gather(*(self._run_chunk(chunk) for chunk in chunks))
+            )
+        except LOCAL_FALLBACK_ERRORS as e:
+            for i in pending:
+                results[i] = self._degraded_scores(signals[i], e)
+            return results
+        
+        flat = [result for chunk in chunk_results for result in chunk]
+        for i, scores in zip(pending, flat):
+            results[i] = self._merge_signals(scores, signals[i])
+        return results
+    
+    async def _run_chunk(self, texts: List[str]) -> List[Dict]:
+        """Run one chunk on the Gemini executor."""
+        return await run_blocking("gemini", self._analyze_chunk, texts)
+    
+    async def _run_shared_chunk(self, texts: List[str]) -> List[Dict]:
+        """Run a micro-batch; it serves several requests, so each caller enforces its own deadline."""
+        clear_deadline()
+        return await self._run_chunk(texts)
 
 
 # Singleton instance
@@ -2,13 +2,24 @@
 Sentinel AI - Video Analyzer
 Real AI-powered video deepfake detection using Google Gemini Vision API.
 """
-import os
+import time
 from pathlib import Path
-from typing import Dict
-import google.generativeai as genai
+from typing import Dict, List, Optional, Tuple
 import cv2
+import numpy as np
 import tempfile
 
+from app.config import settings
+from app.utils.cascade import Cascade
+from app.utils.circuit_breaker import LOCAL_FALLBACK_ERRORS
+from app.utils.clients import get_clients
+from app.utils.executor import run_blocking
+from app.utils.frame_selection import select_scene_frames
+from app.utils.media import prepare_frame
+from app.utils.metrics import observe_stage
+from app.utils.perceptual_hash import get_frame_index, phash, lookup_frames, add_frames
+from app.utils.response_parser import VideoVerdict, generate_structured
+
 
 class VideoAnalyzer:
     """
@@ -17,42 +28,117 @@ class VideoAnalyzer:
     """
     
     def __init__(self):
-        """Initialize the video analyzer with Gemini API."""
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        """Initialize the video analyzer with the shared Gemini client."""
+        self.model = get_clients().gemini_model()
         self.loaded = True
     
-    def _extract_frames(self, video_path: Path, num_frames: int = 5):
-        """Extract key frames from video for analysis."""
-        try:
-            cap = cv2.VideoCapture(str(video_path))
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            
-            if total_frames == 0:
-                return []
-            
-            # Extract frames at regular intervals
-            frame_indices = [int(i * total_frames / num_frames) for i in range(num_frames)]
-            frames = []
-            
-            for idx in frame_indices:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-                ret, frame = cap.read()
+    def _frame_indices(
+        self,
+        total_frames: int,
+        fps: float,
+        num_frames: int,
+        sample_fps: Optional[float] = None
+    ) -> List[int]:
+        """
+        Choose which frame indices to sample.
+        
+        Uniform over the clip by default; with sample_fps, one frame every
+        1/sample_fps seconds of container time, thinned evenly to num_frames.
+        """
+        if sample_fps and fps > 0:
+            step = max(1.0, fps / sample_fps)
+            indices = [int(i * step) for i in range(int(total_frames / step) + 1)]
+            indices = [idx for idx in indices if idx < total_frames]
+            if len(indices) > num_frames:
+                indices = [indices[int(i * len(indices) / num_frames)] for i in range(num_frames)]
+            return indices
+        
+        return sorted({int(i * total_frames / num_frames) for i in range(num_frames)})
+    
+    def _read_frames(self, cap: cv2.VideoCapture, indices: List[int]) -> List[np.ndarray]:
+        """Sequentially read the given sorted frame indices as RGB arrays."""
+        frames = []
+        targets = iter(indices)
+        next_target = next(targets, None)
+        idx = 0
+        
+        while next_target is not None:
+            if not cap.grab():
+                break
+            if idx == next_target:
+                ret, frame = cap.retrieve()
                 if ret:
                     # Convert BGR to RGB
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    frames.append(frame_rgb)
+                    frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                next_target = next(targets, None)
+            idx += 1
+        
+        return frames
+    
+    def _extract_frames(
+        self,
+        video_path: Path,
+        num_frames: int = 5,
+        sample_fps: Optional[float] = None,
+        strategy: str = "uniform",
+        require_faces: bool = False
+    ) -> Tuple[List[np.ndarray], Dict]:
+        """
+        Extract key frames from video for analysis in one sequential pass.
+        
+        Frames before each chosen index are only grabbed (no seek, no color
+        conversion or copy), chosen frames are retrieved, and decoding stops
+        after the last chosen frame. The "scene" strategy instead scores
+        evenly spaced candidates for scene change and keeps the best ones.
+        
+        Args:
+            video_path: Path to video file
+            num_frames: Maximum number of frames to return
+            sample_fps: Optional time-based sampling rate in frames per second
+            strategy: "uniform" or "scene"
+            require_faces: With "scene", prefer frames containing a face
             
-            cap.release()
-            return frames
+        Returns:
+            Tuple of (RGB frames, info dict with fps, total_frames,
+            duration_seconds and decode_ms)
+        """
+        info = {"fps": 0.0, "total_frames": 0, "duration_seconds": 0.0, "decode_ms": 0.0}
+        frames = []
+        start = time.perf_counter()
+        
+        try:
+            cap = cv2.VideoCapture(str(video_path))
+            try:
+                fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                info["fps"] = fps
+                info["total_frames"] = max(0, total_frames)
+                info["duration_seconds"] = total_frames / fps if fps > 0 and total_frames > 0 else 0.0
+                
+                if total_frames <= 0:
+                    return frames, info
+                
+                if strategy == "scene":
+                    frames = select_scene_frames(
+                        cap,
+                        total_frames,
+                        budget=num_frames,
+                        num_candidates=settings.video_scene_candidates,
+                        require_faces=require_faces
+                    )
+                else:
+                    indices = self._frame_indices(total_frames, fps, num_frames, sample_fps)
+                    frames = self._read_frames(cap, indices)
+            finally:
+                cap.release()
             
         except Exception as e:
             print(f"Frame extraction failed: {e}")
-            return []
+            return [], info
+        
+        info["decode_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        print(f"🎞️ Decoded {len(frames)} frames from {Path(video_path).name} in {info['decode_ms']} ms")
+        return frames, info
     
     def analyze(self, file_path: Path) -> Dict:
         """
@@ -65,15 +151,34 @@ class VideoAnalyzer:
             Dict with analysis results including probabilities
         """
         try:
-            from PIL import Image
-            import numpy as np
+            cascade = Cascade("video")
             
             # Extract key frames
-            frames = self._extract_frames(file_path, num_frames=3)
+            frames, frame_info = self._extract_frames(
+                file_path,
+                num_frames=settings.video_frame_budget,
+                sample_fps=settings.video_sample_fps,
+                strategy=settings.video_frame_selection,
+                require_faces=settings.video_require_faces
+            )
+            observe_stage("video", "decode", frame_info["decode_ms"] / 1000.0)
             
             if not frames:
                 raise Exception("Could not extract frames from video")
             
+            # Known near-duplicate clips reuse the stored verdict
+            frame_hashes = []
+            if settings.perceptual_index_enabled and cascade.enabled("similar"):
+                frame_hashes = [phash(frame) for frame in frames]
+                known = lookup_frames(get_frame_index(), frame_hashes)
+                if known is not None:
+                    # Keep the verdict, but describe this clip, not the stored one
+                    known = dict(known)
+                    known["frames_analyzed"] = len(frames)
+                    known["duration_seconds"] = frame_info["duration_seconds"]
+                    known["decode_ms"] = frame_info["decode_ms"]
+                    return cascade.answer("similar", known)
+            
             # Analyze frames with Gemini
             prompt = """Analyze these video frames for signs of deepfake or manipulation.
 
@@ -88,63 +193,54 @@ Look for:
 - Digital artifacts or glitches
 - Temporal inconsistencies between frames
 
-Provide analysis in this format:
-VERDICT: [Deepfake/Manipulated/Real]
-CONFIDENCE: [0-100]
-REASONING: [Specific observations about the video]
-
-Be thorough and mention specific frame issues if found."""
+Give your confidence in the verdict from 0 to 100. Be thorough and mention
+specific frame issues in the reasoning if found."""
 
-            # Convert frames to PIL Images
-            pil_frames = [Image.fromarray(frame) for frame in frames]
+            # Downscale and encode frames for upload
+            frame_blobs = [prepare_frame(frame) for frame in frames]
             
             # Send frames to Gemini
-            content = [prompt] + pil_frames
-            response = self.model.generate_content(content)
-            analysis_text = response.text
-            
-            # Parse response
-            verdict = "Real"
-            confidence = 50
-            reasoning = analysis_text
-            
-            if "VERDICT:" in analysis_text:
-                verdict_line = [line for line in analysis_text.split('\n') if 'VERDICT:' in line][0]
-                verdict = verdict_line.split('VERDICT:')[1].strip().split()[0]
-            
-            if "CONFIDENCE:" in analysis_text:
-                conf_line = [line for line in analysis_text.split('\n') if 'CONFIDENCE:' in line][0]
-                try:
-                    confidence = int(''.join(filter(str.isdigit, conf_line.split('CONFIDENCE:')[1])))
-                except:
-                    confidence = 50
-            
-            if "REASONING:" in analysis_text:
-                reasoning = analysis_text.split('REASONING:')[1].strip()
+            content = [prompt] + frame_blobs
+            parsed = generate_structured(self.model, content, VideoVerdict, modality="video")
+            verdict = parsed.verdict
+            confidence = parsed.confidence
+            reasoning = parsed.reasoning
             
             confidence_decimal = confidence / 100.0
             
             if "DEEPFAKE" in verdict.upper():
-                return {
+                result = {
                     "real_probability": 1.0 - confidence_decimal,
                     "deepfake_probability": confidence_decimal * 0.9,
                     "manipulated": confidence_decimal * 0.1,
                     "reasoning": reasoning
                 }
             elif "MANIPULATED" in verdict.upper() or "EDITED" in verdict.upper():
-                return {
+                result = {
                     "real_probability": 1.0 - confidence_decimal,
                     "deepfake_probability": confidence_decimal * 0.4,
                     "manipulated": confidence_decimal * 0.6,
                     "reasoning": reasoning
                 }
             else:  # Real
-                return {
+                result = {
                     "real_probability": confidence_decimal,
                     "deepfake_probability": (1.0 - confidence_decimal) * 0.5,
                     "manipulated": (1.0 - confidence_decimal) * 0.5,
                     "reasoning": reasoning
                 }
+            
+            # Fields read by the response builder
+            result["deepfake_likelihood"] = result["deepfake_probability"]
+            result["frames_analyzed"] = len(frames)
+            result["duration_seconds"] = frame_info["duration_seconds"]
+            result["decode_ms"] = frame_info["decode_ms"]
+            
+            # Remember the verdict for re-encoded copies of the same clip
+            if frame_hashes:
+                add_frames(get_frame_index(), frame_hashes, result)
+            
+            return cascade.answer("remote", result)
                 
         except Exception as e:
             print(f"Video analysis failed: {e}")
@@ -152,8 +248,27 @@ Be thorough and mention specific frame issues if found."""
                 "real_probability": 0.5,
                 "deepfake_probability": 0.25,
                 "manipulated": 0.25,
-                "reasoning": f"Analysis failed: {str(e)}"
+                "reasoning": f"Analysis failed: {str(e)}",
+                "deepfake_likelihood": 0.25,
+                "frames_analyzed": 0,
+                "duration_seconds": 0.0,
+                "degraded": isinstance(e, LOCAL_FALLBACK_ERRORS),
+                "failed": True
             }
+    
+    async def analyze_async(self, file_path: Path) -> Dict:
+        """
+        Analyze video without blocking the event loop.
+        
+        Runs :meth:`analyze` on the bounded Gemini executor.
+        
+        Args:
+            file_path: Path to video file
+            
+        Returns:
+            Dict with analysis results including probabilities
+        """
+        return await run_blocking("gemini", self.analyze, file_path)
 
 
 # Singleton instance
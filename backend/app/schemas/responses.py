@@ -3,9 +3,11 @@ Sentinel AI - Response Schemas
 Pydantic models for API responses.
 """
 from pydantic import BaseModel, Field
-from typing import List, Literal
+from typing import Annotated, Any, Dict, List, Literal, Optional
 from enum import Enum
 
+from app.config import settings
+
 
 class Verdict(str, Enum):
     """Possible verdicts for content analysis."""
@@ -41,6 +43,10 @@ class AnalysisResult(BaseModel):
         ..., 
         description="Type of content analyzed"
     )
+    degraded: bool = Field(
+        False,
+        description="True if the upstream model was unavailable or too slow and the result is based on local signals only"
+    )
     
     class Config:
         json_schema_extra = {
@@ -63,7 +69,7 @@ class TextAnalysisRequest(BaseModel):
     text: str = Field(
         ..., 
         min_length=1, 
-        max_length=10000,
+        max_length=settings.max_text_length,
         description="Text content to analyze"
     )
     
@@ -75,6 +81,26 @@ class TextAnalysisRequest(BaseModel):
         }
 
 
+class TextBatchRequest(BaseModel):
+    """Request body for batch text analysis."""
+    texts: List[Annotated[str, Field(min_length=1, max_length=settings.max_text_length)]] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Text contents to analyze"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "texts": [
+                    "Congratulations! You've won $1,000,000. Click here to claim your prize now!",
+                    "Hey, are we still on for lunch tomorrow?"
+                ]
+            }
+        }
+
+
 class TextAnalysisDetails(BaseModel):
     """Detailed classification results for text analysis."""
     ai_likelihood: float = Field(..., ge=0, le=1, description="Probability text is AI-generated")
@@ -82,6 +108,8 @@ class TextAnalysisDetails(BaseModel):
     urgency_level: float = Field(..., ge=0, le=1, description="Level of artificial urgency")
     financial_request: float = Field(..., ge=0, le=1, description="Presence of financial requests")
     impersonation: float = Field(..., ge=0, le=1, description="Signs of impersonation")
+    urls: List[str] = Field(default_factory=list, description="Links found in the text")
+    phone_numbers: List[str] = Field(default_factory=list, description="Phone numbers found in the text")
 
 
 class TextAnalysisResult(AnalysisResult):
@@ -89,6 +117,11 @@ class TextAnalysisResult(AnalysisResult):
     details: TextAnalysisDetails
 
 
+class TextBatchResult(BaseModel):
+    """Results for a batch text analysis, in request order."""
+    results: List[TextAnalysisResult]
+
+
 class AudioAnalysisDetails(BaseModel):
     """Detailed classification results for audio analysis."""
     human_voice: float = Field(..., ge=0, le=1, description="Probability of real human voice")
@@ -127,6 +160,24 @@ class VideoAnalysisResult(AnalysisResult):
     duration_seconds: float = Field(..., description="Duration of analyzed video")
 
 
+class JobSubmission(BaseModel):
+    """Returned when analysis is queued instead of run inline."""
+    job_id: str = Field(..., description="ID to poll with GET /jobs/{job_id}")
+    status: Literal["queued"] = Field("queued", description="Initial job status")
+    status_url: str = Field(..., description="URL to fetch the job status")
+
+
+class JobStatusResponse(BaseModel):
+    """Status of a queued analysis job."""
+    job_id: str = Field(..., description="Job ID")
+    status: Literal["queued", "running", "completed", "failed"] = Field(
+        ...,
+        description="Current job status"
+    )
+    result: Optional[Dict[str, Any]] = Field(None, description="Analysis result once completed")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+
+
 class ErrorResponse(BaseModel):
     """Error response model."""
     error: str = Field(..., description="Error message")
@@ -0,0 +1,184 @@
+"""
+Sentinel AI - Result Cache
+Content-addressed cache of analysis results with an in-process LRU tier
+and an optional shared Redis tier.
+"""
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text so trivially different copies hash the same.
+    
+    Applies NFKC normalization and collapses runs of whitespace.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def hash_text(text: str) -> str:
+    """Return the SHA-256 hex digest of normalized text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def make_cache_key(content_type: str, digest: str) -> str:
+    """Build a cache key for a content type and payload digest."""
+    return f"{content_type}:{digest}"
+
+
+class ResultCache:
+    """
+    Two-tier result cache.
+    
+    The local tier is an LRU with per-entry TTL bounded by entry count.
+    The Redis tier (if enabled) is shared across workers and uses native
+    key expiry. Redis errors are logged and treated as misses.
+    """
+    
+    REDIS_PREFIX = "sentinel:result:"
+    
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: int,
+        redis_url: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._redis = None
+        
+        if redis_url:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(redis_url)
+            
+        # Counters
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _get_local(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def _set_local(self, key: str, value: Dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    async def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached result.
+        
+        Args:
+            key: Cache key from make_cache_key
+            
+        Returns:
+            Cached result dict, or None on miss
+        """
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return value
+            
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(self.REDIS_PREFIX + key)
+            except Exception as e:
+                print(f"Redis cache get failed: {e}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self._set_local(key, value)
+                self.hits += 1
+                self.redis_hits += 1
+                return value
+                
+        self.misses += 1
+        return None
+    
+    async def set(self, key: str, value: Dict) -> None:
+        """
+        Store a result in every tier.
+        
+        Args:
+            key: Cache key from make_cache_key
+            value: JSON-serializable result dict
+        """
+        self._set_local(key, value)
+        
+        if self._redis is not None:
+            try:
+                await self._redis.set(
+                    self.REDIS_PREFIX + key,
+                    json.dumps(value),
+                    ex=self.ttl_seconds
+                )
+            except Exception as e:
+                print(f"Redis cache set failed: {e}")
+    
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class _DisabledCache(ResultCache):
+    """Cache stand-in used when caching is turned off."""
+    
+    def __init__(self):
+        super().__init__(max_entries=0, ttl_seconds=0)
+    
+    async def get(self, key: str) -> Optional[Dict]:
+        return None
+    
+    async def set(self, key: str, value: Dict) -> None:
+        return None
+
+
+# Singleton instance
+_cache = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get or create the result cache instance."""
+    global _cache
+    if _cache is None:
+        if not settings.cache_enabled:
+            _cache = _DisabledCache()
+        else:
+            _cache = ResultCache(
+                max_entries=settings.cache_max_entries,
+                ttl_seconds=settings.cache_ttl_seconds,
+                redis_url=settings.redis_url if settings.cache_redis_enabled else None
+            )
+    return _cache
@@ -0,0 +1,116 @@
+"""
+Sentinel AI - Analysis Cascade
+Cheap tiers (cache, similarity indexes, local models) answer before the
+remote model; every request records which tier answered and how long it took.
+"""
+import threading
+import time
+from typing import Dict, Tuple
+
+from app.config import settings
+
+
+# Tiers in the order they are tried; "remote" is always enabled
+TIERS = ("cache", "similar", "local", "remote")
+
+
+def tier_enabled(modality: str, tier: str) -> bool:
+    """Check whether a tier is configured for a modality."""
+    return tier == "remote" or tier in settings.cascade_tiers(modality)
+
+
+def is_confident(probability: float, band: Tuple[float, float]) -> bool:
+    """
+    Check whether a local probability may short-circuit the cascade.
+    
+    Args:
+        probability: Local model output
+        band: (low, high) escalation band; values strictly inside escalate
+        
+    Returns:
+        True if the probability is at or outside the band edges
+    """
+    low, high = band
+    return probability <= low or probability >= high
+
+
+class CascadeStats:
+    """Thread-safe per-modality counters of answering tier and latency."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._total_ms: Dict[Tuple[str, str], float] = {}
+    
+    def record(self, modality: str, tier: str, elapsed_ms: float) -> None:
+        key = (modality, tier)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._total_ms[key] = self._total_ms.get(key, 0.0) + elapsed_ms
+    
+    def stats(self) -> Dict:
+        """Requests and mean latency per modality and tier."""
+        with self._lock:
+            snapshot: Dict[str, Dict] = {}
+            for (modality, tier), count in self._counts.items():
+                snapshot.setdefault(modality, {})[tier] = {
+                    "requests": count,
+                    "avg_ms": round(self._total_ms[(modality, tier)] / count, 2)
+                }
+            return snapshot
+
+
+class Cascade:
+    """
+    One request's walk through the tiers of a modality.
+    
+    Usage::
+    
+        cascade = Cascade("image")
+        if cascade.enabled("similar"):
+            ...
+            return cascade.answer("similar", known)
+        ...
+        return cascade.answer("remote", result)
+    """
+    
+    def __init__(self, modality: str):
+        self.modality = modality
+        self.started = time.perf_counter()
+    
+    def enabled(self, tier: str) -> bool:
+        """Check whether a tier should be tried for this modality."""
+        return tier_enabled(self.modality, tier)
+    
+    def record(self, tier: str) -> None:
+        """Record that a tier answered this request."""
+        elapsed_ms = (time.perf_counter() - self.started) * 1000.0
+        get_cascade_stats().record(self.modality, tier, elapsed_ms)
+    
+    def answer(self, tier: str, result: Dict) -> Dict:
+        """
+        Record the answering tier and return a tagged copy of the result.
+        
+        Args:
+            tier: Tier that produced the result
+            result: Analyzer result or cached response payload
+            
+        Returns:
+            Copy of result with a ``tier`` key
+        """
+        self.record(tier)
+        answered = dict(result)
+        answered["tier"] = tier
+        return answered
+
+
+# Singleton instance
+_stats = None
+
+
+def get_cascade_stats() -> CascadeStats:
+    """Get or create the cascade statistics instance."""
+    global _stats
+    if _stats is None:
+        _stats = CascadeStats()
+    return _stats
@@ -0,0 +1,173 @@
+"""
+Sentinel AI - Circuit Breakers
+Per-backend breakers that stop calling an upstream while it is failing or
+slow, so analyzers answer from local signals immediately instead of
+waiting for timeouts.
+"""
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from app.config import settings
+from app.utils.deadline import DeadlineExceeded
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+# Errors after which analyzers fall back to local signals
+LOCAL_FALLBACK_ERRORS = (DeadlineExceeded, CircuitOpenError)
+
+
+# Slack for SDK timeouts that fire just after the request deadline
+DEADLINE_SLACK_SECONDS = 0.05
+
+
+def is_upstream_failure(status_code: Optional[int]) -> bool:
+    """
+    Count errors without a status (transport errors, timeouts) and 5xx.
+    
+    429s are left to the rate limiter, which backs off and retries them;
+    other 4xx are the caller's fault.
+    """
+    return status_code is None or status_code >= 500
+
+
+def is_caller_deadline(left: Optional[float]) -> bool:
+    """
+    Whether a failure happened once the caller's own deadline ran out.
+    
+    SDK timeouts are derived from the request deadline, so a short
+    X-Deadline-Ms ends in a timeout (or 504) that says nothing about the
+    upstream's health and must not feed the breaker.
+    
+    Args:
+        left: remaining() when the failure was seen
+    """
+    return left is not None and left <= DEADLINE_SLACK_SECONDS
+
+
+class CircuitBreaker:
+    """
+    Error-rate and latency based breaker for one backend.
+    
+    The last breaker_window calls are kept; once breaker_min_calls have
+    been seen and the share of failed or slow calls reaches
+    breaker_failure_rate, the breaker opens for breaker_open_seconds. It
+    then lets a single probe through (half-open): success closes it,
+    failure opens it again.
+    """
+    
+    def __init__(self, backend: str, slow_call_seconds: float):
+        self.backend = backend
+        self.slow_call_ms = slow_call_seconds * 1000.0
+        self._lock = threading.Lock()
+        self._outcomes: Deque[bool] = deque(maxlen=settings.breaker_window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        
+        # Counters
+        self.opened = 0
+        self.rejected = 0
+    
+    def allow(self) -> bool:
+        """Check whether a call may go to the upstream now."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN:
+                if now - self._opened_at < settings.breaker_open_seconds:
+                    self.rejected += 1
+                    return False
+                self._state = HALF_OPEN
+                self._probe_started = None
+                
+            if self._state == HALF_OPEN:
+                # One probe at a time; a probe that never reported back expires
+                if self._probe_started is not None and now - self._probe_started < settings.breaker_open_seconds:
+                    self.rejected += 1
+                    return False
+                self._probe_started = now
+            return True
+    
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a call may go to the upstream."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.backend} is unavailable (circuit open)")
+    
+    def record(self, ok: bool, elapsed_ms: float) -> None:
+        """
+        Record the outcome of an upstream call.
+        
+        Args:
+            ok: False if the call failed with an upstream error
+            elapsed_ms: Call latency; slow successes count as failures
+        """
+        failure = not ok or elapsed_ms > self.slow_call_ms
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failure:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    print(f"✅ {self.backend} circuit closed")
+                return
+                
+            self._outcomes.append(failure)
+            if (
+                self._state == CLOSED
+                and len(self._outcomes) >= settings.breaker_min_calls
+                and sum(self._outcomes) / len(self._outcomes) >= settings.breaker_failure_rate
+            ):
+                self._open()
+    
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_started = None
+        self.opened += 1
+        print(f"🔌 {self.backend} circuit opened; using local fallbacks for {settings.breaker_open_seconds:.0f}s")
+    
+    def stats(self) -> Dict:
+        """State, recent failure rate and counters."""
+        with self._lock:
+            return {
+                "state": self._state,
+                "failure_rate": round(sum(self._outcomes) / len(self._outcomes), 2) if self._outcomes else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected
+            }
+
+
+# One breaker per backend
+_breakers: Dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def get_breaker(backend: str) -> CircuitBreaker:
+    """Get or create the circuit breaker for an upstream backend."""
+    breaker = _breakers.get(backend)
+    if breaker is None:
+        with _lock:
+            breaker = _breakers.get(backend)
+            if breaker is None:
+                slow = {
+                    "gemini": settings.gemini_slow_call_seconds,
+                    "assemblyai": settings.assemblyai_slow_call_seconds,
+                }
+                breaker = CircuitBreaker(backend, slow.get(backend, settings.gemini_slow_call_seconds))
+                _breakers[backend] = breaker
+    return breaker
+
+
+def breaker_stats() -> Dict:
+    """Stats for every breaker created so far."""
+    return {backend: breaker.stats() for backend, breaker in list(_breakers.items())}
@@ -0,0 +1,161 @@
+"""
+Sentinel AI - Upstream Clients
+Process-wide Gemini and AssemblyAI clients. Each SDK is configured once
+and its connections are pooled and shared by every analyzer and thread.
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+import assemblyai as aai
+import google.generativeai as genai
+import httpx
+from google.api_core import retry
+
+from app.config import settings
+
+
+# Startup must not hang on an unreachable upstream
+WARMUP_TIMEOUT_SECONDS = 10.0
+
+
+def _http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional h2 package."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ClientManager:
+    """
+    Lazily configured, thread-safe holder of the upstream clients.
+    
+    Gemini is configured once per process; ``GenerativeModel`` instances
+    are cached by name and share the SDK's single gRPC (HTTP/2) channel.
+    AssemblyAI gets one client whose httpx connection pool is sized by
+    assemblyai_max_connections and uses HTTP/2 when available.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gemini_configured = False
+        self._models: Dict[str, genai.GenerativeModel] = {}
+        self._assemblyai: Optional[aai.Client] = None
+    
+    def _configure_gemini(self) -> None:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+        client_options = {"api_endpoint": settings.gemini_api_endpoint} if settings.gemini_api_endpoint else None
+        genai.configure(api_key=api_key, transport=settings.gemini_transport, client_options=client_options)
+        self._gemini_configured = True
+    
+    def gemini_model(self, name: Optional[str] = None) -> genai.GenerativeModel:
+        """
+        Get the shared Gemini model.
+        
+        Args:
+            name: Model name (default gemini_model)
+            
+        Returns:
+            A GenerativeModel bound to the process-wide client
+        """
+        name = name or settings.gemini_model
+        model = self._models.get(name)
+        if model is None:
+            with self._lock:
+                if not self._gemini_configured:
+                    self._configure_gemini()
+                model = self._models.get(name)
+                if model is None:
+                    model = genai.GenerativeModel(name)
+                    self._models[name] = model
+        return model
+    
+    def assemblyai(self) -> aai.Client:
+        """Get the shared AssemblyAI client with a pooled HTTP client."""
+        if self._assemblyai is None:
+            with self._lock:
+                if self._assemblyai is None:
+                    api_key = os.getenv("ASSEMBLYAI_API_KEY")
+                    if not api_key:
+                        raise ValueError("ASSEMBLYAI_API_KEY not found in environment variables")
+                    aai.settings.api_key = api_key
+                    if settings.assemblyai_base_url:
+                        aai.settings.base_url = settings.assemblyai_base_url
+                    
+                    client = aai.Client()
+                    # Swap the SDK's default connection pool for a sized,
+                    # long-lived one; base URL, auth headers and hooks carry over
+                    default_http = client.http_client
+                    client._http_client = self._pooled_http_client(default_http, settings.assemblyai_max_connections)
+                    default_http.close()
+                    self._assemblyai = client
+        return self._assemblyai
+    
+    def _pooled_http_client(self, template: httpx.Client, max_connections: int) -> httpx.Client:
+        """Build an httpx client like template with the configured pool."""
+        http2 = settings.upstream_http2 and _http2_available()
+        if settings.upstream_http2 and not http2:
+            print("⚠️  h2 is not installed; upstream connections use HTTP/1.1")
+        return httpx.Client(
+            base_url=template.base_url,
+            headers=template.headers,
+            timeout=template.timeout,
+            event_hooks=template.event_hooks,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=settings.upstream_keepalive_seconds
+            )
+        )
+    
+    def warm(self) -> None:
+        """
+        Configure the SDKs and open upstream connections ahead of traffic.
+        
+        Failures are logged and left for the first request to surface.
+        """
+        try:
+            # Fetching the model's metadata opens the Gemini channel
+            model = self.gemini_model()
+            genai.get_model(model.model_name, request_options={
+                "retry": retry.Retry(timeout=WARMUP_TIMEOUT_SECONDS),
+                "timeout": WARMUP_TIMEOUT_SECONDS
+            })
+            print(f"🔌 Gemini client ready ({settings.gemini_model}, {settings.gemini_transport})")
+        except Exception as e:
+            print(f"⚠️  Gemini warm-up failed: {e}")
+            
+        try:
+            # A one-item transcript listing opens a pooled AssemblyAI connection
+            self.assemblyai().http_client.get(
+                "/v2/transcript",
+                params={"limit": 1},
+                timeout=WARMUP_TIMEOUT_SECONDS
+            )
+            print("🔌 AssemblyAI client ready")
+        except Exception as e:
+            print(f"⚠️  AssemblyAI warm-up failed: {e}")
+    
+    def close(self) -> None:
+        """Close pooled connections."""
+        with self._lock:
+            if self._assemblyai is not None:
+                self._assemblyai.http_client.close()
+                self._assemblyai = None
+
+
+# Singleton instance
+_clients = None
+
+
+def get_clients() -> ClientManager:
+    """Get or create the upstream client manager."""
+    global _clients
+    if _clients is None:
+        _clients = ClientManager()
+    return _clients
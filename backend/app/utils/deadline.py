@@ -0,0 +1,101 @@
+"""
+Sentinel AI - Request Deadlines
+Per-request deadline carried in a context variable. It is set from the
+optional X-Deadline-Ms header and follows the request into executor
+threads, so upstream calls can give up in time.
+"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Optional, TypeVar
+
+from app.config import settings
+
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = b"x-deadline-ms"
+
+# Absolute time.monotonic() deadline of the current request, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("sentinel_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the current request's deadline has passed."""
+
+
+def clear_deadline() -> None:
+    """Remove the deadline from the current context."""
+    _deadline.set(None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline (may be negative), or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline() -> None:
+    """Raise DeadlineExceeded if the deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+async def wait_with_deadline(aw: Awaitable[T]) -> T:
+    """
+    Await aw, giving up when the current deadline passes.
+    
+    Args:
+        aw: Awaitable to wait for
+        
+    Returns:
+        Whatever aw returns
+        
+    Raises:
+        DeadlineExceeded: If the deadline passed first
+    """
+    left = remaining()
+    if left is None:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, max(0.0, left))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def _header_seconds(scope) -> Optional[float]:
+    """Deadline budget from the request header, falling back to the default."""
+    for name, value in scope.get("headers", ()):
+        if name == DEADLINE_HEADER:
+            try:
+                return max(0.0, float(value) / 1000.0)
+            except ValueError:
+                break
+    return settings.request_deadline_seconds
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware that starts the request deadline.
+    
+    Clients send the time they are willing to wait as ``X-Deadline-Ms``;
+    it is capped at request_deadline_max_seconds.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+            
+        seconds = _header_seconds(scope)
+        if seconds is not None:
+            seconds = min(seconds, settings.request_deadline_max_seconds)
+        token = _deadline.set(None if seconds is None else time.monotonic() + seconds)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
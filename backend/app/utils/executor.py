@@ -0,0 +1,119 @@
+"""
+Sentinel AI - Blocking Call Executors
+Bounded thread pools that keep slow upstream SDK calls off the event loop.
+"""
+import asyncio
+import contextvars
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.config import settings
+
+
+T = TypeVar("T")
+
+# One pool per upstream backend so a slow provider cannot starve the others
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+# CPU-bound local inference runs in processes to sidestep the GIL
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def pool_size(backend: str) -> int:
+    """Look up the configured worker count for a backend."""
+    sizes = {
+        "gemini": settings.gemini_max_workers,
+        "assemblyai": settings.assemblyai_max_workers,
+        "stt": settings.local_stt_workers,
+        # Up to two attempts per Gemini call plus one per transcription
+        "hedge": 2 * settings.gemini_max_workers + settings.assemblyai_max_workers,
+    }
+    return sizes.get(backend, settings.default_max_workers)
+
+
+def get_executor(backend: str) -> ThreadPoolExecutor:
+    """
+    Get or create the executor for a backend.
+    
+    Args:
+        backend: Backend name (gemini, assemblyai, ...)
+        
+    Returns:
+        The shared ThreadPoolExecutor for that backend
+    """
+    executor = _executors.get(backend)
+    if executor is None:
+        with _lock:
+            executor = _executors.get(backend)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=pool_size(backend),
+                    thread_name_prefix=f"sentinel-{backend}"
+                )
+                _executors[backend] = executor
+    return executor
+
+
+async def run_blocking(backend: str, func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a blocking callable on a backend's executor and await the result.
+    
+    The caller's context variables are copied into the worker thread so
+    request-scoped state survives the hop.
+    
+    Args:
+        backend: Backend name used to pick the executor
+        func: Blocking callable
+        *args: Positional arguments for func
+        
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(backend), ctx.run, func, *args)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get or create the shared process pool for CPU-bound local inference.
+    
+    Workers use the spawn start method so they do not inherit the
+    server's threads and locks.
+    
+    Returns:
+        The shared ProcessPoolExecutor
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=settings.local_inference_processes,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _process_pool
+
+
+def reset_process_pool() -> None:
+    """Drop a broken process pool so the next call starts a fresh one."""
+    global _process_pool
+    with _lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+def shutdown_executors(wait: bool = False) -> None:
+    """Shut down all executors, by default without waiting for queued work."""
+    global _process_pool
+    with _lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
+        _executors.clear()
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=wait, cancel_futures=True)
+            _process_pool = None
@@ -3,8 +3,17 @@ Sentinel AI - Explanation Generator
 Creates human-friendly, jargon-free explanations for analysis results.
 Target audience: 6th grade reading level (non-technical users).
 """
-from typing import List, Tuple
-from app.schemas.responses import Verdict
+from typing import Dict, List, Tuple
+from app.schemas.responses import (
+    Verdict,
+    TextAnalysisResult,
+    TextAnalysisDetails,
+    AudioAnalysisResult,
+    AudioAnalysisDetails,
+    VideoAnalysisResult,
+    VideoAnalysisDetails
+)
+from app.utils.metrics import timed_stage
 
 
 def get_verdict(risk_score: int) -> Verdict:
@@ -218,6 +227,7 @@ IMAGE_ACTIONS = {
 }
 
 
+@timed_stage("image", "explain")
 def explain_image_analysis(
     real_probability: float,
     ai_generated: float,
@@ -319,3 +329,98 @@ def explain_video_analysis(
     action = VIDEO_ACTIONS[verdict]
     
     return risk_score, explanations, action
+
+
+# =============================================================================
+# Response Builders
+# =============================================================================
+
+@timed_stage("text", "explain")
+def build_text_result(scores: Dict) -> TextAnalysisResult:
+    """
+    Explain raw text analyzer scores and build the API response.
+    
+    Shared by the single and batch text routes.
+    """
+    risk_score, explanations, action = explain_text_analysis(
+        ai_likelihood=scores["ai_likelihood"],
+        scam_intent=scores["scam_intent"],
+        urgency=scores["urgency"],
+        financial=scores["financial_request"],
+        impersonation=scores["impersonation"]
+    )
+    
+    return TextAnalysisResult(
+        risk_score=risk_score,
+        verdict=get_verdict(risk_score),
+        explanations=explanations,
+        action=action,
+        content_type="text",
+        degraded=scores.get("degraded", False),
+        details=TextAnalysisDetails(
+            ai_likelihood=scores["ai_likelihood"],
+            scam_intent=scores["scam_intent"],
+            urgency_level=scores["urgency"],
+            financial_request=scores["financial_request"],
+            impersonation=scores["impersonation"],
+            urls=scores.get("urls", []),
+            phone_numbers=scores.get("phones", [])
+        )
+    )
+
+
+@timed_stage("audio", "explain")
+def build_audio_result(result: Dict) -> AudioAnalysisResult:
+    """
+    Explain raw audio analyzer output and build the API response.
+    
+    Shared by the inline route and the Celery worker.
+    """
+    risk_score, explanations, action = explain_audio_analysis(
+        human_voice=result["human_voice"],
+        tts_likelihood=result["tts_likelihood"],
+        voice_cloning=result["voice_cloning"]
+    )
+    
+    return AudioAnalysisResult(
+        risk_score=risk_score,
+        verdict=get_verdict(risk_score),
+        explanations=explanations,
+        action=action,
+        content_type="audio",
+        degraded=result.get("degraded", False),
+        details=AudioAnalysisDetails(
+            human_voice=result["human_voice"],
+            tts_likelihood=result["tts_likelihood"],
+            voice_cloning=result["voice_cloning"]
+        ),
+        duration_seconds=result["duration_seconds"]
+    )
+
+
+@timed_stage("video", "explain")
+def build_video_result(result: Dict) -> VideoAnalysisResult:
+    """
+    Explain raw video analyzer output and build the API response.
+    
+    Shared by the inline route and the Celery worker.
+    """
+    risk_score, explanations, action = explain_video_analysis(
+        real_probability=result["real_probability"],
+        deepfake_likelihood=result["deepfake_likelihood"]
+    )
+    
+    return VideoAnalysisResult(
+        risk_score=risk_score,
+        verdict=get_verdict(risk_score),
+        explanations=explanations,
+        action=action,
+        content_type="video",
+        degraded=result.get("degraded", False),
+        details=VideoAnalysisDetails(
+            real_probability=result["real_probability"],
+            deepfake_likelihood=result["deepfake_likelihood"],
+            frames_analyzed=result["frames_analyzed"]
+        ),
+        duration_seconds=result["duration_seconds"]
+    )
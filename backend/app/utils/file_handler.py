@@ -2,15 +2,18 @@
 Sentinel AI - File Handler Utility
 Handles file uploads, validation, and cleanup.
 """
+import hashlib
+import io
 import os
 import time
 import uuid
 import aiofiles
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import BinaryIO, Tuple, Optional, Union
 from fastapi import UploadFile, HTTPException
 
 from app.config import settings
+from app.utils.metrics import count_upload_bytes, observe_stage, time_stage
 
 
 # Allowed file extensions by type
@@ -27,6 +30,16 @@ MIME_TYPES = {
     "video": {"video/mp4", "video/quicktime", "video/x-msvideo", "video/webm"}
 }
 
+# Container formats accepted per type, as detected from magic bytes
+MAGIC_FORMATS = {
+    "image": {"jpeg", "png"},
+    "audio": {"mp3", "wav", "ogg", "mp4"},
+    "video": {"mp4", "avi", "webm"}
+}
+
+# QuickTime files without an ftyp box start with one of these atoms
+_QUICKTIME_ATOMS = {b"moov", b"mdat", b"wide", b"free", b"skip"}
+
 
 def validate_file_type(file: UploadFile, expected_type: str) -> bool:
     """
@@ -60,6 +73,171 @@ def validate_file_type(file: UploadFile, expected_type: str) -> bool:
     return True
 
 
+def sniff_format(head: bytes) -> Optional[str]:
+    """
+    Detect the container format from the first bytes of a file.
+    
+    Args:
+        head: Leading bytes of the file (at least 12 for a reliable match)
+        
+    Returns:
+        Format name (jpeg, png, mp3, wav, ogg, mp4, avi, webm) or None
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head.startswith(b"RIFF") and head[8:12] == b"WAVE":
+        return "wav"
+    if head.startswith(b"RIFF") and head[8:12] == b"AVI ":
+        return "avi"
+    if head.startswith(b"OggS"):
+        return "ogg"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm"
+    if head[4:8] == b"ftyp" or head[4:8] in _QUICKTIME_ATOMS:
+        return "mp4"
+    if head.startswith(b"ID3") or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+class SpooledUpload:
+    """
+    An upload held in memory up to a threshold and spilled to disk beyond it.
+    
+    Small payloads never touch disk; large ones are streamed straight into
+    ``upload_dir``. Callers that need a real path (OpenCV, AssemblyAI,
+    Celery workers) call :meth:`materialize`.
+    """
+    
+    def __init__(self, ext: str, threshold: int, file_type: Optional[str] = None):
+        self.file_id = str(uuid.uuid4())
+        self.ext = ext
+        self.threshold = threshold
+        self.file_type = file_type
+        self.digest = ""
+        self.size = 0
+        self.disk_write_seconds = 0.0
+        self.path: Optional[Path] = None
+        self._data = b""
+        self._buffer = io.BytesIO()
+        self._disk = None
+    
+    @property
+    def in_memory(self) -> bool:
+        """True while the payload has not been written to disk."""
+        return self.path is None
+    
+    @property
+    def source(self) -> Union[Path, BinaryIO]:
+        """The file path if on disk, otherwise a file object over the bytes."""
+        if self.path is not None:
+            return self.path
+        return io.BytesIO(self._data)
+    
+    async def write(self, chunk: bytes) -> None:
+        """Append a chunk, spilling to disk once the threshold is crossed."""
+        if self._disk is None and self._buffer.tell() + len(chunk) <= self.threshold:
+            self._buffer.write(chunk)
+            return
+            
+        start = time.perf_counter()
+        if self._disk is None:
+            self.path = settings.upload_dir / f"{self.file_id}{self.ext}"
+            self._disk = await aiofiles.open(self.path, "wb")
+            await self._disk.write(self._buffer.getvalue())
+            self._buffer = io.BytesIO()
+        await self._disk.write(chunk)
+        self.disk_write_seconds += time.perf_counter() - start
+    
+    async def close(self) -> None:
+        """Finish writing; the payload becomes readable via :attr:`source`."""
+        if self._disk is not None:
+            start = time.perf_counter()
+            await self._disk.close()
+            self._disk = None
+            self.disk_write_seconds += time.perf_counter() - start
+        self._data = self._buffer.getvalue()
+        self._buffer = io.BytesIO()
+    
+    async def materialize(self) -> Path:
+        """
+        Make sure the payload exists on disk.
+        
+        Returns:
+            Path to the file in upload_dir
+        """
+        if self.path is None:
+            path = settings.upload_dir / f"{self.file_id}{self.ext}"
+            with time_stage(self.file_type, "disk_write"):
+                async with aiofiles.open(path, "wb") as f:
+                    await f.write(self._data)
+            self.path = path
+            self._data = b""
+        return self.path
+    
+    def discard(self) -> None:
+        """Drop the in-memory copy and delete any file on disk."""
+        self._data = b""
+        if self.path is not None:
+            delete_file(self.path)
+
+
+async def spool_upload(file: UploadFile, file_type: str) -> SpooledUpload:
+    """
+    Validate and buffer an upload, hashing it as it is read.
+    
+    The size limit and a magic-byte check on the first chunk are enforced
+    while streaming, so bad uploads are rejected before being buffered.
+    Time spent writing to disk is recorded as the "disk_write" stage and
+    the rest as "receive".
+    
+    Args:
+        file: The uploaded file
+        file_type: Type of file (image, audio, video)
+        
+    Returns:
+        SpooledUpload with digest and size filled in
+    """
+    validate_file_type(file, file_type)
+    
+    ext = Path(file.filename).suffix.lower()
+    upload = SpooledUpload(ext, settings.upload_spool_threshold_mb * 1024 * 1024, file_type)
+    digest = hashlib.sha256()
+    max_size = settings.max_upload_size_mb * 1024 * 1024
+    start = time.perf_counter()
+    
+    try:
+        while chunk := await file.read(1024 * 1024):  # 1MB chunks
+            if upload.size == 0 and sniff_format(chunk) not in MAGIC_FORMATS[file_type]:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"File content is not a supported {file_type} format"
+                )
+            upload.size += len(chunk)
+            if upload.size > max_size:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large. Maximum size: {settings.max_upload_size_mb}MB"
+                )
+            digest.update(chunk)
+            await upload.write(chunk)
+        await upload.close()
+    except Exception:
+        await upload.close()
+        upload.discard()
+        raise
+        
+    upload.digest = digest.hexdigest()
+    
+    count_upload_bytes(file_type, upload.size)
+    observe_stage(file_type, "receive", time.perf_counter() - start - upload.disk_write_seconds)
+    if upload.disk_write_seconds:
+        observe_stage(file_type, "disk_write", upload.disk_write_seconds)
+    return upload
+
+
 async def save_upload(file: UploadFile, file_type: str) -> Tuple[Path, str]:
     """
     Save an uploaded file to disk.
@@ -120,26 +298,49 @@ def delete_file(file_path: Path) -> bool:
         return False
 
 
+def job_upload_dir() -> Path:
+    """
+    Directory for the inputs of queued analysis jobs.
+    
+    The Celery task deletes its file when done; cleanup only removes files
+    here after job_file_retention_seconds, as a safety net.
+    """
+    path = settings.upload_dir / "jobs"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _delete_older_than(directory: Path, retention: float, now: float) -> int:
+    deleted = 0
+    for file_path in directory.iterdir():
+        if file_path.is_file():
+            file_age = now - file_path.stat().st_mtime
+            if file_age > retention:
+                if delete_file(file_path):
+                    deleted += 1
+    return deleted
+
+
 def cleanup_old_files() -> int:
     """
     Clean up files older than the retention period.
     
+    Inputs of queued jobs live in a subdirectory with the longer
+    job_file_retention_seconds, so they are not removed before a worker
+    picks them up.
+    
     Returns:
         Number of files deleted
     """
-    deleted = 0
     current_time = time.time()
-    retention = settings.file_retention_seconds
     
     if not settings.upload_dir.exists():
         return 0
     
-    for file_path in settings.upload_dir.iterdir():
-        if file_path.is_file():
-            file_age = current_time - file_path.stat().st_mtime
-            if file_age > retention:
-                if delete_file(file_path):
-                    deleted += 1
+    deleted = _delete_older_than(settings.upload_dir, settings.file_retention_seconds, current_time)
+    jobs_dir = settings.upload_dir / "jobs"
+    if jobs_dir.is_dir():
+        deleted += _delete_older_than(jobs_dir, settings.job_file_retention_seconds, current_time)
     
     if deleted > 0:
         print(f"🧹 Cleaned up {deleted} old files")
@@ -0,0 +1,131 @@
+"""
+Sentinel AI - Frame Selection
+Picks the most informative video frames (scene changes, optionally only
+frames with faces) in a single sequential decode pass.
+"""
+import heapq
+import threading
+from typing import List
+
+import cv2
+import numpy as np
+
+
+# Candidates are compared on small grayscale thumbnails
+_THUMB_SIZE = (64, 36)
+_HIST_BINS = 32
+_FACE_DETECT_WIDTH = 320
+
+_local = threading.local()
+
+
+def _face_detector() -> cv2.CascadeClassifier:
+    """Per-thread Haar face detector (CascadeClassifier is not thread-safe)."""
+    detector = getattr(_local, "face_detector", None)
+    if detector is None:
+        detector = cv2.CascadeClassifier(
+            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        )
+        _local.face_detector = detector
+    return detector
+
+
+def has_face(frame_bgr: np.ndarray) -> bool:
+    """Return True if the OpenCV frontal-face detector finds a face."""
+    height, width = frame_bgr.shape[:2]
+    scale = min(1.0, _FACE_DETECT_WIDTH / float(width))
+    gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+    if scale < 1.0:
+        gray = cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    faces = _face_detector().detectMultiScale(gray, scaleFactor=1.2, minNeighbors=4, minSize=(24, 24))
+    return len(faces) > 0
+
+
+def _signature(frame_bgr: np.ndarray):
+    """Thumbnail and normalized histogram used for change scoring."""
+    thumb = cv2.cvtColor(
+        cv2.resize(frame_bgr, _THUMB_SIZE, interpolation=cv2.INTER_AREA),
+        cv2.COLOR_BGR2GRAY
+    ).astype(np.float32)
+    hist = np.histogram(thumb, bins=_HIST_BINS, range=(0, 256))[0].astype(np.float32)
+    hist /= hist.sum() or 1.0
+    return thumb, hist
+
+
+def change_score(prev, curr) -> float:
+    """
+    Score how different a frame is from the previous candidate.
+
+    Mean absolute pixel difference (0-1) plus histogram total variation
+    distance (0-1), so both motion/warping and cuts/lighting changes count.
+    """
+    prev_thumb, prev_hist = prev
+    thumb, hist = curr
+    pixel_diff = float(np.mean(np.abs(thumb - prev_thumb))) / 255.0
+    hist_diff = 0.5 * float(np.abs(hist - prev_hist).sum())
+    return pixel_diff + hist_diff
+
+
+def select_scene_frames(
+    cap: cv2.VideoCapture,
+    total_frames: int,
+    budget: int,
+    num_candidates: int = 48,
+    require_faces: bool = False
+) -> List[np.ndarray]:
+    """
+    Select up to ``budget`` frames with the largest change scores.
+
+    Every ``total_frames / num_candidates``-th frame is a candidate; other
+    frames are only grabbed. The first candidate is always kept as the
+    reference frame. With require_faces, frames without a detected face are
+    skipped unless no frame in the clip has one.
+
+    Args:
+        cap: Opened capture positioned at the first frame
+        total_frames: Frame count from container metadata
+        budget: Maximum number of frames to return
+        num_candidates: Number of evenly spaced candidate frames to score
+        require_faces: Prefer frames that contain a face
+
+    Returns:
+        Selected RGB frames in temporal order
+    """
+    stride = max(1, total_frames // max(1, num_candidates))
+
+    # Min-heaps of (score, index, frame) holding the best candidates so far
+    best: list = []
+    best_faces: list = []
+    prev_sig = None
+    idx = 0
+
+    while idx < total_frames:
+        if not cap.grab():
+            break
+        if idx % stride == 0:
+            ret, frame = cap.retrieve()
+            if ret:
+                sig = _signature(frame)
+                score = float("inf") if prev_sig is None else change_score(prev_sig, sig)
+                prev_sig = sig
+
+                entry = (score, idx, frame)
+                _push_bounded(best, entry, budget)
+                if require_faces and _would_enter(best_faces, score, budget) and has_face(frame):
+                    _push_bounded(best_faces, entry, budget)
+        idx += 1
+
+    chosen = best_faces if require_faces and best_faces else best
+    chosen = sorted(chosen, key=lambda item: item[1])
+    return [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for _, _, frame in chosen]
+
+
+def _would_enter(heap: list, score: float, size: int) -> bool:
+    return len(heap) < size or score > heap[0][0]
+
+
+def _push_bounded(heap: list, entry, size: int) -> None:
+    if len(heap) < size:
+        heapq.heappush(heap, entry)
+    elif entry[0] > heap[0][0]:
+        heapq.heapreplace(heap, entry)
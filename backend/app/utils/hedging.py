@@ -0,0 +1,229 @@
+"""
+Sentinel AI - Hedged Upstream Calls
+Deadline-bounded upstream calls that fire a second request once the first
+has taken longer than the observed p95 latency, keep whichever answers
+first and cancel the other.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+
+import numpy as np
+
+from app.config import settings
+from app.utils.circuit_breaker import get_breaker, is_caller_deadline, is_upstream_failure
+from app.utils.deadline import DeadlineExceeded, check_deadline, remaining
+from app.utils.executor import get_executor
+from app.utils.metrics import time_stage
+from app.utils.rate_limiter import call_upstream, get_limiter, status_code
+
+
+T = TypeVar("T")
+
+
+class HedgeCancelled(Exception):
+    """Raised inside a losing attempt that had not reached the upstream yet."""
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies plus hedging counters, per key."""
+    
+    def __init__(self, window: int):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+    
+    def record(self, key: str, elapsed_ms: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(elapsed_ms)
+    
+    def count(self, key: str, event: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(key, {"hedged": 0, "hedge_wins": 0, "deadline_exceeded": 0})
+            counters[event] += 1
+    
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        """q-th percentile latency in ms, or None with too few samples."""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None or len(samples) < settings.hedge_min_samples:
+                return None
+            values = list(samples)
+        return float(np.percentile(values, q))
+    
+    def stats(self) -> Dict:
+        """Latency percentiles and hedging counters per key."""
+        with self._lock:
+            keys = set(self._samples) | set(self._counters)
+            snapshot = {key: list(self._samples.get(key, ())) for key in keys}
+            counters = {key: dict(self._counters.get(key, {})) for key in keys}
+        result = {}
+        for key in sorted(keys):
+            values = snapshot[key]
+            result[key] = {
+                "samples": len(values),
+                "p50_ms": round(float(np.percentile(values, 50)), 2) if values else None,
+                "p95_ms": round(float(np.percentile(values, 95)), 2) if values else None,
+                **counters[key]
+            }
+        return result
+
+
+def _attempt(
+    backend: str,
+    key: str,
+    cancelled: threading.Event,
+    func: Callable[..., T],
+    *args: Any,
+    **kwargs: Any
+) -> T:
+    """
+    Run one attempt once admitted by the limiter, unless it already lost.
+    
+    Latency and upstream failures feed the tracker and circuit breaker;
+    failures caused by the caller's own deadline are not recorded.
+    """
+    if cancelled.is_set():
+        raise HedgeCancelled()
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        if (
+            settings.breaker_enabled
+            and is_upstream_failure(status_code(e))
+            and not is_caller_deadline(remaining())
+        ):
+            get_breaker(backend).record(False, (time.perf_counter() - start) * 1000.0)
+        raise
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    get_latency_tracker().record(key, elapsed_ms)
+    if settings.breaker_enabled:
+        get_breaker(backend).record(True, elapsed_ms)
+    return result
+
+
+def _hedge_delay(key: str) -> Optional[float]:
+    """Seconds to wait before hedging, or None if this call is not hedged."""
+    if not settings.hedging_enabled:
+        return None
+    p = get_latency_tracker().percentile(key, settings.hedge_percentile)
+    return None if p is None else p / 1000.0
+
+
+def upstream_call(
+    backend: str,
+    func: Callable[..., T],
+    *args: Any,
+    modality: Optional[str] = None,
+    hedge: bool = True,
+    latency_key: Optional[str] = None,
+    **kwargs: Any
+) -> T:
+    """
+    Call an upstream through its limiter, bounded by the request deadline
+    and hedged after the p95 latency.
+    
+    Calls to a backend whose circuit breaker is open fail immediately;
+    the others are timed as the "upstream" stage of the modality.
+    Without a deadline or a hedge delay the call runs in the calling
+    thread. Otherwise attempts run on the "hedge" executor: a second
+    attempt starts after the p95 delay if the backend's limiter has spare
+    capacity, the first success wins, and the loser is cancelled (before
+    it reaches the upstream if it is still queued; an in-flight loser's
+    result is discarded).
+    
+    Args:
+        backend: Backend name (gemini, assemblyai)
+        func: Blocking SDK call
+        *args: Positional arguments for func
+        modality: Requesting modality, used for queue priority
+        hedge: Allow a second attempt (disable for non-idempotent or costly calls)
+        latency_key: Latency bucket (default "backend:modality")
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        Whatever func returns
+        
+    Raises:
+        DeadlineExceeded: If the deadline passed before any attempt succeeded
+        CircuitOpenError: If the backend's circuit breaker is open
+    """
+    check_deadline()
+    if settings.breaker_enabled:
+        get_breaker(backend).check()
+    with time_stage(modality, "upstream"):
+        key = latency_key or f"{backend}:{modality}"
+        delay = _hedge_delay(key) if hedge else None
+        tracker = get_latency_tracker()
+        
+        if delay is None and remaining() is None:
+            return call_upstream(
+                backend, _attempt, backend, key, threading.Event(), func, *args, modality=modality, **kwargs
+            )
+            
+        executor = get_executor("hedge")
+        cancelled = threading.Event()
+        
+        def submit() -> Future:
+            ctx = contextvars.copy_context()
+            return executor.submit(
+                ctx.run, call_upstream, backend, _attempt, backend, key, cancelled, func, *args,
+                modality=modality,
+                **kwargs
+            )
+            
+        attempts: List[Future] = [submit()]
+        pending = set(attempts)
+        error: Optional[BaseException] = None
+        
+        try:
+            # Hedge once the first attempt is slower than usual
+            if delay is not None:
+                left = remaining()
+                done, pending = wait(pending, timeout=delay if left is None else max(0.0, min(delay, left)))
+                if not done and (remaining() is None or remaining() > 0) and get_limiter(backend).has_spare_capacity():
+                    tracker.count(key, "hedged")
+                    hedge_future = submit()
+                    attempts.append(hedge_future)
+                    pending.add(hedge_future)
+                pending |= done
+                
+            while pending:
+                left = remaining()
+                done, pending = wait(pending, timeout=None if left is None else max(0.0, left), return_when=FIRST_COMPLETED)
+                if not done:
+                    tracker.count(key, "deadline_exceeded")
+                    raise DeadlineExceeded(f"{backend} call exceeded the request deadline")
+                for future in done:
+                    if future.exception() is None:
+                        if len(attempts) > 1 and future is attempts[1]:
+                            tracker.count(key, "hedge_wins")
+                        return future.result()
+                    error = future.exception()
+                    
+            raise error
+        finally:
+            # Losers still waiting for a slot never reach the upstream
+            cancelled.set()
+            for future in attempts:
+                future.cancel()
+
+
+# Singleton instance
+_tracker = None
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Get or create the upstream latency tracker."""
+    global _tracker
+    if _tracker is None:
+        _tracker = LatencyTracker(settings.hedge_window)
+    return _tracker
@@ -0,0 +1,100 @@
+"""
+Sentinel AI - Media Preprocessing
+Downscales, strips metadata from and re-encodes images and video frames
+before they are sent upstream.
+"""
+import io
+from pathlib import Path
+from typing import BinaryIO, Dict, Tuple, Union
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+from app.config import settings
+
+
+MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp"
+}
+
+
+def load_image(source: Union[Path, BinaryIO], max_edge: int) -> Image.Image:
+    """
+    Decode an image at (roughly) its target size.
+    
+    JPEGs use Pillow's draft mode so the decoder itself downscales by a
+    power of two, which avoids materializing the full-resolution bitmap.
+    
+    Args:
+        source: Path or binary file object
+        max_edge: Longest allowed edge in pixels
+        
+    Returns:
+        RGB image no larger than max_edge on either side
+    """
+    img = Image.open(source)
+    if img.format == "JPEG":
+        img.draft("RGB", (max_edge, max_edge))
+        
+    # Apply EXIF orientation before the metadata is dropped
+    img = ImageOps.exif_transpose(img)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+        
+    img.thumbnail((max_edge, max_edge), Image.LANCZOS, reducing_gap=2.0)
+    return img
+
+
+def encode_image(img: Image.Image, fmt: str, quality: int) -> Dict:
+    """
+    Re-encode an image as a compact blob without any metadata.
+    
+    Returns:
+        Dict with mime_type and data, accepted as a Gemini content part
+    """
+    fmt = fmt.upper()
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, quality=quality)
+    return {"mime_type": MIME_TYPES[fmt], "data": buffer.getvalue()}
+
+
+def prepare_image(source: Union[Path, BinaryIO]) -> Tuple[Image.Image, Dict]:
+    """
+    Load and re-encode an uploaded image using the configured limits.
+    
+    Returns:
+        Tuple of (downscaled RGB image, upload blob)
+    """
+    img = load_image(source, settings.media_max_edge)
+    return img, encode_image(img, settings.media_format, settings.media_quality)
+
+
+def prepare_frame(frame_rgb: np.ndarray) -> Dict:
+    """
+    Downscale and encode a video frame using the configured limits.
+    
+    Args:
+        frame_rgb: RGB frame as a numpy array
+        
+    Returns:
+        Dict with mime_type and data, accepted as a Gemini content part
+    """
+    max_edge = settings.video_frame_max_edge
+    height, width = frame_rgb.shape[:2]
+    scale = max_edge / float(max(height, width))
+    if scale < 1.0:
+        frame_rgb = cv2.resize(
+            frame_rgb,
+            (int(width * scale), int(height * scale)),
+            interpolation=cv2.INTER_AREA
+        )
+        
+    fmt = settings.media_format.upper()
+    ext = ".webp" if fmt == "WEBP" else ".jpg"
+    flag = cv2.IMWRITE_WEBP_QUALITY if fmt == "WEBP" else cv2.IMWRITE_JPEG_QUALITY
+    ok, encoded = cv2.imencode(ext, cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR), [flag, settings.media_quality])
+    if not ok:
+        raise ValueError("Could not encode video frame")
+    return {"mime_type": MIME_TYPES[fmt], "data": encoded.tobytes()}
@@ -0,0 +1,210 @@
+"""
+Sentinel AI - Media Duration Probe
+Reads audio and video durations from container headers right after the
+upload, so over-long media is rejected (or trimmed) before transcription,
+frame extraction or any upstream call.
+"""
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from app.config import settings
+from app.utils.file_handler import delete_file
+from app.utils.metrics import observe_stage
+
+
+class MediaTooLongError(ValueError):
+    """Raised when media exceeds the configured duration limit."""
+
+
+def max_duration(file_type: str) -> float:
+    """Configured duration limit for a media type."""
+    if file_type == "audio":
+        return float(settings.max_audio_duration_seconds)
+    return float(settings.max_video_duration_seconds)
+
+
+def _stream_audio_duration(path: Path, limit: Optional[float]) -> Optional[float]:
+    """Decode through audioread until the limit is passed (formats libsndfile cannot read)."""
+    try:
+        import audioread
+    except ImportError:
+        return None
+        
+    with audioread.audio_open(str(path)) as f:
+        bytes_per_second = f.samplerate * f.channels * 2  # 16-bit PCM buffers
+        decoded = 0
+        for buf in f:
+            decoded += len(buf)
+            # Anything past the limit is enough to reject or trim
+            if limit is not None and decoded > (limit + 1.0) * bytes_per_second:
+                break
+        return decoded / float(bytes_per_second)
+
+
+def probe_audio_duration(path: Path, limit: Optional[float] = None) -> Optional[float]:
+    """
+    Audio duration in seconds.
+    
+    Reads the header through libsndfile (WAV, FLAC, OGG, MP3) and falls
+    back to a streaming decode that stops once the limit is exceeded.
+    
+    Args:
+        path: Audio file
+        limit: Stop streaming decodes past this many seconds
+        
+    Returns:
+        Duration, or None if the file could not be read
+    """
+    import soundfile as sf
+    
+    try:
+        info = sf.info(str(path))
+        if info.samplerate > 0 and info.frames > 0:
+            return info.frames / float(info.samplerate)
+    except Exception:
+        pass
+        
+    try:
+        return _stream_audio_duration(path, limit)
+    except Exception as e:
+        print(f"Audio duration probe failed: {e}")
+        return None
+
+
+def probe_video_duration(path: Path, limit: Optional[float] = None) -> Optional[float]:
+    """
+    Video duration in seconds.
+    
+    Uses the container's frame count and frame rate; without them, frames
+    are grabbed (not converted) until the timestamp passes the limit.
+    
+    Args:
+        path: Video file
+        limit: Stop streaming past this many seconds
+        
+    Returns:
+        Duration, or None if the file could not be opened
+    """
+    cap = cv2.VideoCapture(str(path))
+    try:
+        if not cap.isOpened():
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        total_frames = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+        if fps > 0 and total_frames > 0:
+            return total_frames / fps
+            
+        position = 0.0
+        while cap.grab():
+            position = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if limit is not None and position > limit + 1.0:
+                break
+        return position or None
+    finally:
+        cap.release()
+
+
+def trim_audio(path: Path, seconds: float) -> Path:
+    """
+    Keep the first seconds of an audio file, re-written as 16-bit WAV.
+    
+    Returns:
+        Path of the trimmed file (the original is deleted)
+    """
+    import soundfile as sf
+    
+    target = path.with_name(f"{path.stem}-trimmed.wav")
+    try:
+        info = sf.info(str(path))
+        data, samplerate = sf.read(str(path), frames=int(seconds * info.samplerate), dtype="int16")
+    except Exception:
+        import audioread
+        
+        with audioread.audio_open(str(path)) as f:
+            samplerate, channels = f.samplerate, f.channels
+            wanted = int(seconds * samplerate) * channels * 2
+            chunks, size = [], 0
+            for buf in f:
+                chunks.append(buf)
+                size += len(buf)
+                if size >= wanted:
+                    break
+        data = np.frombuffer(b"".join(chunks)[:wanted], dtype=np.int16).reshape(-1, channels)
+        
+    sf.write(str(target), data, samplerate, subtype="PCM_16")
+    delete_file(path)
+    return target
+
+
+def trim_video(path: Path, seconds: float) -> Path:
+    """
+    Keep the first seconds of a video, re-encoded as MP4.
+    
+    Returns:
+        Path of the trimmed file (the original is deleted)
+    """
+    target = path.with_name(f"{path.stem}-trimmed.mp4")
+    cap = cv2.VideoCapture(str(path))
+    writer = None
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        max_frames = int(seconds * fps)
+        written = 0
+        while written < max_frames:
+            ok, frame = cap.read()
+            if not ok or cap.get(cv2.CAP_PROP_POS_MSEC) > seconds * 1000.0:
+                break
+            if writer is None:
+                height, width = frame.shape[:2]
+                writer = cv2.VideoWriter(str(target), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+            writer.write(frame)
+            written += 1
+    finally:
+        cap.release()
+        if writer is not None:
+            writer.release()
+            
+    if writer is None:
+        raise ValueError("Could not decode video for trimming")
+    delete_file(path)
+    return target
+
+
+def enforce_duration(path: Path, file_type: str) -> Dict:
+    """
+    Probe an upload and apply media_duration_policy to over-long media.
+    
+    Args:
+        path: Uploaded file
+        file_type: "audio" or "video"
+        
+    Returns:
+        Dict with path (trimmed copy if trimmed), duration_seconds (None
+        if unknown) and trimmed_from (original duration, or None)
+        
+    Raises:
+        MediaTooLongError: If the media is too long and the policy is "reject"
+    """
+    start = time.perf_counter()
+    limit = max_duration(file_type)
+    probe = probe_audio_duration if file_type == "audio" else probe_video_duration
+    duration = probe(path, limit)
+    observe_stage(file_type, "probe", time.perf_counter() - start)
+    
+    result = {"path": path, "duration_seconds": duration, "trimmed_from": None}
+    if duration is None or duration <= limit:
+        return result
+        
+    label = "Audio" if file_type == "audio" else "Video"
+    if settings.media_duration_policy != "trim":
+        raise MediaTooLongError(f"{label} too long. Maximum duration: {limit:g} seconds")
+        
+    trim = trim_audio if file_type == "audio" else trim_video
+    result["path"] = trim(path, limit)
+    result["duration_seconds"] = limit
+    result["trimmed_from"] = duration
+    return result
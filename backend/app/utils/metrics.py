@@ -0,0 +1,286 @@
+"""
+Sentinel AI - Prometheus Metrics
+Per-stage latency histograms, in-flight gauges and upload byte counters
+recorded on the request path, plus a collector that exports the existing
+cache, cascade, limiter, hedging and breaker counters at scrape time.
+"""
+import functools
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.config import settings
+
+
+T = TypeVar("T")
+
+# Pipeline stages: receive (reading the upload), disk_write, probe (media
+# duration from container headers), decode (image
+# decode / frame extraction), local (forensics, voice pre-screen),
+# transcribe (local speech-to-text), upstream (Gemini / AssemblyAI,
+# including limiter queueing), parse and explain
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Analysis routes by path, for the request middleware
+_ROUTES = {
+    "/analyze/text": "text",
+    "/analyze/text/batch": "text",
+    "/analyze/image": "image",
+    "/analyze/audio": "audio",
+    "/analyze/video": "video",
+}
+
+_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+STAGE_SECONDS = Histogram(
+    "sentinel_stage_seconds",
+    "Time spent in each pipeline stage",
+    ["content_type", "stage"],
+    buckets=STAGE_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "sentinel_request_seconds",
+    "End-to-end analysis request latency",
+    ["content_type"],
+    buckets=REQUEST_BUCKETS
+)
+REQUESTS = Counter(
+    "sentinel_requests",
+    "Analysis requests by response status",
+    ["content_type", "status"]
+)
+IN_FLIGHT = Gauge(
+    "sentinel_requests_in_flight",
+    "Analysis requests currently being served",
+    ["content_type"]
+)
+UPLOAD_BYTES = Counter(
+    "sentinel_upload_bytes",
+    "Bytes received in uploads",
+    ["content_type"]
+)
+
+# Label lookups are cached so the hot path only pays for observe()
+_stage_children: Dict[Tuple[str, str], Any] = {}
+
+
+def _stage(content_type: Optional[str], stage: str):
+    key = (content_type or "unknown", stage)
+    child = _stage_children.get(key)
+    if child is None:
+        child = _stage_children[key] = STAGE_SECONDS.labels(*key)
+    return child
+
+
+def observe_stage(content_type: Optional[str], stage: str, seconds: float) -> None:
+    """Record a stage duration measured by the caller."""
+    _stage(content_type, stage).observe(seconds)
+
+
+class StageTimer:
+    """Context manager that records the time spent in its block for one stage."""
+    
+    __slots__ = ("_child", "_start")
+    
+    def __init__(self, content_type: Optional[str], stage: str):
+        self._child = _stage(content_type, stage)
+    
+    def __enter__(self) -> "StageTimer":
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc: Any) -> None:
+        self._child.observe(time.perf_counter() - self._start)
+
+
+def time_stage(content_type: Optional[str], stage: str) -> StageTimer:
+    """
+    Time a block as one pipeline stage.
+    
+    Usage::
+    
+        with time_stage("image", "decode"):
+            img, blob = prepare_image(source)
+    """
+    return StageTimer(content_type, stage)
+
+
+def timed_stage(content_type: str, stage: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator form of :func:`time_stage` for synchronous functions."""
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            with StageTimer(content_type, stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_upload_bytes(content_type: str, size: int) -> None:
+    """Add a finished upload's size to the byte counter."""
+    UPLOAD_BYTES.labels(content_type).inc(size)
+
+
+def _celery_queue_depths() -> Dict[str, int]:
+    """Pending messages per Celery queue, read from the Redis broker."""
+    import redis
+    
+    client = redis.from_url(settings.redis_url, socket_timeout=1.0, socket_connect_timeout=1.0)
+    try:
+        return {queue: int(client.llen(queue)) for queue in settings.metrics_celery_queue_list}
+    finally:
+        client.close()
+
+
+class SentinelCollector(Collector):
+    """Exports the components' own counters when Prometheus scrapes."""
+    
+    def describe(self) -> list:
+        # Without describe() the registry would call collect() at import time
+        return []
+    
+    def collect(self) -> Iterator:
+        # Imported here so the module can be imported by the components themselves
+        from app.utils.cache import get_result_cache
+        from app.utils.cascade import get_cascade_stats
+        from app.utils.circuit_breaker import breaker_stats
+        from app.utils.hedging import get_latency_tracker
+        from app.utils.perceptual_hash import get_frame_index, get_image_index
+        from app.utils.rate_limiter import limiter_stats
+        from app.utils.similarity import get_text_index
+        from app.utils.transcripts import get_transcript_tracker
+        
+        # Result cache
+        cache = get_result_cache().stats()
+        lookups = CounterMetricFamily("sentinel_cache_lookups", "Result cache lookups", labels=["result"])
+        lookups.add_metric(["hit"], cache["hits"] - cache["redis_hits"])
+        lookups.add_metric(["redis_hit"], cache["redis_hits"])
+        lookups.add_metric(["miss"], cache["misses"])
+        yield lookups
+        yield GaugeMetricFamily("sentinel_cache_hit_ratio", "Result cache hit ratio", value=cache["hit_ratio"])
+        yield GaugeMetricFamily("sentinel_cache_entries", "Entries in the local result cache", value=cache["entries"])
+        yield CounterMetricFamily("sentinel_cache_evictions", "Local result cache evictions", value=cache["evictions"])
+        
+        # Near-duplicate and perceptual indexes
+        index_lookups = CounterMetricFamily("sentinel_index_lookups", "Similarity index lookups", labels=["index"])
+        index_hits = CounterMetricFamily("sentinel_index_hits", "Similarity index hits", labels=["index"])
+        index_ratio = GaugeMetricFamily("sentinel_index_hit_ratio", "Similarity index hit ratio", labels=["index"])
+        index_entries = GaugeMetricFamily("sentinel_index_entries", "Entries in a similarity index", labels=["index"])
+        for name, index in (("text", get_text_index()), ("image", get_image_index()), ("video_frames", get_frame_index())):
+            stats = index.stats()
+            index_lookups.add_metric([name], stats["lookups"])
+            index_hits.add_metric([name], stats["hits"])
+            index_ratio.add_metric([name], stats["hit_ratio"])
+            index_entries.add_metric([name], stats["entries"])
+        yield from (index_lookups, index_hits, index_ratio, index_entries)
+        
+        # Which cascade tier answered
+        answers = CounterMetricFamily(
+            "sentinel_cascade_answers", "Requests answered per cascade tier", labels=["content_type", "tier"]
+        )
+        for modality, tiers in get_cascade_stats().stats().items():
+            for tier, stats in tiers.items():
+                answers.add_metric([modality, tier], stats["requests"])
+        yield answers
+        
+        # Upstream limiters
+        limit = GaugeMetricFamily("sentinel_upstream_limit", "Current AIMD concurrency limit", labels=["backend"])
+        in_flight = GaugeMetricFamily("sentinel_upstream_in_flight", "Upstream calls in flight", labels=["backend"])
+        queued = GaugeMetricFamily("sentinel_upstream_queued", "Calls waiting for an upstream slot", labels=["backend"])
+        calls = CounterMetricFamily("sentinel_upstream_requests", "Calls admitted by the limiter", labels=["backend"])
+        throttled = CounterMetricFamily("sentinel_upstream_throttled", "Rate-limited upstream calls", labels=["backend"])
+        for backend, stats in limiter_stats().items():
+            limit.add_metric([backend], stats["limit"])
+            in_flight.add_metric([backend], stats["in_flight"])
+            queued.add_metric([backend], stats["queued"])
+            calls.add_metric([backend], stats["requests"])
+            throttled.add_metric([backend], stats["throttled"])
+        yield from (limit, in_flight, queued, calls, throttled)
+        
+        # Hedged requests
+        hedged = CounterMetricFamily("sentinel_hedge_events", "Hedging events per latency key", labels=["key", "event"])
+        p95 = GaugeMetricFamily("sentinel_upstream_p95_seconds", "Rolling p95 upstream latency", labels=["key"])
+        for key, stats in get_latency_tracker().stats().items():
+            for event in ("hedged", "hedge_wins", "deadline_exceeded"):
+                if event in stats:
+                    hedged.add_metric([key, event], stats[event])
+            if stats["p95_ms"] is not None:
+                p95.add_metric([key], stats["p95_ms"] / 1000.0)
+        yield from (hedged, p95)
+        
+        # Circuit breakers
+        state = GaugeMetricFamily(
+            "sentinel_circuit_breaker_state", "Breaker state (0 closed, 1 half-open, 2 open)", labels=["backend"]
+        )
+        opened = CounterMetricFamily("sentinel_circuit_breaker_opened", "Times a breaker opened", labels=["backend"])
+        rejected = CounterMetricFamily(
+            "sentinel_circuit_breaker_rejected", "Calls rejected by an open breaker", labels=["backend"]
+        )
+        for backend, stats in breaker_stats().items():
+            state.add_metric([backend], _BREAKER_STATES[stats["state"]])
+            opened.add_metric([backend], stats["opened"])
+            rejected.add_metric([backend], stats["rejected"])
+        yield from (state, opened, rejected)
+        
+        # Async AssemblyAI transcripts
+        transcripts = get_transcript_tracker().stats()
+        yield GaugeMetricFamily(
+            "sentinel_transcripts_pending", "Submitted transcripts awaiting completion", value=transcripts["pending"]
+        )
+        
+        # Celery backlog (skipped while the broker is unreachable)
+        try:
+            depths = _celery_queue_depths()
+        except Exception as e:
+            print(f"Celery queue depth unavailable: {e}")
+        else:
+            depth = GaugeMetricFamily("sentinel_celery_queue_depth", "Messages waiting in a Celery queue", labels=["queue"])
+            for queue, size in depths.items():
+                depth.add_metric([queue], size)
+            yield depth
+
+
+REGISTRY.register(SentinelCollector())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Serialize every registered metric in the Prometheus text format."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times analysis requests end to end and tracks
+    how many are in flight, labelled by content type.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        content_type = _ROUTES.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if content_type is None:
+            await self.app(scope, receive, send)
+            return
+            
+        status = 500
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            
+        gauge = IN_FLIGHT.labels(content_type)
+        gauge.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            gauge.dec()
+            REQUEST_SECONDS.labels(content_type).observe(time.perf_counter() - start)
+            REQUESTS.labels(content_type, str(status)).inc()
@@ -0,0 +1,122 @@
+"""
+Sentinel AI - Perceptual Hashing
+DCT-based perceptual hashes for images and video frames, plus the indexes
+used to recognise re-encoded, resized or screenshotted copies of media that
+has already been analyzed.
+"""
+from typing import Dict, List, Optional, Sequence, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.config import settings
+from app.utils.similarity import HammingIndex
+
+
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so a 2-D DCT is just D @ X @ D.T."""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    d = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    d[0] /= np.sqrt(2.0)
+    return d
+
+
+# Only the low-frequency rows are ever used
+_DCT = _dct_matrix(_DCT_SIZE)[:_HASH_SIZE]
+
+
+def _to_gray(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+    """Downscale to the DCT input size as a float grayscale array."""
+    if isinstance(image, Image.Image):
+        gray = image.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.BILINEAR)
+        return np.asarray(gray, dtype=np.float32)
+        
+    # RGB frame from OpenCV; shrink first so the color conversion is cheap
+    small = cv2.resize(image, (_DCT_SIZE, _DCT_SIZE), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+    return small.astype(np.float32)
+
+
+def phash(image: Union[Image.Image, np.ndarray]) -> int:
+    """
+    Compute a 64-bit perceptual hash.
+    
+    Args:
+        image: PIL image or RGB/grayscale numpy array
+        
+    Returns:
+        Hash as a non-negative int
+    """
+    pixels = _to_gray(image)
+    low = (_DCT @ pixels @ _DCT.T).ravel()
+    # The DC term only encodes overall brightness, so keep it out of the median
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def lookup_frames(index: HammingIndex, hashes: Sequence[int]) -> Optional[Dict]:
+    """
+    Find a known video whose frames match every given frame hash.
+    
+    Returns:
+        Stored result dict, or None unless all frames agree on one video
+    """
+    keys = set()
+    result = None
+    for fp in hashes:
+        match = index.nearest(fp)
+        if match is None:
+            break
+        keys.add(match[2]["key"])
+        result = match[2]["result"]
+        if len(keys) > 1:
+            break
+    else:
+        if result is not None:
+            index.record_lookup(hit=True)
+            return result
+    index.record_lookup(hit=False)
+    return None
+
+
+def add_frames(index: HammingIndex, hashes: List[int], result: Dict) -> None:
+    """Register every frame hash of an analyzed video against its result."""
+    value = {"key": ":".join(f"{fp:016x}" for fp in hashes), "result": result}
+    for fp in hashes:
+        index.add(fp, value)
+
+
+# Singleton instances
+_image_index = None
+_frame_index = None
+
+
+def get_image_index() -> HammingIndex:
+    """Get or create the perceptual image index."""
+    global _image_index
+    if _image_index is None:
+        _image_index = HammingIndex(
+            bits=64,
+            max_distance=settings.perceptual_max_distance,
+            max_entries=settings.perceptual_max_entries
+        )
+    return _image_index
+
+
+def get_frame_index() -> HammingIndex:
+    """Get or create the perceptual video-frame index."""
+    global _frame_index
+    if _frame_index is None:
+        _frame_index = HammingIndex(
+            bits=64,
+            max_distance=settings.perceptual_max_distance,
+            max_entries=settings.perceptual_max_entries
+        )
+    return _frame_index
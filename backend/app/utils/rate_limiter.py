@@ -0,0 +1,356 @@
+"""
+Sentinel AI - Upstream Rate Limiter
+Per-backend AIMD concurrency limit with a priority queue, a request-rate
+token bucket and retry-after pauses shared across workers through Redis.
+Rate-limited calls wait and retry instead of failing.
+"""
+import heapq
+import itertools
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from app.config import settings
+from app.utils.deadline import DeadlineExceeded, remaining
+from app.utils.executor import pool_size
+
+
+T = TypeVar("T")
+
+# Seconds to stay on the local bucket after a Redis error
+REDIS_RETRY_SECONDS = 30.0
+
+_RETRY_IN_RE = re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE)
+
+# KEYS: bucket hash, pause key. ARGV: rate per second, burst.
+# Returns 0 when a token was taken, else milliseconds to wait.
+_TOKEN_BUCKET_LUA = """
+local pause = redis.call('PTTL', KEYS[2])
+if pause > 0 then return pause end
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+if rate <= 0 then return 0 end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait
+"""
+
+
+def priority_for(modality: Optional[str]) -> int:
+    """Queue priority for a modality; lower runs first, unknown runs last."""
+    order = settings.upstream_priority_list
+    return order.index(modality) if modality in order else len(order)
+
+
+def status_code(exc: Exception) -> Optional[int]:
+    """HTTP status carried by an SDK exception, if any."""
+    for value in (
+        getattr(exc, "status_code", None),
+        getattr(exc, "code", None),
+        getattr(getattr(exc, "response", None), "status_code", None)
+    ):
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """
+    Recognize an upstream rate-limit error and read its retry delay.
+    
+    Args:
+        exc: Exception raised by the Gemini or AssemblyAI SDK
+        
+    Returns:
+        None if exc is not a rate limit, otherwise the requested delay in
+        seconds (0.0 when the upstream did not say)
+    """
+    message = str(exc)
+    if status_code(exc) != 429 and "429" not in message and "Too Many Requests" not in message:
+        return None
+        
+    # HTTP Retry-After header (httpx / requests responses)
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        pass
+        
+    # google.rpc.RetryInfo in gRPC error details
+    for detail in getattr(exc, "details", None) or ():
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+            
+    match = _RETRY_IN_RE.search(message)
+    return float(match.group(1)) if match else 0.0
+
+
+class _LocalBucket:
+    """In-process token bucket and pause, used without Redis."""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+    
+    def reserve(self) -> float:
+        """Take a token; return 0, or seconds to wait before asking again."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.rate <= 0:
+                return 0.0
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+    
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class _SharedBucket:
+    """
+    Token bucket and pause stored in Redis so every API and Celery worker
+    draws from the same budget. Falls back to the local bucket on errors.
+    """
+    
+    REDIS_PREFIX = "sentinel:limiter:"
+    
+    def __init__(self, backend: str, rate: float, burst: int, redis_url: str):
+        import redis
+        
+        self.local = _LocalBucket(rate, burst)
+        self._redis = redis.from_url(redis_url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self._script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+        self._keys = [f"{self.REDIS_PREFIX}{backend}:bucket", f"{self.REDIS_PREFIX}{backend}:pause"]
+        self._down_until = 0.0
+    
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._down_until
+    
+    def _redis_failed(self, e: Exception) -> None:
+        print(f"Redis rate limiter unavailable, using local limits for {REDIS_RETRY_SECONDS:.0f}s: {e}")
+        self._down_until = time.monotonic() + REDIS_RETRY_SECONDS
+    
+    def reserve(self) -> float:
+        if self._redis_available():
+            try:
+                return int(self._script(keys=self._keys, args=[self.local.rate, self.local.burst])) / 1000.0
+            except Exception as e:
+                self._redis_failed(e)
+        return self.local.reserve()
+    
+    def pause(self, seconds: float) -> None:
+        self.local.pause(seconds)
+        if self._redis_available() and seconds > 0:
+            try:
+                self._redis.set(self._keys[1], 1, px=int(seconds * 1000))
+            except Exception as e:
+                self._redis_failed(e)
+
+
+class UpstreamLimiter:
+    """
+    Admission control for one upstream backend.
+    
+    Concurrency follows AIMD: each success raises the limit by 1/limit
+    (about +1 per round of requests) and each 429 multiplies it by
+    upstream_backoff_factor. Callers over the limit wait in a priority
+    queue (FIFO within a priority). Rate-limited calls pause the backend
+    for the upstream's retry-after on every worker and are retried.
+    """
+    
+    def __init__(self, backend: str, rate: float, burst: int, max_limit: int):
+        self.backend = backend
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(settings.upstream_min_concurrency, self.max_limit))
+        self._limit = float(self.max_limit)
+        self._in_flight = 0
+        self._waiting: List[Tuple[int, int]] = []
+        self._tickets = itertools.count()
+        self._cond = threading.Condition()
+        
+        # Without a rate cap only retry-after pauses remain, and those are
+        # kept in-process rather than paying a Redis round trip per call
+        self._bucket = _LocalBucket(rate, burst)
+        if settings.upstream_limiter_redis_enabled and rate > 0:
+            try:
+                self._bucket = _SharedBucket(backend, rate, burst, settings.redis_url)
+            except Exception as e:
+                print(f"Redis rate limiter disabled for {backend}: {e}")
+                
+        # Counters
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+    
+    def _acquire(self, priority: int) -> None:
+        """Block until this caller is first in line and under the limit."""
+        start = time.perf_counter()
+        ticket = (priority, next(self._tickets))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while self._waiting[0] != ticket or self._in_flight >= int(self._limit):
+                    left = remaining()
+                    if left is not None and left <= 0:
+                        raise DeadlineExceeded(f"Deadline passed while queued for {self.backend}")
+                    self._cond.wait(left)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiting)
+            self._in_flight += 1
+            self._cond.notify_all()
+            
+        # Shared request rate and retry-after pauses
+        try:
+            delay = self._bucket.reserve()
+            while delay > 0:
+                left = remaining()
+                if left is not None and delay >= left:
+                    raise DeadlineExceeded(f"Deadline passed while rate limited by {self.backend}")
+                time.sleep(delay)
+                delay = self._bucket.reserve()
+        except BaseException:
+            self._release()
+            raise
+            
+        wait_ms = (time.perf_counter() - start) * 1000.0
+        with self._cond:
+            self.requests += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+    
+    def _release(self, outcome: Optional[str] = None) -> None:
+        """Free a slot and adapt the limit ("ok", "throttled" or None)."""
+        with self._cond:
+            self._in_flight -= 1
+            if outcome == "ok":
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            elif outcome == "throttled":
+                self.throttled += 1
+                self._limit = max(self.min_limit, self._limit * settings.upstream_backoff_factor)
+            self._cond.notify_all()
+    
+    def call(self, func: Callable[..., T], *args: Any, priority: int = 0, **kwargs: Any) -> T:
+        """
+        Run an upstream call under the limiter, retrying on rate limits.
+        
+        Args:
+            func: Blocking SDK call
+            *args: Positional arguments for func
+            priority: Queue priority (see :func:`priority_for`)
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            Whatever func returns
+        """
+        for attempt in range(settings.upstream_rate_limit_retries + 1):
+            self._acquire(priority)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    self._release()
+                    raise
+                # Pause before freeing the slot so queued callers wait too
+                delay = delay or settings.upstream_retry_after_seconds * (2 ** attempt)
+                self._bucket.pause(delay)
+                self._release("throttled")
+                if attempt == settings.upstream_rate_limit_retries:
+                    raise
+                print(f"⏳ {self.backend} rate limited; retrying in {delay:.1f}s")
+                continue
+            self._release("ok")
+            return result
+    
+    def has_spare_capacity(self) -> bool:
+        """True if a new call would be admitted without queueing."""
+        with self._cond:
+            return not self._waiting and self._in_flight < int(self._limit)
+    
+    def stats(self) -> Dict:
+        """Current limit, in-flight and queued calls, and wait times."""
+        with self._cond:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "queued": len(self._waiting),
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "avg_wait_ms": round(self.total_wait_ms / self.requests, 2) if self.requests else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 2)
+            }
+
+
+# One limiter per backend
+_limiters: Dict[str, UpstreamLimiter] = {}
+_lock = threading.Lock()
+
+
+def get_limiter(backend: str) -> UpstreamLimiter:
+    """Get or create the limiter for an upstream backend."""
+    limiter = _limiters.get(backend)
+    if limiter is None:
+        with _lock:
+            limiter = _limiters.get(backend)
+            if limiter is None:
+                rates = {
+                    "gemini": (settings.gemini_rate_per_second, settings.gemini_rate_burst),
+                    "assemblyai": (settings.assemblyai_rate_per_second, settings.assemblyai_rate_burst),
+                }
+                rate, burst = rates.get(backend, (0.0, 1))
+                limiter = UpstreamLimiter(backend, rate, burst, pool_size(backend))
+                _limiters[backend] = limiter
+    return limiter
+
+
+def call_upstream(backend: str, func: Callable[..., T], *args: Any, modality: Optional[str] = None, **kwargs: Any) -> T:
+    """
+    Call an upstream SDK function through the backend's limiter.
+    
+    Args:
+        backend: Backend name (gemini, assemblyai)
+        func: Blocking SDK call
+        *args: Positional arguments for func
+        modality: Requesting modality, used for queue priority
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        Whatever func returns
+    """
+    if not settings.upstream_limiter_enabled:
+        return func(*args, **kwargs)
+    return get_limiter(backend).call(func, *args, priority=priority_for(modality), **kwargs)
+
+
+def limiter_stats() -> Dict:
+    """Stats for every limiter created so far."""
+    return {backend: limiter.stats() for backend, limiter in list(_limiters.items())}
@@ -0,0 +1,258 @@
+"""
+Sentinel AI - Response Parser
+Schema-constrained JSON output for Gemini: one Pydantic model per verdict
+type, the matching response schema, single-pass parsing and retries that
+re-request only the answers that failed to parse.
+"""
+import json
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Type, TypeVar, get_args, get_origin
+
+import google.generativeai as genai
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from app.config import settings
+from app.utils.deadline import remaining
+from app.utils.hedging import upstream_call
+from app.utils.metrics import time_stage
+
+
+class ResponseParseError(ValueError):
+    """Raised when a model response does not match the requested schema."""
+
+
+class _Verdict(BaseModel):
+    """Base for verdicts: clamps 0-100 scores and 0-1 signals instead of rejecting them."""
+    
+    @field_validator("risk_score", "confidence", mode="before", check_fields=False)
+    @classmethod
+    def _clamp_score(cls, value: Any) -> int:
+        # Pydantic only wraps ValueError, so a null or list must not raise TypeError
+        try:
+            return min(100, max(0, int(round(float(value)))))
+        except (TypeError, ValueError, OverflowError) as e:
+            raise ValueError(f"expected a number, got {value!r}") from e
+    
+    @field_validator("urgency", "financial_request", "impersonation", mode="before", check_fields=False)
+    @classmethod
+    def _clamp_signal(cls, value: Any) -> float:
+        try:
+            return min(1.0, max(0.0, float(value)))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"expected a number, got {value!r}") from e
+
+
+class TextVerdict(_Verdict):
+    verdict: Literal["Scam", "AI-Generated", "Suspicious", "Legitimate"]
+    risk_score: int = Field(description="0-100")
+    urgency: float = Field(0.0, description="0.0-1.0")
+    financial_request: float = Field(0.0, description="0.0-1.0")
+    impersonation: float = Field(0.0, description="0.0-1.0")
+    reasoning: str = Field(description="Brief explanation of key indicators")
+
+
+class TextBatchItem(TextVerdict):
+    id: int = Field(description="Number of the message")
+
+
+class ImageVerdict(_Verdict):
+    verdict: Literal["AI-Generated", "Manipulated", "Real"]
+    confidence: int = Field(description="0-100")
+    reasoning: str = Field(description="Brief explanation of key indicators you found")
+
+
+class AudioVerdict(_Verdict):
+    verdict: Literal["Deepfake", "Scam", "Suspicious", "Legitimate"]
+    risk_score: int = Field(description="0-100")
+    reasoning: str = Field(description="Brief explanation")
+
+
+class VideoVerdict(_Verdict):
+    verdict: Literal["Deepfake", "Manipulated", "Real"]
+    confidence: int = Field(description="0-100")
+    reasoning: str = Field(description="Specific observations about the video")
+
+
+V = TypeVar("V", bound=BaseModel)
+
+_SCHEMA_TYPES = {int: "integer", float: "number", str: "string", bool: "boolean"}
+
+
+def response_schema(model: Type[BaseModel]) -> Dict:
+    """
+    Build a Gemini response schema (OpenAPI subset) from a verdict model.
+    
+    Literal fields become string enums; fields without a default are required.
+    """
+    properties: Dict[str, Dict] = {}
+    required: List[str] = []
+    for name, field in model.model_fields.items():
+        if get_origin(field.annotation) is Literal:
+            prop = {"type": "string", "enum": list(get_args(field.annotation))}
+        else:
+            prop = {"type": _SCHEMA_TYPES[field.annotation]}
+        if field.description:
+            prop["description"] = field.description
+        properties[name] = prop
+        if field.is_required():
+            required.append(name)
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def json_config(model: Type[BaseModel], many: bool = False) -> genai.GenerationConfig:
+    """Generation config requesting JSON matching model (or a list of it)."""
+    schema = response_schema(model)
+    if many:
+        schema = {"type": "array", "items": schema}
+    return genai.GenerationConfig(response_mime_type="application/json", response_schema=schema)
+
+
+def _load_json(text: str) -> Any:
+    """Decode a JSON response, tolerating a Markdown code fence around it."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("\n") + 1:] if "\n" in text else text
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ResponseParseError(f"Response is not valid JSON: {e}") from e
+
+
+def parse_response(text: str, model: Type[V]) -> V:
+    """
+    Parse and validate a single JSON verdict.
+    
+    Args:
+        text: Raw response text
+        model: Verdict model to validate against
+        
+    Returns:
+        Validated verdict
+        
+    Raises:
+        ResponseParseError: If the text is not valid JSON for the model
+    """
+    data = _load_json(text)
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        raise ResponseParseError(f"Response does not match {model.__name__}: {e}") from e
+
+
+def parse_items(text: str, model: Type[V]) -> Dict[int, V]:
+    """
+    Parse a JSON array of verdicts keyed by their ``id`` field.
+    
+    Items are validated one by one; invalid items are left out so that only
+    they need to be requested again.
+    """
+    data = _load_json(text)
+    if not isinstance(data, list):
+        raise ResponseParseError("Response is not a JSON array")
+        
+    items: Dict[int, V] = {}
+    for raw in data:
+        try:
+            item = model.model_validate(raw)
+        except ValidationError:
+            continue
+        items[item.id] = item
+    return items
+
+
+def _generate(gemini_model: genai.GenerativeModel, contents: Any, config: genai.GenerationConfig):
+    """One Gemini request, timed out at the request deadline."""
+    left = remaining()
+    options = {"timeout": max(0.1, left)} if left is not None else None
+    return gemini_model.generate_content(contents, generation_config=config, request_options=options)
+
+
+def generate_structured(
+    gemini_model: genai.GenerativeModel,
+    contents: Any,
+    model: Type[V],
+    retries: Optional[int] = None,
+    modality: Optional[str] = None
+) -> V:
+    """
+    Request a schema-constrained verdict, retrying only on parse failure.
+    
+    Args:
+        gemini_model: Gemini model to call
+        contents: Prompt (and media parts) for generate_content
+        model: Verdict model describing the expected JSON
+        retries: Extra attempts after a parse failure (default gemini_parse_retries)
+        modality: Requesting modality, used for upstream queue priority
+        
+    Returns:
+        Validated verdict
+        
+    Raises:
+        ResponseParseError: If no attempt produced a valid verdict
+    """
+    retries = settings.gemini_parse_retries if retries is None else retries
+    config = json_config(model)
+    
+    for attempt in range(retries + 1):
+        response = upstream_call("gemini", _generate, gemini_model, contents, config, modality=modality)
+        try:
+            with time_stage(modality, "parse"):
+                return parse_response(response.text, model)
+        except ResponseParseError as e:
+            if attempt == retries:
+                raise
+            print(f"⚠️  Unparseable {model.__name__} response, retrying: {e}")
+
+
+def generate_items(
+    gemini_model: genai.GenerativeModel,
+    build_prompt: Callable[[Sequence[Any]], Any],
+    keys: Sequence[Any],
+    model: Type[V],
+    retries: Optional[int] = None,
+    modality: Optional[str] = None
+) -> Dict[Any, V]:
+    """
+    Request one verdict per key in a single prompt, re-requesting only the
+    keys whose items were missing or invalid.
+    
+    Args:
+        gemini_model: Gemini model to call
+        build_prompt: Builds the prompt for a list of keys; items are
+            numbered from 1 in that order
+        keys: Keys to analyze
+        model: Item model with an ``id`` field
+        retries: Extra attempts for failed items (default gemini_parse_retries)
+        modality: Requesting modality, used for upstream queue priority
+        
+    Returns:
+        Verdicts by key; keys that never parsed are absent
+    """
+    retries = settings.gemini_parse_retries if retries is None else retries
+    config = json_config(model, many=True)
+    results: Dict[Any, V] = {}
+    pending = list(keys)
+    
+    for attempt in range(retries + 1):
+        response = upstream_call(
+            "gemini", _generate, gemini_model, build_prompt(pending), config,
+            modality=modality,
+            latency_key=f"gemini:{modality}:batch"
+        )
+        try:
+            with time_stage(modality, "parse"):
+                items = parse_items(response.text, model)
+        except ResponseParseError as e:
+            print(f"⚠️  Unparseable {model.__name__} batch response: {e}")
+            items = {}
+            
+        for position, key in enumerate(pending, start=1):
+            if position in items:
+                results[key] = items[position]
+        pending = [key for key in pending if key not in results]
+        if not pending:
+            break
+        if attempt < retries:
+            print(f"⚠️  {len(pending)} batch item(s) failed to parse, retrying them")
+            
+    return results
@@ -0,0 +1,213 @@
+"""
+Sentinel AI - Scam Signal Extractor
+Rule-based urgency, payment and impersonation signals plus URL and phone
+extraction. Phrases are found through a first-word index, so a 10k-char
+message is scanned in a few hundred microseconds.
+"""
+import math
+import re
+import string
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+
+URGENCY_PHRASES = [
+    "urgent", "urgently", "immediately", "right away", "right now", "asap",
+    "act now", "act fast", "hurry", "final notice", "final warning", "last chance",
+    "last warning", "expires today", "expires soon", "within 24 hours", "within 48 hours",
+    "today only", "limited time", "time sensitive", "deadline", "don't delay",
+    "do not delay", "respond now", "reply now", "before it's too late",
+    "account will be closed", "account will be suspended", "account has been suspended",
+    "account has been locked", "will be terminated", "legal action", "arrest warrant",
+    "suspended", "locked", "unusual activity", "suspicious activity", "verify now",
+    "confirm now", "action required", "immediate action",
+]
+
+FINANCIAL_PHRASES = [
+    "wire transfer", "bank transfer", "bank account", "account number", "routing number",
+    "iban", "swift code", "credit card", "debit card", "card number", "cvv", "pin",
+    "payment", "pay now", "send money", "transfer money", "refund", "invoice", "overdue",
+    "outstanding balance", "processing fee", "release fee", "tax refund",
+    "gift card", "gift cards", "itunes card", "google play card", "steam card",
+    "amazon card", "bitcoin", "btc", "crypto", "cryptocurrency", "ethereum", "usdt",
+    "wallet address", "seed phrase", "recovery phrase", "western union", "moneygram",
+    "zelle", "venmo", "cash app", "paypal", "prize", "lottery", "jackpot", "you have won",
+    "you've won", "claim your", "inheritance", "investment opportunity",
+    "guaranteed return", "double your", "password", "login details", "otp",
+    "one-time code", "verification code", "social security number", "ssn",
+]
+
+IMPERSONATION_PHRASES = [
+    "irs", "hmrc", "fbi", "police", "customs", "immigration", "social security administration",
+    "tax office", "government", "court", "bank of america", "chase bank", "wells fargo",
+    "citibank", "hsbc", "barclays", "amazon", "apple id", "apple support", "microsoft",
+    "microsoft support", "tech support", "google", "netflix", "paypal", "facebook",
+    "whatsapp", "instagram", "dhl", "fedex", "ups", "usps", "royal mail",
+    "post office", "customer service", "customer support", "security team",
+    "fraud department", "your bank", "ceo", "your manager", "it department",
+    "help desk", "dear customer", "dear user", "dear account holder",
+]
+
+URL_SHORTENERS = {
+    "bit.ly", "tinyurl.com", "t.co", "goo.gl", "is.gd", "cutt.ly", "rb.gy",
+    "ow.ly", "tiny.cc", "shorturl.at", "rebrand.ly", "t.ly",
+}
+
+SUSPICIOUS_TLDS = {"xyz", "top", "click", "link", "online", "site", "live", "shop", "zip", "mov"}
+
+# Weight of each signal in the combined rule-based scam score
+SIGNAL_WEIGHTS = {
+    "urgency": 0.5,
+    "financial_request": 0.7,
+    "impersonation": 0.6,
+    "suspicious_links": 0.6,
+}
+
+# Known TLDs anchor bare-domain links; schemes and "www." are found with
+# str.find. The full link is the whitespace-delimited token around an anchor
+_TLD_RE = re.compile(
+    r"\.(?:com|net|org|info|biz|io|co|me|ly|app|" + "|".join(sorted(SUSPICIOUS_TLDS)) + r")\b",
+    re.IGNORECASE
+)
+_LINK_MARKERS = ("://", "www.")
+
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_DROP_DIGITS = str.maketrans("", "", string.digits)
+
+# Punctuation other than apostrophes and hyphens separates words
+_PUNCT_TABLE = str.maketrans({char: " " for char in string.punctuation if char not in "'-"})
+
+
+def _build_phrase_index(groups: Dict[str, List[str]]) -> Dict[str, List[Tuple[str, str]]]:
+    """Index phrases by their first word so only candidate phrases are checked."""
+    index: Dict[str, List[Tuple[str, str]]] = {}
+    for kind, phrases in groups.items():
+        for phrase in phrases:
+            normalized = " ".join(phrase.lower().translate(_PUNCT_TABLE).split())
+            index.setdefault(normalized.split()[0], []).append((kind, normalized))
+    return index
+
+
+# First word -> [(signal, phrase)]; a phrase listed twice counts for the first signal
+_PHRASE_INDEX = _build_phrase_index({
+    "urgency": URGENCY_PHRASES,
+    "financial_request": FINANCIAL_PHRASES,
+    "impersonation": IMPERSONATION_PHRASES
+})
+_FIRST_WORDS = frozenset(_PHRASE_INDEX)
+
+
+def _saturate(count: int) -> float:
+    """Map a number of distinct matches to 0-1 (1 -> 0.5, 2 -> 0.75, ...)."""
+    return 1.0 - math.pow(0.5, count)
+
+
+def extract_urls(text: str) -> List[str]:
+    """
+    Extract links, including bare domains such as ``example.com/login``.
+    
+    Args:
+        text: Text content to scan
+        
+    Returns:
+        Links in order of appearance, without surrounding punctuation
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = text
+        
+    anchors = [match.start() for match in _TLD_RE.finditer(text)]
+    for marker in _LINK_MARKERS:
+        pos = lowered.find(marker)
+        while pos != -1:
+            anchors.append(pos)
+            pos = lowered.find(marker, pos + 1)
+            
+    urls: List[str] = []
+    last_end = -1
+    for anchor in sorted(anchors):
+        if anchor < last_end:
+            continue
+        start = anchor
+        while start > 0 and not text[start - 1].isspace():
+            start -= 1
+        end = anchor + 1
+        while end < len(text) and not text[end].isspace():
+            end += 1
+        last_end = end
+        url = text[start:end].lstrip("\"'(<[{").rstrip("\"')>]}.,;:!?")
+        if url:
+            urls.append(url)
+    return urls
+
+
+def extract_phones(text: str) -> List[str]:
+    """Extract phone-number-like digit runs (9 to 15 digits)."""
+    # Most messages have too few digits to hold a phone number at all
+    if len(text) - len(text.translate(_DROP_DIGITS)) < 9:
+        return []
+    return [
+        value.strip() for value in _PHONE_RE.findall(text)
+        if 9 <= sum(char.isdigit() for char in value) <= 15
+    ]
+
+
+def is_suspicious_url(url: str) -> bool:
+    """Flag shorteners, raw IP hosts, punycode and throwaway TLDs."""
+    host = urlsplit(url if "://" in url else f"http://{url}").hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    return (
+        host in URL_SHORTENERS
+        or re.fullmatch(r"\d{1,3}(?:\.\d{1,3}){3}", host) is not None
+        or "xn--" in host
+        or host.rsplit(".", 1)[-1] in SUSPICIOUS_TLDS
+    )
+
+
+def extract_signals(text: str) -> Dict:
+    """
+    Extract rule-based scam signals from a text.
+    
+    Args:
+        text: Text content to scan
+        
+    Returns:
+        Dict with urgency, financial_request and impersonation scores (0-1),
+        a combined scam_score, the matched phrases per signal, and the
+        extracted urls and phones
+    """
+    matches: Dict[str, set] = {"urgency": set(), "financial_request": set(), "impersonation": set()}
+    
+    # One C-level normalization pass, a set intersection to find candidate
+    # first words, then substring checks for the few phrases that could match
+    tokens = text.lower().translate(_PUNCT_TABLE).split()
+    normalized = " " + " ".join(tokens) + " "
+    seen = set()
+    for word in _FIRST_WORDS.intersection(tokens):
+        for kind, phrase in _PHRASE_INDEX[word]:
+            if phrase not in seen and (phrase == word or f" {phrase} " in normalized):
+                seen.add(phrase)
+                matches[kind].add(phrase)
+                
+    urls = extract_urls(text)
+    phones = extract_phones(text)
+    
+    scores = {kind: _saturate(len(found)) for kind, found in matches.items()}
+    scores["suspicious_links"] = _saturate(sum(1 for url in set(urls) if is_suspicious_url(url)))
+    
+    # Independent evidence combines like probabilities
+    safe = 1.0
+    for kind, weight in SIGNAL_WEIGHTS.items():
+        safe *= 1.0 - weight * scores[kind]
+        
+    return {
+        "urgency": scores["urgency"],
+        "financial_request": scores["financial_request"],
+        "impersonation": scores["impersonation"],
+        "suspicious_links": scores["suspicious_links"],
+        "scam_score": 1.0 - safe,
+        "matches": {kind: sorted(found) for kind, found in matches.items()},
+        "urls": urls,
+        "phones": phones
+    }
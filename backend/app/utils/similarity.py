@@ -0,0 +1,253 @@
+"""
+Sentinel AI - Near-Duplicate Lookup
+SimHash fingerprints for text and a bounded Hamming-distance index used to
+answer near-duplicate submissions without calling the upstream model.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.utils.cache import normalize_text
+
+
+# Campaigns rotate links, phone numbers and amounts between copies, so these
+# are collapsed to placeholders before hashing.
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+|\b[\w-]+\.(?:com|net|org|io|ly|me|co|info|xyz)\S*", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+_WORD_RE = re.compile(r"\w+")
+
+# Words per shingle: short phrases keep word order and negation
+# ("do not send money" vs "send money") in the fingerprint
+SHINGLE_SIZE = 3
+SIMHASH_SCHEME = f"word{SHINGLE_SIZE}"
+
+
+class HammingIndex:
+    """
+    Multi-index hashing over fixed-width fingerprints.
+    
+    The fingerprint is split into ``max_distance + 1`` bands; by the pigeonhole
+    principle any fingerprint within ``max_distance`` bits of a query matches
+    it exactly on at least one band, so only those buckets are scanned.
+    Entries are evicted least-recently-used once ``max_entries`` is reached.
+    All public methods are safe to call from analyzer worker threads.
+    """
+    
+    def __init__(self, bits: int = 64, max_distance: int = 3, max_entries: int = 100000, scheme: str = ""):
+        self.bits = bits
+        self.scheme = scheme
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        
+        # Split the fingerprint into near-equal bands of (shift, mask)
+        num_bands = max_distance + 1
+        base, extra = divmod(bits, num_bands)
+        self._bands: List[Tuple[int, int]] = []
+        shift = 0
+        for i in range(num_bands):
+            width = base + (1 if i < extra else 0)
+            self._bands.append((shift, (1 << width) - 1))
+            shift += width
+            
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._buckets: List[Dict[int, Set[int]]] = [{} for _ in self._bands]
+        self._lock = threading.RLock()
+        
+        # Counters
+        self.lookups = 0
+        self.hits = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _keys(self, fingerprint: int):
+        for shift, mask in self._bands:
+            yield (fingerprint >> shift) & mask
+    
+    def add(self, fingerprint: int, value: Dict) -> None:
+        """
+        Insert or refresh a fingerprint.
+        
+        Args:
+            fingerprint: Integer fingerprint of width ``bits``
+            value: JSON-serializable payload to return on matches
+        """
+        with self._lock:
+            if fingerprint in self._entries:
+                self._entries[fingerprint] = value
+                self._entries.move_to_end(fingerprint)
+                return
+                
+            self._entries[fingerprint] = value
+            for buckets, key in zip(self._buckets, self._keys(fingerprint)):
+                buckets.setdefault(key, set()).add(fingerprint)
+                
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+    
+    def _remove(self, fingerprint: int) -> None:
+        del self._entries[fingerprint]
+        for buckets, key in zip(self._buckets, self._keys(fingerprint)):
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del buckets[key]
+    
+    def nearest(self, fingerprint: int) -> Optional[Tuple[int, int, Dict]]:
+        """
+        Find the closest stored fingerprint within ``max_distance``.
+        
+        Does not touch the hit counters; see :meth:`lookup`.
+        
+        Returns:
+            Tuple of (fingerprint, distance, value), or None if nothing is close
+        """
+        best = None
+        best_distance = self.max_distance + 1
+        seen: Set[int] = set()
+        
+        with self._lock:
+            for buckets, key in zip(self._buckets, self._keys(fingerprint)):
+                for candidate in buckets.get(key, ()):
+                    if candidate in seen:
+                        continue
+                    seen.add(candidate)
+                    distance = (fingerprint ^ candidate).bit_count()
+                    if distance < best_distance:
+                        best, best_distance = candidate, distance
+                        if distance == 0:
+                            break
+                            
+            if best is None:
+                return None
+            self._entries.move_to_end(best)
+            return best, best_distance, self._entries[best]
+    
+    def lookup(self, fingerprint: int) -> Optional[Dict]:
+        """
+        Return the payload of the closest near-duplicate, counting hits.
+        
+        Args:
+            fingerprint: Integer fingerprint to search for
+            
+        Returns:
+            Stored payload, or None on miss
+        """
+        with self._lock:
+            self.lookups += 1
+            match = self.nearest(fingerprint)
+            if match is None:
+                return None
+            self.hits += 1
+            return match[2]
+    
+    def record_lookup(self, hit: bool) -> None:
+        """Count a lookup made through :meth:`nearest` by a caller."""
+        with self._lock:
+            self.lookups += 1
+            if hit:
+                self.hits += 1
+    
+    def save(self, path: Path) -> None:
+        """Atomically write the index contents to a JSON file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with self._lock:
+            entries = [[fp, value] for fp, value in self._entries.items()]
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"bits": self.bits, "scheme": self.scheme, "entries": entries}, f)
+        os.replace(tmp_path, path)
+    
+    def load(self, path: Path) -> int:
+        """
+        Load entries from a JSON file written by :meth:`save`.
+        
+        Returns:
+            Number of entries loaded (0 if the file is missing or was
+            written with another fingerprint width or scheme)
+        """
+        if not path.exists():
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("bits") != self.bits or data.get("scheme", "") != self.scheme:
+            return 0
+        for fp, value in data["entries"]:
+            self.add(fp, value)
+        return len(self._entries)
+    
+    def stats(self) -> Dict:
+        """Return size and hit-rate counters."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "max_distance": self.max_distance,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_ratio": round(self.hits / self.lookups, 4) if self.lookups else 0.0
+        }
+
+
+def _features(text: str) -> List[str]:
+    """Overlapping word shingles of SHINGLE_SIZE over canonicalized text."""
+    text = normalize_text(text).casefold()
+    text = _URL_RE.sub(" urltoken ", text)
+    text = _DIGITS_RE.sub("0", text)
+    words = _WORD_RE.findall(text)
+    if len(words) <= SHINGLE_SIZE:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+
+def simhash(text: str) -> int:
+    """
+    Compute a 64-bit SimHash of text over its word shingles.
+    
+    Args:
+        text: Raw text
+        
+    Returns:
+        Fingerprint as a non-negative int
+    """
+    features = _features(text)
+    if not features:
+        return 0
+        
+    digests = b"".join(
+        hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in features
+    )
+    # (n, 64) matrix of feature bits, then a per-bit majority vote
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(features)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+def similarity_to_distance(similarity: float, bits: int = 64) -> int:
+    """Convert a 0-1 similarity threshold into a maximum Hamming distance."""
+    return max(0, int((1.0 - similarity) * bits))
+
+
+# Singleton instance
+_text_index = None
+
+
+def get_text_index() -> HammingIndex:
+    """Get or create the near-duplicate text index."""
+    global _text_index
+    if _text_index is None:
+        _text_index = HammingIndex(
+            bits=64,
+            max_distance=similarity_to_distance(settings.near_duplicate_similarity),
+            max_entries=settings.near_duplicate_max_entries,
+            scheme=SIMHASH_SCHEME
+        )
+    return _text_index
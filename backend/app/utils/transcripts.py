@@ -0,0 +1,211 @@
+"""
+Sentinel AI - Transcript Tracker
+Tracks submitted AssemblyAI transcripts and completes them from webhook
+callbacks or a single shared async poller, so no thread is held while a
+transcription runs.
+"""
+import asyncio
+import json
+from typing import Dict, Optional
+
+import httpx
+
+from app.config import settings
+from app.utils.clients import get_clients
+from app.utils.deadline import DeadlineExceeded, remaining
+
+
+TERMINAL_STATUSES = {"completed", "error"}
+
+# Header carrying the shared secret on AssemblyAI webhook calls
+WEBHOOK_AUTH_HEADER = "X-Sentinel-Webhook-Secret"
+
+# Webhooks for transcripts another worker submitted are relayed here
+WEBHOOK_CHANNEL = "sentinel:transcripts"
+
+
+class TranscriptTracker:
+    """
+    Outstanding transcript ids and the futures waiting on them.
+    
+    One poller task per process checks every pending transcript each
+    assemblyai_poll_interval_seconds over a shared async connection pool.
+    With a webhook configured, callbacks complete transcripts immediately
+    (relayed through Redis when they reach another worker) and the poller
+    only runs every assemblyai_webhook_poll_seconds as a safety net.
+    """
+    
+    def __init__(self):
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+        self._redis = None
+        self._tasks = []
+        
+        # Counters
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.webhooks = 0
+        self.polls = 0
+    
+    def _client(self) -> httpx.AsyncClient:
+        """Async HTTP client with the AssemblyAI client's base URL and auth."""
+        if self._http is None:
+            template = get_clients().assemblyai().http_client
+            self._http = httpx.AsyncClient(
+                base_url=template.base_url,
+                headers=template.headers,
+                timeout=template.timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.assemblyai_max_connections,
+                    max_keepalive_connections=settings.assemblyai_max_connections,
+                    keepalive_expiry=settings.upstream_keepalive_seconds
+                )
+            )
+        return self._http
+    
+    def _redis_client(self):
+        """Shared async Redis client for the webhook relay."""
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            
+            self._redis = aioredis.from_url(settings.redis_url)
+        return self._redis
+    
+    def _start(self) -> None:
+        """Start the poller (and webhook relay listener) on the running loop."""
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._poll_forever()))
+        if settings.assemblyai_webhooks_enabled:
+            self._tasks.append(asyncio.create_task(self._listen()))
+    
+    async def wait(self, transcript_id: str) -> Dict:
+        """
+        Wait for a submitted transcript to finish.
+        
+        Args:
+            transcript_id: Id returned by the AssemblyAI submit call
+            
+        Returns:
+            The transcript JSON (status "completed" or "error")
+            
+        Raises:
+            DeadlineExceeded: If the request deadline passed first
+            TimeoutError: After assemblyai_transcript_timeout_seconds
+        """
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[transcript_id] = future
+        self.submitted += 1
+        limit = settings.assemblyai_transcript_timeout_seconds
+        left = remaining()
+        try:
+            return await asyncio.wait_for(future, limit if left is None else max(0.0, min(left, limit)))
+        except asyncio.TimeoutError:
+            if left is not None and left <= limit:
+                raise DeadlineExceeded("Transcription did not finish before the request deadline")
+            raise TimeoutError(f"Transcription took longer than {limit:.0f}s")
+        finally:
+            self._pending.pop(transcript_id, None)
+    
+    async def check(self, transcript_id: str) -> bool:
+        """
+        Fetch a pending transcript and complete it if it has finished.
+        
+        Returns:
+            True if the transcript is tracked by this process
+        """
+        future = self._pending.get(transcript_id)
+        if future is None:
+            return False
+        try:
+            response = await self._client().get(f"/v2/transcript/{transcript_id}")
+            response.raise_for_status()
+            transcript = response.json()
+        except Exception as e:
+            print(f"⚠️  Transcript {transcript_id} status check failed: {e}")
+            return True
+            
+        if transcript.get("status") in TERMINAL_STATUSES and not future.done():
+            if transcript["status"] == "completed":
+                self.completed += 1
+            else:
+                self.failed += 1
+            future.set_result(transcript)
+        return True
+    
+    async def notify(self, transcript_id: str) -> None:
+        """Handle a webhook callback for a finished transcript."""
+        self.webhooks += 1
+        if await self.check(transcript_id):
+            return
+        # Submitted by another worker process: hand it over through Redis
+        try:
+            await self._redis_client().publish(WEBHOOK_CHANNEL, json.dumps({"transcript_id": transcript_id}))
+        except Exception as e:
+            print(f"⚠️  Could not relay webhook for transcript {transcript_id}: {e}")
+    
+    async def _poll_forever(self) -> None:
+        while True:
+            interval = (
+                settings.assemblyai_webhook_poll_seconds
+                if settings.assemblyai_webhooks_enabled
+                else settings.assemblyai_poll_interval_seconds
+            )
+            await asyncio.sleep(interval)
+            pending = [tid for tid, future in self._pending.items() if not future.done()]
+            if pending:
+                self.polls += 1
+                await asyncio.gather(*(self.check(tid) for tid in pending))
+    
+    async def _listen(self) -> None:
+        """Complete transcripts whose webhooks reached another worker."""
+        while True:
+            try:
+                async with self._redis_client().pubsub() as pubsub:
+                    await pubsub.subscribe(WEBHOOK_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            await self.check(json.loads(message["data"])["transcript_id"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Webhook relay unavailable, relying on polling: {e}")
+                await asyncio.sleep(30)
+    
+    async def close(self) -> None:
+        """Stop background tasks and close connections."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+    
+    def stats(self) -> Dict:
+        """Pending transcripts and completion counters."""
+        return {
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "webhooks": self.webhooks,
+            "polls": self.polls
+        }
+
+
+# Singleton instance
+_tracker = None
+
+
+def get_transcript_tracker() -> TranscriptTracker:
+    """Get or create the transcript tracker."""
+    global _tracker
+    if _tracker is None:
+        _tracker = TranscriptTracker()
+    return _tracker
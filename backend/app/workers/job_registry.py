@@ -0,0 +1,83 @@
+"""
+Sentinel AI - Job Registry
+Records the ids of submitted analysis jobs in Redis, so unknown or expired
+ids can be told apart from jobs still waiting in the queue (Celery reports
+both as PENDING).
+"""
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from celery import Task
+from celery.result import AsyncResult
+
+from app.config import settings
+from app.utils.file_handler import job_upload_dir
+
+
+JOB_KEY_PREFIX = "sentinel:job:"
+JOB_ERROR_PREFIX = "sentinel:job-error:"
+
+
+class JobNotFound(LookupError):
+    """Raised for job ids that were never submitted or have expired."""
+
+
+# Shared Redis client
+_redis = None
+
+
+def get_redis():
+    """Get or create the Redis client used for job records."""
+    global _redis
+    if _redis is None:
+        import redis
+        
+        _redis = redis.from_url(settings.redis_url, socket_timeout=2.0, socket_connect_timeout=2.0)
+    return _redis
+
+
+def register_job(job_id: str) -> None:
+    """Remember a submitted job id for job_record_ttl_seconds."""
+    get_redis().set(f"{JOB_KEY_PREFIX}{job_id}", 1, ex=settings.job_record_ttl_seconds)
+
+
+def job_exists(job_id: str) -> bool:
+    """Whether a job id was submitted and has not expired."""
+    return bool(get_redis().exists(f"{JOB_KEY_PREFIX}{job_id}"))
+
+
+def mark_job_failed(job_id: str, error: str) -> None:
+    """Record that a job gave up, so it reads as failed even after its Celery result expires."""
+    try:
+        get_redis().set(f"{JOB_ERROR_PREFIX}{job_id}", error, ex=settings.job_record_ttl_seconds)
+    except Exception as e:
+        print(f"Could not record failure of job {job_id}: {e}")
+
+
+def job_error(job_id: str) -> Optional[str]:
+    """Error recorded by :func:`mark_job_failed`, or None."""
+    value = get_redis().get(f"{JOB_ERROR_PREFIX}{job_id}")
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def submit_job(task: Task, file_path: Path) -> AsyncResult:
+    """
+    Queue an analysis task for an uploaded file and record its id.
+    
+    The file is moved to the jobs upload directory first: the task deletes
+    it when done, and periodic cleanup only removes files there after
+    job_file_retention_seconds, so queued jobs keep their input.
+    
+    Args:
+        task: Celery task taking the file path
+        file_path: Materialized upload
+        
+    Returns:
+        The queued job
+    """
+    job_path = job_upload_dir() / file_path.name
+    shutil.move(str(file_path), str(job_path))
+    job = task.delay(str(job_path))
+    register_job(job.id)
+    return job
@@ -5,9 +5,35 @@ Async tasks for heavy processing operations.
 from pathlib import Path
 
 from app.workers.celery_app import celery_app
+from app.workers.job_registry import mark_job_failed
 from app.models.audio_analyzer import get_audio_analyzer
 from app.models.video_analyzer import get_video_analyzer
 from app.utils.file_handler import delete_file
+from app.utils.explainer import build_audio_result, build_video_result
+from app.utils.media_probe import MediaTooLongError
+from app.config import settings
+
+
+class AnalysisFailedError(RuntimeError):
+    """Raised when an analysis still fails after every retry."""
+
+
+def _retry_or_fail(task, file_path: Path, error: str):
+    """
+    Retry a failed analysis, or give up once max_retries are used.
+    
+    The input is kept for retries and deleted only when the job gives up.
+    
+    Raises:
+        celery.exceptions.Retry: While retries remain
+        AnalysisFailedError: Once they are used up
+    """
+    if task.request.retries < task.max_retries:
+        raise task.retry(exc=AnalysisFailedError(error), countdown=5)
+        
+    delete_file(file_path)
+    mark_job_failed(task.request.id, error)
+    raise AnalysisFailedError(error)
 
 
 @celery_app.task(bind=True, max_retries=3)
@@ -19,19 +45,29 @@ def analyze_audio_task(self, file_path: str) -> dict:
         file_path: Path to the audio file
         
     Returns:
-        Analysis results dict
+        AudioAnalysisResult as a JSON-compatible dict
     """
+    path = Path(file_path)
     try:
         analyzer = get_audio_analyzer()
-        result = analyzer.analyze(Path(file_path))
+        result = analyzer.analyze(path)
+    except Exception as e:
+        _retry_or_fail(self, path, str(e))
         
-        # Clean up file after processing
-        delete_file(Path(file_path))
+    # The analyzer reports upstream and decode errors as a neutral result
+    if result.get("failed"):
+        _retry_or_fail(self, path, result["reasoning"])
         
-        return result
-    except Exception as e:
-        # Retry on failure
-        raise self.retry(exc=e, countdown=5)
+    # Clean up file after processing
+    delete_file(path)
+    
+    # Check duration limit
+    if result["duration_seconds"] > settings.max_audio_duration_seconds:
+        raise MediaTooLongError(
+            f"Audio too long. Maximum duration: {settings.max_audio_duration_seconds} seconds"
+        )
+        
+    return build_audio_result(result).model_dump(mode="json")
 
 
 @celery_app.task(bind=True, max_retries=3)
@@ -43,16 +79,26 @@ def analyze_video_task(self, file_path: str) -> dict:
         file_path: Path to the video file
         
     Returns:
-        Analysis results dict
+        VideoAnalysisResult as a JSON-compatible dict
     """
+    path = Path(file_path)
     try:
         analyzer = get_video_analyzer()
-        result = analyzer.analyze(Path(file_path))
+        result = analyzer.analyze(path)
+    except Exception as e:
+        _retry_or_fail(self, path, str(e))
         
-        # Clean up file after processing
-        delete_file(Path(file_path))
+    # The analyzer reports upstream and decode errors as a neutral result
+    if result.get("failed"):
+        _retry_or_fail(self, path, result["reasoning"])
         
-        return result
-    except Exception as e:
-        # Retry on failure
-        raise self.retry(exc=e, countdown=5)
+    # Clean up file after processing
+    delete_file(path)
+    
+    # Check duration limit
+    if result["duration_seconds"] > settings.max_video_duration_seconds:
+        raise MediaTooLongError(
+            f"Video too long. Maximum duration: {settings.max_video_duration_seconds} seconds"
+        )
+        
+    return build_video_result(result).model_dump(mode="json")
@@ -0,0 +1,415 @@
+"""
+Sentinel AI - Load Test
+Starts the stub upstream server and the API (pointed at the stub), drives
+/analyze/{text,image,audio,video} at a fixed request rate and reports
+p50/p95/p99 latency, throughput and peak server memory per endpoint.
+Results are saved as JSON so runs can be compared commit to commit; no
+network access is needed.
+
+Usage (from backend/)::
+
+    python -m benchmarks.load_test [--endpoints text,image,audio,video]
+        [--rps 10] [--duration 30] [--latency-ms 800] [--error-rate 0.01]
+        [--output results.json] [--compare previous.json]
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import httpx
+import numpy as np
+from PIL import Image
+
+from benchmarks.stub_upstream import add_latency_arguments
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# (path, upload filename, MIME type); text is posted as JSON
+ENDPOINTS = {
+    "text": ("/analyze/text", None, None),
+    "image": ("/analyze/image", "bench.jpg", "image/jpeg"),
+    "audio": ("/analyze/audio", "bench.wav", "audio/wav"),
+    "video": ("/analyze/video", "bench.mp4", "video/mp4"),
+}
+
+_OPENERS = ["Hi", "Dear customer", "Hey it's me", "URGENT", "Hello", "Reminder"]
+_BODIES = [
+    "your parcel is held at the depot, pay the fee at http://parcel-check.example/{n}",
+    "can you pick up milk on the way home? order {n}",
+    "your account {n} was locked, verify your identity within 24 hours",
+    "the meeting moved to 3pm, room {n}",
+    "you won a gift card! claim code {n} before midnight",
+    "I lost my phone, please send $200 to this new number ({n})",
+]
+
+
+# =============================================================================
+# Payloads (unique per request so caches and indexes are not measured)
+# =============================================================================
+
+def make_texts(count: int, rng: np.random.Generator) -> List[dict]:
+    return [
+        {"text": f"{rng.choice(_OPENERS)}, {rng.choice(_BODIES).format(n=i)} #{rng.integers(1 << 30)}"}
+        for i in range(count)
+    ]
+
+
+def make_images(count: int, rng: np.random.Generator, size: Tuple[int, int] = (1024, 768)) -> List[bytes]:
+    width, height = size
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    images = []
+    for _ in range(count):
+        base = 128 + 60 * np.sin(xx / rng.uniform(20, 200)) * np.cos(yy / rng.uniform(20, 200))
+        pixels = np.clip(base[..., None] + rng.normal(0, 6, size=(height, width, 3)), 0, 255).astype(np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(pixels).save(buf, "JPEG", quality=90)
+        images.append(buf.getvalue())
+    return images
+
+
+def make_audio(count: int, rng: np.random.Generator, seconds: float = 5.0, rate: int = 16000) -> List[bytes]:
+    import wave
+    
+    t = np.arange(int(seconds * rate)) / rate
+    clips = []
+    for _ in range(count):
+        tone = np.sin(2 * np.pi * rng.uniform(100, 300) * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+        samples = (np.clip(tone + rng.normal(0, 0.05, t.size), -1, 1) * 20000).astype(np.int16)
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(rate)
+            w.writeframes(samples.tobytes())
+        clips.append(buf.getvalue())
+    return clips
+
+
+def make_videos(count: int, rng: np.random.Generator, seconds: float = 4.0, fps: int = 15) -> List[bytes]:
+    width, height = 640, 360
+    videos = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clip.mp4")
+        for _ in range(count):
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+            color = rng.integers(0, 255, size=3)
+            for i in range(int(seconds * fps)):
+                frame = np.full((height, width, 3), color, dtype=np.uint8)
+                # A moving block and a scene cut halfway through
+                x = (i * 12) % (width - 80)
+                frame[140:220, x:x + 80] = 255 - color
+                if i >= seconds * fps / 2:
+                    frame = 255 - frame
+                writer.write(frame)
+            writer.release()
+            videos.append(Path(path).read_bytes())
+    return videos
+
+
+PAYLOAD_FACTORIES: Dict[str, Callable[[int, np.random.Generator], list]] = {
+    "text": make_texts,
+    "image": make_images,
+    "audio": make_audio,
+    "video": make_videos,
+}
+
+
+# =============================================================================
+# Processes
+# =============================================================================
+
+def _rss_bytes(pid: int) -> int:
+    """Resident memory of a process and its direct children (Linux)."""
+    total = 0
+    pids = [pid]
+    try:
+        for task in Path(f"/proc/{pid}/task").iterdir():
+            children = (task / "children").read_text().split()
+            pids.extend(int(child) for child in children)
+    except OSError:
+        pass
+    for p in pids:
+        try:
+            for line in Path(f"/proc/{p}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total
+
+
+def _wait_for(url: str, timeout: float, proc: subprocess.Popen) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} process exited with code {proc.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def _server_output(args: argparse.Namespace):
+    return None if args.verbose else subprocess.DEVNULL
+
+
+def start_stub(args: argparse.Namespace) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "benchmarks.stub_upstream",
+        "--port", str(args.stub_port),
+        "--latency-ms", str(args.latency_ms),
+        "--assemblyai-latency-ms", str(args.assemblyai_latency_ms),
+        "--distribution", args.distribution,
+        "--sigma", str(args.sigma),
+        "--error-rate", str(args.error_rate),
+        "--throttle-rate", str(args.throttle_rate),
+        "--seed", str(args.seed),
+    ]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, stdout=_server_output(args), stderr=subprocess.STDOUT)
+    _wait_for(f"http://127.0.0.1:{args.stub_port}/stub/calls", 30, proc)
+    return proc
+
+
+def start_api(args: argparse.Namespace) -> subprocess.Popen:
+    stub = f"http://127.0.0.1:{args.stub_port}"
+    env = dict(
+        os.environ,
+        GEMINI_API_KEY="stub",
+        ASSEMBLYAI_API_KEY="stub",
+        GEMINI_TRANSPORT="rest",
+        GEMINI_API_ENDPOINT=stub,
+        ASSEMBLYAI_BASE_URL=stub,
+    )
+    if not args.keep_caches:
+        env.update(CACHE_ENABLED="false", NEAR_DUPLICATE_ENABLED="false", PERCEPTUAL_INDEX_ENABLED="false")
+    cmd = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1",
+        "--port", str(args.api_port),
+        "--workers", str(args.workers),
+        "--log-level", "warning",
+        "--no-access-log",
+    ]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=_server_output(args), stderr=subprocess.STDOUT)
+    _wait_for(f"http://127.0.0.1:{args.api_port}/health", 60, proc)
+    return proc
+
+
+def stop(proc: Optional[subprocess.Popen]) -> None:
+    if proc is not None and proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# =============================================================================
+# Driver
+# =============================================================================
+
+async def _send(client: httpx.AsyncClient, endpoint: str, payload) -> Tuple[int, bool]:
+    path, filename, mime = ENDPOINTS[endpoint]
+    if filename is None:
+        response = await client.post(path, json=payload)
+    else:
+        response = await client.post(path, files={"file": (filename, payload, mime)})
+    degraded = False
+    if response.status_code == 200:
+        degraded = bool(response.json().get("degraded"))
+    return response.status_code, degraded
+
+
+async def drive(
+    base_url: str,
+    endpoint: str,
+    payloads: list,
+    rps: float,
+    duration: float,
+    timeout: float,
+    server_pid: int
+) -> Dict:
+    """
+    Open-loop load at a fixed rate: request i is sent at start + i / rps
+    whether or not earlier requests have finished, and its latency is
+    measured from that scheduled time (no coordinated omission).
+    """
+    total = max(1, int(rps * duration))
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    degraded = 0
+    peak_rss = _rss_bytes(server_pid)
+    done = asyncio.Event()
+    
+    async def sample_memory():
+        nonlocal peak_rss
+        while not done.is_set():
+            peak_rss = max(peak_rss, _rss_bytes(server_pid))
+            await asyncio.sleep(0.1)
+            
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        
+        async def one(i: int):
+            nonlocal degraded
+            scheduled = start + i / rps
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            try:
+                status, was_degraded = await _send(client, endpoint, payloads[i % len(payloads)])
+                key = str(status)
+                degraded += was_degraded
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+            statuses[key] = statuses.get(key, 0) + 1
+            latencies.append((time.perf_counter() - scheduled) * 1000.0)
+            
+        sampler = asyncio.create_task(sample_memory())
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await sampler
+        
+    values = np.array(latencies)
+    ok = statuses.get("200", 0)
+    return {
+        "requests": total,
+        "ok": ok,
+        "errors": total - ok,
+        "degraded": degraded,
+        "status_counts": statuses,
+        "target_rps": rps,
+        "throughput_rps": round(ok / elapsed, 2),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "p99_ms": round(float(np.percentile(values, 99)), 2),
+        "mean_ms": round(float(values.mean()), 2),
+        "max_ms": round(float(values.max()), 2),
+        "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+    }
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: Dict[str, Dict]) -> None:
+    print(f"  {'endpoint':<10}{'ok/sent':>10}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS MB':>9}")
+    for endpoint, r in results.items():
+        sent = f"{r['ok']}/{r['requests']}"
+        print(
+            f"  {endpoint:<10}{sent:>10}{r['throughput_rps']:>8.1f}"
+            f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['peak_rss_mb']:>9.1f}"
+        )
+
+
+def print_comparison(results: Dict[str, Dict], previous: Dict) -> None:
+    """Percentage change per metric against an earlier results file."""
+    before = previous.get("endpoints", {})
+    print(f"\nCompared with {previous.get('commit') or 'previous run'} ({previous.get('timestamp', '?')}):")
+    for endpoint, r in results.items():
+        if endpoint not in before:
+            continue
+        changes = []
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb"):
+            old = before[endpoint].get(metric)
+            if old:
+                changes.append(f"{metric} {100.0 * (r[metric] - old) / old:+.1f}%")
+        print(f"  {endpoint:<10}" + ", ".join(changes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test against a stub upstream")
+    parser.add_argument("--endpoints", default="text,image,audio,video")
+    parser.add_argument("--rps", type=float, default=10.0, help="Requests per second per endpoint")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per endpoint")
+    parser.add_argument("--unique", type=int, default=200, help="Distinct payloads per endpoint (cycled)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout per request")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--stub-port", type=int, default=8765)
+    parser.add_argument("--verbose", action="store_true", help="Show stub and API server output")
+    parser.add_argument("--keep-caches", action="store_true", help="Leave result cache and indexes on")
+    parser.add_argument("--output", type=Path, help="Results file (default benchmarks/results/load-<commit>-<time>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+    
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+        
+    rng = np.random.default_rng(args.seed)
+    count = min(args.unique, max(1, int(args.rps * args.duration)))
+    payloads = {}
+    for endpoint in endpoints:
+        start = time.perf_counter()
+        payloads[endpoint] = PAYLOAD_FACTORIES[endpoint](count, rng)
+        print(f"Generated {count} {endpoint} payloads in {time.perf_counter() - start:.1f}s")
+        
+    stub = api = None
+    results: Dict[str, Dict] = {}
+    try:
+        stub = start_stub(args)
+        api = start_api(args)
+        base_url = f"http://127.0.0.1:{args.api_port}"
+        for endpoint in endpoints:
+            print(f"Driving {ENDPOINTS[endpoint][0]} at {args.rps:g} rps for {args.duration:g}s...")
+            results[endpoint] = asyncio.run(drive(
+                base_url, endpoint, payloads[endpoint], args.rps, args.duration, args.timeout, api.pid
+            ))
+    finally:
+        stop(api)
+        stop(stub)
+        
+    commit = _git_commit()
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    report = {
+        "commit": commit,
+        "timestamp": timestamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "endpoints": results,
+    }
+    output = args.output or RESULTS_DIR / f"load-{commit or 'nocommit'}-{timestamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    
+    print(f"\nLoad test ({args.distribution} upstream, median {args.latency_ms:g} ms, "
+          f"{args.error_rate:.0%} errors, {args.throttle_rate:.0%} throttled):")
+    print_results(results)
+    if args.compare:
+        print_comparison(results, json.loads(args.compare.read_text()))
+    print(f"\nSaved {output}")
+
+
+if __name__ == "__main__":
+    main()
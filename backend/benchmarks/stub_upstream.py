@@ -0,0 +1,280 @@
+"""
+Sentinel AI - Stub Upstream Server
+Local stand-in for the Gemini REST API and AssemblyAI with configurable
+latency distributions and error rates, so the API can be load tested
+offline. Gemini answers are generated from the request's response schema;
+transcripts stay queued/processing for the sampled AssemblyAI latency and
+call the submitted webhook when they complete.
+
+Usage (from backend/)::
+
+    python -m benchmarks.stub_upstream [--port 8765] [--latency-ms 800]
+        [--distribution lognormal] [--error-rate 0.01] [--throttle-rate 0]
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+_ITEM_RE = re.compile(r"^\[(\d+)\] ", re.MULTILINE)
+
+# google.ai.generativelanguage Type values (REST sends enums as integers)
+_SCHEMA_TYPES = {1: "string", 2: "number", 3: "integer", 4: "boolean", 5: "array", 6: "object"}
+
+
+class LatencyModel:
+    """
+    Samples upstream latency and failures.
+    
+    Distributions: "fixed" (always median), "uniform" (0 to 2x median) and
+    "lognormal" (given median, shape sigma; a long right tail like real
+    model latency).
+    """
+    
+    def __init__(
+        self,
+        median_ms: float,
+        distribution: str = "lognormal",
+        sigma: float = 0.5,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.median_ms = median_ms
+        self.distribution = distribution
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._rng = random.Random(seed)
+    
+    def sample_seconds(self) -> float:
+        if self.distribution == "fixed":
+            ms = self.median_ms
+        elif self.distribution == "uniform":
+            ms = self._rng.uniform(0.0, 2.0 * self.median_ms)
+        else:
+            ms = self.median_ms * self._rng.lognormvariate(0.0, self.sigma)
+        return ms / 1000.0
+    
+    def failure(self) -> Optional[JSONResponse]:
+        """A 429 or 503 response for this call, or None to succeed."""
+        roll = self._rng.random()
+        if roll < self.throttle_rate:
+            return JSONResponse(
+                {"error": {"code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED"}},
+                status_code=429,
+                headers={"Retry-After": "1"}
+            )
+        if roll < self.throttle_rate + self.error_rate:
+            return JSONResponse(
+                {"error": {"code": 503, "message": "The model is overloaded", "status": "UNAVAILABLE"}},
+                status_code=503
+            )
+        return None
+
+
+def fake_value(schema: Dict[str, Any], rng: random.Random, count: int = 1) -> Any:
+    """
+    Build a value matching a Gemini response schema.
+    
+    Args:
+        schema: OpenAPI-style schema from generationConfig.responseSchema
+        rng: Random source
+        count: Number of items for a top-level array (batch prompts)
+    """
+    kind = schema.get("type", "object")
+    kind = _SCHEMA_TYPES.get(kind, "string") if isinstance(kind, int) else str(kind).lower()
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if kind == "object":
+        return {name: fake_value(prop, rng) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        items = [fake_value(schema.get("items", {}), rng) for _ in range(count)]
+        for i, item in enumerate(items, start=1):
+            if isinstance(item, dict) and "id" in item:
+                item["id"] = i
+        return items
+    if kind == "integer":
+        return rng.randint(0, 100)
+    if kind == "number":
+        return round(rng.random(), 3)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    return "Stub verdict generated offline for benchmarking."
+
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    return "\n".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+def create_app(gemini: LatencyModel, assemblyai: LatencyModel) -> FastAPI:
+    """Build the stub app with one latency model per backend."""
+    app = FastAPI(title="Sentinel AI stub upstream")
+    rng = random.Random(0)
+    transcripts: Dict[str, Dict[str, Any]] = {}
+    app.state.calls = {"gemini": 0, "assemblyai": 0}
+    
+    # Gemini REST (v1beta)
+    @app.get("/v1beta/models/{model}")
+    async def get_model(model: str):
+        return {
+            "name": f"models/{model}",
+            "baseModelId": model,
+            "version": "stub",
+            "displayName": model,
+            "description": "Stub model",
+            "inputTokenLimit": 1048576,
+            "outputTokenLimit": 8192,
+            "supportedGenerationMethods": ["generateContent"]
+        }
+    
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def generate_content(model: str, request: Request):
+        app.state.calls["gemini"] += 1
+        body = await request.json()
+        await asyncio.sleep(gemini.sample_seconds())
+        failed = gemini.failure()
+        if failed is not None:
+            return failed
+            
+        config = body.get("generationConfig", {})
+        schema = config.get("responseSchema") or config.get("response_schema") or {}
+        count = max(1, len(_ITEM_RE.findall(_prompt_text(body))))
+        text = json.dumps(fake_value(schema, rng, count))
+        return {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+                "index": 0
+            }],
+            "usageMetadata": {"promptTokenCount": 100, "candidatesTokenCount": 50, "totalTokenCount": 150}
+        }
+        
+    # AssemblyAI (v2)
+    @app.post("/v2/upload")
+    async def upload(request: Request):
+        await request.body()
+        return {"upload_url": f"https://stub.invalid/{uuid.uuid4()}"}
+    
+    @app.get("/v2/transcript")
+    async def list_transcripts():
+        return {"page_details": {"limit": 1, "result_count": 0, "current_url": "", "prev_url": None, "next_url": None}, "transcripts": []}
+    
+    async def send_webhook(body: Dict[str, Any], transcript_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        headers = {}
+        if body.get("webhook_auth_header_name"):
+            headers[body["webhook_auth_header_name"]] = body.get("webhook_auth_header_value") or ""
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                await client.post(
+                    body["webhook_url"],
+                    json={"transcript_id": transcript_id, "status": "completed"},
+                    headers=headers
+                )
+        except Exception as e:
+            print(f"Stub webhook to {body['webhook_url']} failed: {e}")
+    
+    @app.post("/v2/transcript")
+    async def submit(request: Request):
+        app.state.calls["assemblyai"] += 1
+        body = await request.json()
+        failed = assemblyai.failure()
+        if failed is not None:
+            return failed
+            
+        # Processing time is the sampled latency; polls see "processing" until then
+        delay = assemblyai.sample_seconds()
+        transcript = {
+            "id": str(uuid.uuid4()),
+            "audio_url": body.get("audio_url", ""),
+            "status": "queued",
+            "text": None,
+            "confidence": None,
+            "audio_duration": None,
+            "language_code": "en_us",
+            "webhook_url": body.get("webhook_url"),
+            "words": []
+        }
+        transcripts[transcript["id"]] = {
+            "ready_at": time.monotonic() + delay,
+            "transcript": dict(
+                transcript,
+                status="completed",
+                text="Hello, this is your bank calling about a suspicious payment on your account.",
+                confidence=round(0.8 + 0.2 * rng.random(), 3),
+                audio_duration=10
+            )
+        }
+        if body.get("webhook_url"):
+            asyncio.create_task(send_webhook(body, transcript["id"], delay))
+        return transcript
+    
+    @app.get("/v2/transcript/{transcript_id}")
+    async def get_transcript(transcript_id: str):
+        entry = transcripts.get(transcript_id)
+        if entry is None:
+            return JSONResponse({"error": "Transcript not found"}, status_code=404)
+        if time.monotonic() < entry["ready_at"]:
+            return dict(entry["transcript"], status="processing", text=None, confidence=None, audio_duration=None)
+        return entry["transcript"]
+    
+    @app.get("/stub/calls")
+    async def calls():
+        return app.state.calls
+        
+    return app
+
+
+def add_latency_arguments(parser: argparse.ArgumentParser) -> None:
+    """Latency and failure options shared with the load test."""
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median Gemini latency")
+    parser.add_argument("--assemblyai-latency-ms", type=float, default=2000.0, help="Median transcription latency")
+    parser.add_argument("--distribution", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Lognormal shape (tail weight)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of calls answered with 429")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def latency_models(args: argparse.Namespace):
+    """Gemini and AssemblyAI latency models from parsed arguments."""
+    common = dict(
+        distribution=args.distribution,
+        sigma=args.sigma,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate
+    )
+    return (
+        LatencyModel(args.latency_ms, seed=args.seed, **common),
+        LatencyModel(args.assemblyai_latency_ms, seed=args.seed + 1, **common)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub Gemini / AssemblyAI server for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+    
+    app = create_app(*latency_models(args))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
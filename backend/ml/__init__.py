@@ -0,0 +1,4 @@
+"""
+Sentinel AI - Local ML
+Offline feature extraction, inference and training code.
+"""
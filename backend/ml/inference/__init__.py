@@ -0,0 +1,4 @@
+"""
+Sentinel AI - Local Inference
+CPU-only models that run before (or instead of) remote analysis.
+"""
@@ -0,0 +1,177 @@
+"""
+Sentinel AI - Audio Pre-screen
+Fast local voice-spoofing classifier using librosa features and a
+logistic-regression model stored as JSON.
+"""
+import json
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Union
+
+import numpy as np
+
+from app.config import settings
+
+
+SAMPLE_RATE = 16000
+N_MFCC = 13
+HOP_LENGTH = 256
+SILENCE_DB = -40.0
+
+# Order of the feature vector; stored in the model file and checked on load
+FEATURE_NAMES: List[str] = (
+    [f"mfcc_mean_{i}" for i in range(N_MFCC)]
+    + [f"mfcc_std_{i}" for i in range(N_MFCC)]
+    + [
+        "flatness_mean",
+        "flatness_std",
+        "pitch_jitter",
+        "pitch_cv",
+        "voiced_ratio",
+        "silence_ratio"
+    ]
+)
+
+DEFAULT_MODEL_PATH = Path(__file__).parent / "models" / "audio_prescreen.json"
+
+
+def load_audio(source: Union[Path, BinaryIO], max_seconds: Optional[float] = None) -> np.ndarray:
+    """
+    Decode audio to mono float32 at SAMPLE_RATE.
+    
+    Args:
+        source: Path or binary file object
+        max_seconds: Only decode this much audio if set
+        
+    Returns:
+        1-D waveform
+    """
+    import librosa
+    
+    y, _ = librosa.load(source, sr=SAMPLE_RATE, mono=True, duration=max_seconds)
+    return y.astype(np.float32)
+
+
+def extract_features(y: np.ndarray) -> np.ndarray:
+    """
+    Compute the pre-screen feature vector for a waveform.
+    
+    All features are frame-level matrices reduced with NumPy, so a 30 s
+    clip takes a few tens of milliseconds.
+    
+    Args:
+        y: Mono waveform at SAMPLE_RATE
+        
+    Returns:
+        Feature vector ordered as FEATURE_NAMES
+    """
+    import librosa
+    
+    if y.size < HOP_LENGTH * 4:
+        raise ValueError("Audio too short for pre-screening")
+        
+    # Shared power spectrogram for MFCC and flatness
+    S = np.abs(librosa.stft(y, n_fft=1024, hop_length=HOP_LENGTH)) ** 2
+    mfcc = librosa.feature.mfcc(
+        S=librosa.power_to_db(librosa.feature.melspectrogram(S=S, sr=SAMPLE_RATE)),
+        n_mfcc=N_MFCC
+    )
+    flatness = librosa.feature.spectral_flatness(S=S, power=1.0)[0]
+    
+    # Loudness per frame drives both silence and voicing decisions
+    rms = librosa.feature.rms(S=np.sqrt(S), frame_length=1024, hop_length=HOP_LENGTH)[0]
+    rms_db = librosa.amplitude_to_db(rms, ref=np.max)
+    silent = rms_db < SILENCE_DB
+    
+    # YIN pitch track; jitter is relative frame-to-frame pitch change
+    f0 = librosa.yin(y, fmin=65.0, fmax=400.0, sr=SAMPLE_RATE, frame_length=1024, hop_length=HOP_LENGTH)
+    n = min(f0.size, silent.size)
+    voiced = f0[:n][~silent[:n]]
+    if voiced.size > 2:
+        pitch_jitter = float(np.mean(np.abs(np.diff(voiced))) / np.mean(voiced))
+        pitch_cv = float(np.std(voiced) / np.mean(voiced))
+    else:
+        pitch_jitter = 0.0
+        pitch_cv = 0.0
+        
+    return np.concatenate([
+        mfcc.mean(axis=1),
+        mfcc.std(axis=1),
+        [
+            float(flatness.mean()),
+            float(flatness.std()),
+            pitch_jitter,
+            pitch_cv,
+            voiced.size / float(n or 1),
+            float(silent.mean())
+        ]
+    ]).astype(np.float32)
+
+
+class AudioPrescreen:
+    """
+    Logistic-regression pre-screen over :func:`extract_features`.
+    
+    The model file holds standardization parameters and weights produced
+    by ``ml/training/train_audio_prescreen.py``. Without a model file the
+    pre-screen stays unloaded and callers skip it.
+    """
+    
+    def __init__(self, model_path: Path = DEFAULT_MODEL_PATH):
+        self.model_path = Path(model_path)
+        self.loaded = False
+        
+        if not self.model_path.exists():
+            print(f"⚠️  Audio pre-screen model not found at {self.model_path}; pre-screen disabled "
+                  f"(train one with: python -m ml.training.train_audio_prescreen DATA_DIR)")
+            return
+            
+        with open(self.model_path, "r", encoding="utf-8") as f:
+            model = json.load(f)
+            
+        if model["feature_names"] != FEATURE_NAMES:
+            print("⚠️  Audio pre-screen model was trained on different features; pre-screen disabled")
+            return
+            
+        self.mean = np.asarray(model["mean"], dtype=np.float32)
+        self.scale = np.asarray(model["scale"], dtype=np.float32)
+        self.coef = np.asarray(model["coef"], dtype=np.float32)
+        self.intercept = float(model["intercept"])
+        self.loaded = True
+    
+    def predict_proba(self, features: np.ndarray) -> float:
+        """Probability that the clip is synthetic (TTS or cloned)."""
+        z = float(np.dot((features - self.mean) / self.scale, self.coef)) + self.intercept
+        return float(1.0 / (1.0 + np.exp(-z)))
+    
+    def screen(self, source: Union[Path, BinaryIO], max_seconds: Optional[float] = None) -> Dict:
+        """
+        Score an audio clip locally.
+        
+        Args:
+            source: Path or binary file object
+            max_seconds: Only decode this much audio if set
+            
+        Returns:
+            Dict with synthetic_probability, duration_seconds and elapsed_ms
+        """
+        start = time.perf_counter()
+        y = load_audio(source, max_seconds)
+        probability = self.predict_proba(extract_features(y))
+        return {
+            "synthetic_probability": probability,
+            "duration_seconds": y.size / float(SAMPLE_RATE),
+            "elapsed_ms": (time.perf_counter() - start) * 1000.0
+        }
+
+
+# Singleton instance
+_prescreen = None
+
+
+def get_audio_prescreen() -> AudioPrescreen:
+    """Get or create the audio pre-screen instance."""
+    global _prescreen
+    if _prescreen is None:
+        _prescreen = AudioPrescreen(settings.audio_prescreen_model_path or DEFAULT_MODEL_PATH)
+    return _prescreen
@@ -0,0 +1,254 @@
+"""
+Sentinel AI - Image Forensics
+CPU-only forensic signals (error level analysis, FFT spectral artifacts,
+noise residual statistics) scored by a pluggable local model.
+"""
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from app.config import settings
+
+
+ELA_QUALITY = 90
+BLOCK_SIZE = 16
+FFT_SIZE = 512
+
+FEATURE_NAMES: List[str] = [
+    "ela_mean",
+    "ela_std",
+    "ela_block_cv",
+    "spectral_slope",
+    "high_freq_ratio",
+    "spectral_peakiness",
+    "residual_std",
+    "residual_kurtosis",
+    "residual_block_cv"
+]
+
+DEFAULT_MODEL_PATH = Path(__file__).parent / "models" / "image_forensics.json"
+
+
+def _block_stat(values: np.ndarray, size: int, stat) -> np.ndarray:
+    """Apply a reduction over non-overlapping size x size blocks."""
+    h = values.shape[0] // size * size
+    w = values.shape[1] // size * size
+    blocks = values[:h, :w].reshape(h // size, size, w // size, size)
+    return stat(blocks, axis=(1, 3))
+
+
+def _cv(values: np.ndarray) -> float:
+    """Coefficient of variation, 0 for an all-zero input."""
+    mean = float(values.mean())
+    return float(values.std()) / mean if mean > 1e-6 else 0.0
+
+
+@lru_cache(maxsize=8)
+def _spectrum_geometry(size: int):
+    """Window, integer radius map and ring sizes for a size x size FFT."""
+    window = np.outer(np.hanning(size), np.hanning(size)).astype(np.float32)
+    yy, xx = np.indices((size, size))
+    radius = np.hypot(yy - size // 2, xx - size // 2).astype(np.int32).ravel()
+    counts = np.maximum(np.bincount(radius), 1)
+    return window, radius, counts
+
+
+def ela_features(rgb: np.ndarray) -> List[float]:
+    """
+    Error level analysis: how much the image changes when re-saved as JPEG.
+    
+    Spliced or retouched regions re-compress differently from the rest of
+    the frame, which shows up as uneven block-level error.
+    """
+    bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+    ok, encoded = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, ELA_QUALITY])
+    if not ok:
+        raise ValueError("Could not re-encode image for ELA")
+    resaved = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+    
+    # Per-pixel max over channels (cv2.max is much faster than ndarray.max)
+    b, g, r = cv2.split(cv2.absdiff(bgr, resaved))
+    error = cv2.max(cv2.max(b, g), r).astype(np.float32)
+    blocks = _block_stat(error, BLOCK_SIZE, np.mean)
+    return [float(error.mean()) / 255.0, float(error.std()) / 255.0, _cv(blocks)]
+
+
+def spectral_features(gray: np.ndarray) -> List[float]:
+    """
+    FFT features from the azimuthally averaged power spectrum.
+    
+    Natural photos fall off smoothly with frequency; generator upsampling
+    leaves periodic peaks and an unusual amount of high-frequency energy.
+    """
+    # Centre crop to a fixed size keeps the FFT cost constant
+    h, w = gray.shape
+    size = min(FFT_SIZE, h, w)
+    top, left = (h - size) // 2, (w - size) // 2
+    crop = gray[top:top + size, left:left + size]
+    window, radius, counts = _spectrum_geometry(size)
+    crop = (crop - crop.mean()) * window
+    
+    spectrum = np.fft.fftshift(np.fft.fft2(crop))
+    power = (spectrum.real ** 2 + spectrum.imag ** 2).ravel()
+    profile = np.bincount(radius, weights=power) / counts
+    profile = profile[1:size // 2]
+    
+    freqs = np.arange(1, size // 2, dtype=np.float64)
+    log_profile = np.log(profile + 1e-8)
+    slope = float(np.polyfit(np.log(freqs), log_profile, 1)[0])
+    
+    half = len(profile) // 2
+    high_ratio = float(profile[half:].sum() / (profile.sum() + 1e-8))
+    
+    # Peaks standing out of the high band after removing the trend
+    high = log_profile[half:] - np.polyval(np.polyfit(freqs[half:], log_profile[half:], 1), freqs[half:])
+    peakiness = float(high.max() / (high.std() + 1e-8))
+    
+    return [slope, high_ratio, peakiness]
+
+
+def residual_features(gray: np.ndarray) -> List[float]:
+    """
+    Statistics of the high-pass noise residual.
+    
+    Camera sensors leave roughly uniform, heavy-tailed noise; generated or
+    composited images tend to have smoother or patchier residuals.
+    """
+    gray_u8 = np.clip(gray, 0, 255).astype(np.uint8)
+    residual = gray - cv2.medianBlur(gray_u8, 3).astype(np.float32)
+    
+    squared = residual * residual
+    variance = float(squared.mean()) - float(residual.mean()) ** 2
+    kurtosis = float(np.mean(squared * squared)) / (variance ** 2 + 1e-8) - 3.0
+    
+    # Block standard deviations from block means of r and r^2
+    block_var = (
+        _block_stat(squared, BLOCK_SIZE * 2, np.mean)
+        - _block_stat(residual, BLOCK_SIZE * 2, np.mean) ** 2
+    )
+    blocks = np.sqrt(np.maximum(block_var, 0.0))
+    return [float(np.sqrt(max(variance, 0.0))), kurtosis, _cv(blocks)]
+
+
+def extract_features(rgb: np.ndarray) -> np.ndarray:
+    """
+    Compute the forensic feature vector for an RGB image.
+    
+    Args:
+        rgb: HxWx3 uint8 array
+        
+    Returns:
+        Feature vector ordered as FEATURE_NAMES
+    """
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY).astype(np.float32)
+    return np.asarray(
+        ela_features(rgb) + spectral_features(gray) + residual_features(gray),
+        dtype=np.float32
+    )
+
+
+class _LinearModel:
+    """Logistic regression stored as JSON (standardization + weights)."""
+    
+    def __init__(self, model: Dict):
+        self.mean = np.asarray(model["mean"], dtype=np.float32)
+        self.scale = np.asarray(model["scale"], dtype=np.float32)
+        self.coef = np.asarray(model["coef"], dtype=np.float32)
+        self.intercept = float(model["intercept"])
+    
+    def predict_proba(self, features: np.ndarray) -> float:
+        z = float(np.dot((features - self.mean) / self.scale, self.coef)) + self.intercept
+        return float(1.0 / (1.0 + np.exp(-z)))
+
+
+class _OnnxModel:
+    """
+    ONNX classifier run with the CPU execution provider.
+    
+    The graph takes a [1, N] float32 feature tensor; the last value of its
+    first output is read as the AI-generated probability.
+    """
+    
+    def __init__(self, model_path: Path):
+        import onnxruntime as ort
+        
+        self.session = ort.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+    
+    def predict_proba(self, features: np.ndarray) -> float:
+        outputs = self.session.run(None, {self.input_name: features.reshape(1, -1)})
+        return float(np.asarray(outputs[0], dtype=np.float32).ravel()[-1])
+
+
+class ForensicsEngine:
+    """
+    Forensic feature extractor plus an optional model.
+    
+    ``.json`` model files are loaded as NumPy logistic regressions (see
+    ``ml/training/train_image_forensics.py``); ``.onnx`` files run through
+    ONNX Runtime. Without a model the engine stays unloaded.
+    """
+    
+    def __init__(self, model_path: Path = DEFAULT_MODEL_PATH):
+        self.model_path = Path(model_path)
+        self.model = None
+        self.loaded = False
+        
+        if not self.model_path.exists():
+            print(f"⚠️  Image forensics model not found at {self.model_path}; local forensics disabled "
+                  f"(train one with: python -m ml.training.train_image_forensics DATA_DIR)")
+            return
+            
+        if self.model_path.suffix == ".onnx":
+            self.model = _OnnxModel(self.model_path)
+        else:
+            with open(self.model_path, "r", encoding="utf-8") as f:
+                model = json.load(f)
+            if model["feature_names"] != FEATURE_NAMES:
+                print("⚠️  Image forensics model was trained on different features; local forensics disabled")
+                return
+            self.model = _LinearModel(model)
+            
+        self.loaded = True
+    
+    def analyze(self, rgb: np.ndarray) -> Dict:
+        """
+        Score an image locally.
+        
+        Args:
+            rgb: HxWx3 uint8 array
+            
+        Returns:
+            Dict with ai_probability (None without a model), features and
+            elapsed_ms
+        """
+        start = time.perf_counter()
+        features = extract_features(rgb)
+        probability = self.model.predict_proba(features) if self.loaded else None
+        return {
+            "ai_probability": probability,
+            "features": dict(zip(FEATURE_NAMES, features.tolist())),
+            "elapsed_ms": (time.perf_counter() - start) * 1000.0
+        }
+
+
+# Singleton instance (one per worker process)
+_engine = None
+
+
+def get_forensics_engine() -> ForensicsEngine:
+    """Get or create the forensics engine for this process."""
+    global _engine
+    if _engine is None:
+        _engine = ForensicsEngine(settings.image_forensics_model_path or DEFAULT_MODEL_PATH)
+    return _engine
+
+
+def score_image(rgb: np.ndarray) -> Dict:
+    """Process-pool entry point for :meth:`ForensicsEngine.analyze`."""
+    return get_forensics_engine().analyze(rgb)
@@ -0,0 +1,149 @@
+"""
+Sentinel AI - Local Speech-to-Text
+Offline CPU transcription with faster-whisper (CTranslate2). Short clips
+are decoded together in one batched forward pass, so a burst of audio
+requests costs little more than one.
+"""
+import math
+import threading
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from app.config import settings
+
+
+SAMPLE_RATE = 16000
+
+# Whisper's fixed input window; longer clips are split into several chunks
+CHUNK_SECONDS = 30
+
+DEFAULT_MODEL_DIR = Path(__file__).parent / "models" / "whisper"
+
+
+class LocalTranscriber:
+    """
+    faster-whisper model loaded once per worker.
+    
+    ``local_stt_model`` is a model size ("tiny", "base", "small", ...) or a
+    path to a converted CTranslate2 model. Sizes are looked up under
+    ``local_stt_model_dir`` and only downloaded there when
+    ``local_stt_download`` is on, so a provisioned worker needs no network.
+    Without faster-whisper or the model files the transcriber stays
+    unloaded and callers use AssemblyAI.
+    """
+    
+    def __init__(self, model: str, model_dir: Path = DEFAULT_MODEL_DIR):
+        self.model_name = model
+        self.loaded = False
+        # One batch at a time; CTranslate2 already uses every configured thread
+        self._lock = threading.Lock()
+        
+        try:
+            from faster_whisper import BatchedInferencePipeline, WhisperModel
+        except ImportError:
+            print("⚠️  faster-whisper is not installed; local speech-to-text disabled")
+            return
+            
+        try:
+            self.model = WhisperModel(
+                model,
+                device="cpu",
+                compute_type=settings.local_stt_compute_type,
+                cpu_threads=settings.local_stt_threads,
+                download_root=str(model_dir),
+                local_files_only=not settings.local_stt_download
+            )
+        except Exception as e:
+            print(f"⚠️  Local speech-to-text model {model!r} unavailable in {model_dir}: {e}")
+            return
+            
+        self.pipeline = BatchedInferencePipeline(model=self.model)
+        self.loaded = True
+        print(f"🎙️  Local speech-to-text ready ({model}, {settings.local_stt_compute_type})")
+    
+    def transcribe_batch(self, sources: List[Path]) -> List[Dict]:
+        """
+        Transcribe several clips in one batched decode.
+        
+        The clips are laid end to end and every (at most 30 s) chunk is
+        passed as its own clip timestamp, so the pipeline decodes all of
+        them together; segments are mapped back to their clip by offset.
+        
+        Args:
+            sources: Audio file paths
+            
+        Returns:
+            One dict per clip with text, confidence, duration_seconds,
+            language and elapsed_ms (shared by the whole batch)
+        """
+        from faster_whisper import decode_audio
+        
+        start = time.perf_counter()
+        waveforms = [decode_audio(str(source), sampling_rate=SAMPLE_RATE) for source in sources]
+        
+        offsets = []
+        chunks = []
+        position = 0
+        for y in waveforms:
+            offsets.append(position)
+            step = CHUNK_SECONDS * SAMPLE_RATE
+            for begin in range(0, max(y.size, 1), step):
+                chunks.append({"start": position + begin, "end": position + min(begin + step, y.size)})
+            position += y.size
+        chunks = [chunk for chunk in chunks if chunk["end"] > chunk["start"]]
+        
+        texts: List[List[str]] = [[] for _ in sources]
+        logprobs: List[List[float]] = [[] for _ in sources]
+        language = settings.local_stt_language
+        if chunks:
+            with self._lock:
+                segments, info = self.pipeline.transcribe(
+                    np.concatenate(waveforms),
+                    language=settings.local_stt_language,
+                    beam_size=settings.local_stt_beam_size,
+                    clip_timestamps=chunks,
+                    batch_size=len(chunks)
+                )
+                for segment in segments:
+                    # Segment starts are offsets into the concatenated audio,
+                    # rounded to milliseconds
+                    clip = bisect_right(offsets, (segment.start + 0.01) * SAMPLE_RATE) - 1
+                    texts[clip].append(segment.text.strip())
+                    logprobs[clip].append(segment.avg_logprob)
+            language = info.language
+            
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        return [
+            {
+                "text": " ".join(t for t in texts[i] if t),
+                # Mean token probability, comparable to AssemblyAI's confidence
+                "confidence": math.exp(sum(logprobs[i]) / len(logprobs[i])) if logprobs[i] else 0.0,
+                "duration_seconds": waveforms[i].size / float(SAMPLE_RATE),
+                "language": language,
+                "elapsed_ms": elapsed_ms
+            }
+            for i in range(len(sources))
+        ]
+    
+    def transcribe(self, source: Path) -> Dict:
+        """Transcribe a single clip."""
+        return self.transcribe_batch([source])[0]
+
+
+# Singleton instance
+_transcriber = None
+
+
+def get_local_transcriber() -> LocalTranscriber:
+    """Get or create the local transcriber."""
+    global _transcriber
+    if _transcriber is None:
+        _transcriber = LocalTranscriber(
+            settings.local_stt_model,
+            settings.local_stt_model_dir or DEFAULT_MODEL_DIR
+        )
+    return _transcriber
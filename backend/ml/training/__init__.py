@@ -0,0 +1,4 @@
+"""
+Sentinel AI - Model Training
+Offline scripts that produce the model files used by ml.inference.
+"""
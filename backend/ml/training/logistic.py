@@ -0,0 +1,63 @@
+"""
+Sentinel AI - Logistic Regression Training
+NumPy-only fitting and JSON export shared by the local model trainers.
+"""
+import json
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+
+def fit_logistic_regression(
+    X: np.ndarray,
+    y: np.ndarray,
+    l2: float = 1e-2,
+    lr: float = 0.1,
+    epochs: int = 2000
+) -> Tuple[np.ndarray, float]:
+    """Full-batch gradient descent on standardized features."""
+    coef = np.zeros(X.shape[1], dtype=np.float64)
+    intercept = 0.0
+    
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(X @ coef + intercept)))
+        error = p - y
+        coef -= lr * (X.T @ error / len(y) + l2 * coef)
+        intercept -= lr * float(error.mean())
+        
+    return coef, intercept
+
+
+def train_and_save(X: np.ndarray, y: np.ndarray, feature_names: List[str], out: Path, l2: float = 1e-2) -> None:
+    """
+    Standardize features, fit the model and write it as JSON.
+    
+    Args:
+        X: Feature matrix (one row per sample)
+        y: Labels, 1 for synthetic
+        feature_names: Feature order, checked by the inference side
+        out: Output model path
+        l2: L2 regularization strength
+    """
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Xs = (X - mean) / scale
+    
+    coef, intercept = fit_logistic_regression(Xs, y, l2=l2)
+    
+    p = 1.0 / (1.0 + np.exp(-(Xs @ coef + intercept)))
+    accuracy = float(((p >= 0.5) == (y == 1)).mean())
+    print(f"Training accuracy: {accuracy:.3f}")
+    
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "feature_names": feature_names,
+            "mean": mean.tolist(),
+            "scale": scale.tolist(),
+            "coef": coef.tolist(),
+            "intercept": intercept
+        }, f)
+    print(f"Model written to {out}")
@@ -0,0 +1,64 @@
+"""
+Sentinel AI - Audio Pre-screen Training
+Fits the logistic-regression pre-screen on a folder of labelled clips.
+
+Expected layout::
+
+    DATA_DIR/real/*.wav|mp3|...   genuine human speech
+    DATA_DIR/fake/*.wav|mp3|...   TTS or voice-cloned speech
+
+Usage (from backend/)::
+
+    python -m ml.training.train_audio_prescreen DATA_DIR [--out PATH]
+"""
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from ml.inference.audio_prescreen import (
+    DEFAULT_MODEL_PATH,
+    FEATURE_NAMES,
+    extract_features,
+    load_audio,
+)
+from ml.training.logistic import train_and_save
+
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".ogg", ".flac"}
+
+
+def load_dataset(data_dir: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """Extract features for every clip under real/ (label 0) and fake/ (label 1)."""
+    rows: List[np.ndarray] = []
+    labels: List[int] = []
+    
+    for label, folder in ((0, "real"), (1, "fake")):
+        for path in sorted((data_dir / folder).rglob("*")):
+            if path.suffix.lower() not in AUDIO_EXTENSIONS:
+                continue
+            try:
+                rows.append(extract_features(load_audio(path)))
+                labels.append(label)
+            except Exception as e:
+                print(f"Skipping {path}: {e}")
+                
+    return np.vstack(rows), np.asarray(labels, dtype=np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the audio pre-screen model")
+    parser.add_argument("data_dir", type=Path)
+    parser.add_argument("--out", type=Path, default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--l2", type=float, default=1e-2)
+    args = parser.parse_args()
+    
+    X, y = load_dataset(args.data_dir)
+    print(f"Loaded {len(y)} clips ({int(y.sum())} synthetic)")
+    
+    train_and_save(X, y, FEATURE_NAMES, args.out, l2=args.l2)
+
+
+if __name__ == "__main__":
+    main()
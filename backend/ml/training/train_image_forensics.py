@@ -0,0 +1,65 @@
+"""
+Sentinel AI - Image Forensics Training
+Fits the logistic-regression forensics model on a folder of labelled images.
+
+Expected layout::
+
+    DATA_DIR/real/*.jpg|png   camera photos
+    DATA_DIR/fake/*.jpg|png   AI-generated or manipulated images
+
+Images go through the same downscaling as uploads (MEDIA_MAX_EDGE) so
+features match what the API sees.
+
+Usage (from backend/)::
+
+    python -m ml.training.train_image_forensics DATA_DIR [--out PATH]
+"""
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.utils.media import load_image
+from ml.inference.image_forensics import DEFAULT_MODEL_PATH, FEATURE_NAMES, extract_features
+from ml.training.logistic import train_and_save
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def load_dataset(data_dir: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """Extract features for every image under real/ (label 0) and fake/ (label 1)."""
+    rows: List[np.ndarray] = []
+    labels: List[int] = []
+    
+    for label, folder in ((0, "real"), (1, "fake")):
+        for path in sorted((data_dir / folder).rglob("*")):
+            if path.suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            try:
+                img = load_image(path, settings.media_max_edge)
+                rows.append(extract_features(np.asarray(img)))
+                labels.append(label)
+            except Exception as e:
+                print(f"Skipping {path}: {e}")
+                
+    return np.vstack(rows), np.asarray(labels, dtype=np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the image forensics model")
+    parser.add_argument("data_dir", type=Path)
+    parser.add_argument("--out", type=Path, default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--l2", type=float, default=1e-2)
+    args = parser.parse_args()
+    
+    X, y = load_dataset(args.data_dir)
+    print(f"Loaded {len(y)} images ({int(y.sum())} synthetic)")
+    
+    train_and_save(X, y, FEATURE_NAMES, args.out, l2=args.l2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Sentinel AI - Hot Path Micro-Benchmarks
+Repeatable timings for the media hot paths on synthetic fixtures: video
+frame extraction, image decode, upload spooling, hashing, upload
+directory cleanup and the explainers.
+
+Skipped by default. Usage (from backend/)::
+
+    python -m pytest tests/benchmarks --run-benchmarks
+        [--benchmark-autosave --benchmark-storage=benchmarks/results]
+        [--benchmark-compare]
+"""
+import asyncio
+import io
+import os
+import time
+
+import numpy as np
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from app.config import settings
+from app.models.video_analyzer import VideoAnalyzer
+from app.utils.cache import hash_text
+from app.utils.explainer import (
+    explain_audio_analysis,
+    explain_image_analysis,
+    explain_text_analysis,
+    explain_video_analysis
+)
+from app.utils.file_handler import cleanup_old_files, save_upload, spool_upload
+from app.utils.media import prepare_image
+from app.utils.perceptual_hash import phash
+from app.utils.similarity import simhash
+from benchmarks.load_test import make_images, make_texts, make_videos
+
+pytest.importorskip("pytest_benchmark")
+
+
+CLEANUP_FILES = 100000
+
+
+def _rng() -> np.random.Generator:
+    # Seeded per fixture so fixtures do not depend on which benchmarks run
+    return np.random.default_rng(0)
+
+
+def _upload(data: bytes, filename: str, mime: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename, headers=Headers({"content-type": mime}))
+
+
+# =============================================================================
+# Video
+# =============================================================================
+
+@pytest.fixture(scope="module")
+def video_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("video") / "bench.mp4"
+    path.write_bytes(make_videos(1, _rng(), seconds=8.0, fps=30)[0])
+    return path
+
+
+@pytest.mark.benchmark(group="video")
+@pytest.mark.parametrize("strategy", ["uniform", "scene"])
+def test_extract_frames(benchmark, video_path, strategy):
+    analyzer = VideoAnalyzer.__new__(VideoAnalyzer)  # frame extraction needs no Gemini client
+    frames, _ = benchmark(
+        analyzer._extract_frames, video_path, num_frames=settings.video_frame_budget, strategy=strategy
+    )
+    assert frames
+
+
+# =============================================================================
+# Image
+# =============================================================================
+
+@pytest.mark.benchmark(group="image")
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+@pytest.mark.parametrize("size", [(1024, 768), (4000, 3000)], ids=["1024x768", "4000x3000"])
+def test_prepare_image(benchmark, fmt, size):
+    data = make_images(1, _rng(), size=size)[0]
+    if fmt == "PNG":
+        buf = io.BytesIO()
+        Image.open(io.BytesIO(data)).save(buf, "PNG")
+        data = buf.getvalue()
+    benchmark(lambda: prepare_image(io.BytesIO(data)))
+
+
+# =============================================================================
+# Upload
+# =============================================================================
+
+@pytest.fixture(scope="module")
+def upload_payloads():
+    rng = _rng()
+    # JPEG magic bytes followed by noise, just over the spill threshold
+    return {
+        "small": make_images(1, rng)[0],
+        "spilled": b"\xff\xd8\xff\xe0" + rng.bytes(settings.upload_spool_threshold_mb * 1024 * 1024 + 1024),
+    }
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.mark.benchmark(group="upload")
+@pytest.mark.parametrize("payload", ["small", "spilled"])
+def test_spool_upload(benchmark, loop, upload_payloads, payload):
+    data = upload_payloads[payload]
+    
+    def spool():
+        upload = loop.run_until_complete(spool_upload(_upload(data, "bench.jpg", "image/jpeg"), "image"))
+        upload.discard()
+        
+    benchmark(spool)
+
+
+@pytest.mark.benchmark(group="upload")
+@pytest.mark.parametrize("payload", ["small", "spilled"])
+def test_save_upload(benchmark, loop, upload_payloads, payload, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", tmp_path)
+    data = upload_payloads[payload]
+    
+    def save():
+        path, _ = loop.run_until_complete(save_upload(_upload(data, "bench.jpg", "image/jpeg"), "image"))
+        path.unlink()
+        
+    benchmark(save)
+
+
+# =============================================================================
+# Hashing
+# =============================================================================
+
+@pytest.fixture(scope="module")
+def long_text():
+    return " ".join(payload["text"] for payload in make_texts(20, _rng()))
+
+
+@pytest.fixture(scope="module")
+def photo():
+    img = Image.open(io.BytesIO(make_images(1, _rng())[0]))
+    img.load()
+    return img
+
+
+@pytest.mark.benchmark(group="hash")
+def test_hash_text(benchmark, long_text):
+    benchmark(hash_text, long_text)
+
+
+@pytest.mark.benchmark(group="hash")
+def test_simhash(benchmark, long_text):
+    benchmark(simhash, long_text)
+
+
+@pytest.mark.benchmark(group="hash")
+@pytest.mark.parametrize("kind", ["pil", "ndarray"])
+def test_phash(benchmark, photo, kind):
+    benchmark(phash, photo if kind == "pil" else np.asarray(photo))
+
+
+# =============================================================================
+# Cleanup
+# =============================================================================
+
+@pytest.fixture
+def crowded_upload_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "uploads"
+    directory.mkdir()
+    for i in range(CLEANUP_FILES):
+        (directory / f"{i:08d}.jpg").touch()
+    monkeypatch.setattr(settings, "upload_dir", directory)
+    return directory
+
+
+@pytest.mark.benchmark(group="cleanup")
+def test_cleanup_none_expired(benchmark, crowded_upload_dir):
+    # Nothing expired: the cost of scanning the directory
+    assert benchmark(cleanup_old_files) == 0
+
+
+@pytest.mark.benchmark(group="cleanup")
+def test_cleanup_half_expired(benchmark, crowded_upload_dir):
+    # Half expired: scanning plus deleting, so a single round
+    old = time.time() - settings.file_retention_seconds - 60
+    for i in range(0, CLEANUP_FILES, 2):
+        os.utime(crowded_upload_dir / f"{i:08d}.jpg", (old, old))
+    assert benchmark.pedantic(cleanup_old_files, rounds=1, iterations=1) == CLEANUP_FILES // 2
+
+
+# =============================================================================
+# Explainers
+# =============================================================================
+
+@pytest.mark.benchmark(group="explain")
+@pytest.mark.parametrize("explain, arity", [
+    (explain_text_analysis, 5),
+    (explain_audio_analysis, 3),
+    (explain_image_analysis, 3),
+    (explain_video_analysis, 2),
+], ids=["text", "audio", "image", "video"])
+def test_explain(benchmark, explain, arity):
+    values = _rng().random(arity).tolist()
+    benchmark(explain, *values)
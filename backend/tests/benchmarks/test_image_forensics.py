@@ -0,0 +1,49 @@
+"""
+Sentinel AI - Image Forensics Benchmark
+Local forensic feature extraction, single-process and through the shared
+process pool. Skipped by default; run with ``--run-benchmarks``.
+"""
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.utils.executor import get_process_pool, shutdown_executors
+from ml.inference.image_forensics import extract_features
+
+pytest.importorskip("pytest_benchmark")
+
+
+IMAGES = 64
+
+
+@pytest.fixture(scope="module")
+def images():
+    """Synthetic photo-like images: smooth gradients plus sensor-style noise."""
+    rng = np.random.default_rng(0)
+    height, width = 768, 1024
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    images = []
+    for _ in range(IMAGES):
+        base = 128 + 60 * np.sin(xx / rng.uniform(20, 200)) * np.cos(yy / rng.uniform(20, 200))
+        noise = rng.normal(0, 6, size=(height, width, 3))
+        images.append(np.clip(base[..., None] + noise, 0, 255).astype(np.uint8))
+    return images
+
+
+@pytest.mark.benchmark(group="image_forensics")
+def test_extract_features_serial(benchmark, images):
+    benchmark.pedantic(lambda: [extract_features(img) for img in images], rounds=3)
+    benchmark.extra_info["images"] = len(images)
+
+
+@pytest.mark.benchmark(group="image_forensics")
+def test_extract_features_pool(benchmark, images):
+    pool = get_process_pool()
+    # Warm up so worker start-up is not counted
+    list(pool.map(extract_features, images[:settings.local_inference_processes]))
+    try:
+        benchmark.pedantic(lambda: list(pool.map(extract_features, images)), rounds=3)
+    finally:
+        shutdown_executors(wait=True)
+    benchmark.extra_info["images"] = len(images)
+    benchmark.extra_info["processes"] = settings.local_inference_processes
@@ -0,0 +1,60 @@
+"""
+Sentinel AI - Test Fixtures
+Settings for offline tests (no API keys, caches off) and shared helpers.
+"""
+import io
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Must be set before app.config is imported
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ.setdefault("ASSEMBLYAI_API_KEY", "test-key")
+os.environ.setdefault("CACHE_ENABLED", "false")
+os.environ.setdefault("NEAR_DUPLICATE_ENABLED", "false")
+os.environ.setdefault("PERCEPTUAL_INDEX_ENABLED", "false")
+os.environ.setdefault("UPSTREAM_WARMUP", "false")
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import circuit_breaker
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-benchmarks", action="store_true", help="Run the pytest-benchmark suite in tests/benchmarks")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Benchmarks are slow, so they only run when asked for."""
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; run with --run-benchmarks")
+    for item in items:
+        if "benchmarks" in item.path.parts:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    """Every test starts with closed circuit breakers."""
+    circuit_breaker._breakers.clear()
+    yield
+    circuit_breaker._breakers.clear()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+def make_jpeg(seed: int = 0, size=(64, 64)) -> bytes:
+    """Random noise JPEG."""
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, "JPEG")
+    return buf.getvalue()
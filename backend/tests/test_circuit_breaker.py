@@ -0,0 +1,94 @@
+"""Circuit breaker accounting: what counts as an upstream failure."""
+import json
+import time
+from unittest import mock
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.models.image_analyzer import get_image_analyzer
+from app.utils.circuit_breaker import CircuitOpenError, get_breaker, is_upstream_failure
+from app.utils.hedging import upstream_call
+from tests.conftest import make_jpeg
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _verdict(*args, **kwargs) -> _Response:
+    return _Response(json.dumps({
+        "verdict": "REAL",
+        "real_probability": 90,
+        "ai_generated": 5,
+        "manipulated": 5,
+        "risk_score": 10,
+        "reasoning": "Natural lighting and sensor noise."
+    }))
+
+
+def _times_out_at_deadline(contents, generation_config=None, request_options=None):
+    """Behave like the SDK when its timeout (the request deadline) fires."""
+    time.sleep((request_options or {}).get("timeout", 0.0))
+    raise google_exceptions.DeadlineExceeded("Deadline Exceeded")
+
+
+def _status_error(code: int) -> Exception:
+    error = Exception(f"upstream answered {code}")
+    error.status_code = code
+    return error
+
+
+def test_429_and_4xx_are_not_upstream_failures():
+    assert not is_upstream_failure(429)
+    assert not is_upstream_failure(400)
+    assert is_upstream_failure(503)
+    assert is_upstream_failure(None)
+
+
+def test_short_client_deadlines_do_not_open_breaker(client):
+    analyzer = get_image_analyzer()
+    
+    with mock.patch.object(analyzer.model, "generate_content", side_effect=_times_out_at_deadline):
+        for i in range(12):
+            response = client.post(
+                "/analyze/image",
+                files={"file": (f"{i}.jpg", make_jpeg(i), "image/jpeg")},
+                headers={"X-Deadline-Ms": "50"}
+            )
+            assert response.status_code == 200
+            
+    assert get_breaker("gemini").stats()["state"] == "closed"
+    
+    # Another client without a deadline still gets the model's verdict
+    with mock.patch.object(analyzer.model, "generate_content", side_effect=_verdict):
+        response = client.post("/analyze/image", files={"file": ("ok.jpg", make_jpeg(99), "image/jpeg")})
+    assert response.status_code == 200
+    assert response.json()["degraded"] is False
+
+
+def test_rate_limited_retries_do_not_open_breaker(monkeypatch):
+    monkeypatch.setattr("app.config.settings.upstream_retry_after_seconds", 0.0)
+    
+    def throttled():
+        raise _status_error(429)
+        
+    for _ in range(12):
+        with pytest.raises(Exception):
+            upstream_call("gemini", throttled, modality="text", hedge=False)
+            
+    assert get_breaker("gemini").stats()["state"] == "closed"
+
+
+def test_server_errors_open_breaker():
+    def unavailable():
+        raise _status_error(503)
+        
+    for _ in range(10):
+        with pytest.raises(Exception):
+            upstream_call("gemini", unavailable, modality="text", hedge=False)
+            
+    assert get_breaker("gemini").stats()["state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        upstream_call("gemini", unavailable, modality="text", hedge=False)
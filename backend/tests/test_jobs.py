@@ -0,0 +1,115 @@
+"""Async jobs: unknown ids, failed analyses and the lifetime of queued jobs' uploads."""
+import io
+import os
+import time
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.utils.file_handler import cleanup_old_files
+from app.workers import job_registry, tasks
+from app.workers.tasks import analyze_audio_task
+
+
+class _FakeRedis:
+    """The commands the job registry uses."""
+    
+    def __init__(self):
+        self.keys = {}
+    
+    def set(self, key, value, ex=None):
+        self.keys[key] = value
+    
+    def get(self, key):
+        return self.keys.get(key)
+    
+    def exists(self, key):
+        return int(key in self.keys)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(job_registry, "_redis", _FakeRedis())
+    # Celery reports every id it has no result for as PENDING
+    monkeypatch.setattr("app.api.routes.jobs.AsyncResult", lambda job_id, app=None: SimpleNamespace(state="PENDING"))
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", tmp_path)
+    return tmp_path
+
+
+def _wav(seconds: float = 1.0) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(np.zeros(int(16000 * seconds), dtype=np.int16).tobytes())
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("path", ["/jobs/{id}", "/jobs/{id}/wait?timeout=1", "/jobs/{id}/events"])
+def test_unknown_job_is_404(client, registry, path):
+    response = client.get(path.format(id="no-such-job"))
+    assert response.status_code == 404
+
+
+def test_submitted_job_is_queued(client, registry, upload_dir, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(
+        analyze_audio_task, "delay", lambda path: submitted.append(path) or SimpleNamespace(id="job-1")
+    )
+    
+    response = client.post("/analyze/audio?mode=async", files={"file": ("a.wav", _wav(), "audio/wav")})
+    assert response.status_code == 202
+    assert client.get("/jobs/job-1").json()["status"] == "queued"
+    
+    # The queued input lives where cleanup keeps it for the job's lifetime
+    assert os.path.dirname(submitted[0]) == str(upload_dir / "jobs")
+    assert os.path.exists(submitted[0])
+
+
+def test_cleanup_keeps_queued_job_inputs(upload_dir):
+    jobs = upload_dir / "jobs"
+    jobs.mkdir()
+    stale = time.time() - settings.file_retention_seconds - 60
+    expired = time.time() - settings.job_file_retention_seconds - 60
+    for path, mtime in (
+        (upload_dir / "old.wav", stale),
+        (jobs / "queued.wav", stale),
+        (jobs / "abandoned.wav", expired),
+    ):
+        path.touch()
+        os.utime(path, (mtime, mtime))
+        
+    assert cleanup_old_files() == 2
+    assert [p.name for p in jobs.iterdir()] == ["queued.wav"]
+    assert not (upload_dir / "old.wav").exists()
+
+
+def test_failed_analysis_is_retried_then_reported_failed(client, registry, upload_dir, monkeypatch):
+    calls = []
+    
+    def analyze(path):
+        calls.append(path)
+        assert path.exists()
+        return {"reasoning": "Analysis failed: upstream unavailable", "duration_seconds": 0.0, "failed": True}
+        
+    monkeypatch.setattr(tasks, "get_audio_analyzer", lambda: SimpleNamespace(analyze=analyze))
+    path = upload_dir / "queued.wav"
+    path.write_bytes(_wav())
+    job_registry.register_job("job-2")
+    
+    outcome = analyze_audio_task.apply(args=[str(path)], task_id="job-2")
+    
+    assert outcome.state == "FAILURE"
+    assert len(calls) == analyze_audio_task.max_retries + 1
+    assert not path.exists()
+    status = client.get("/jobs/job-2").json()
+    assert status["status"] == "failed"
+    assert "upstream unavailable" in status["error"]
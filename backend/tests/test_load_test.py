@@ -0,0 +1,43 @@
+"""
+Sentinel AI - Load Test Smoke Test
+Runs the offline load test against the stub upstream for a few requests.
+"""
+import json
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_load_test_runs_offline(tmp_path):
+    output = tmp_path / "load.json"
+    cmd = [
+        sys.executable, "-m", "benchmarks.load_test",
+        "--endpoints", "text,image",
+        "--rps", "4",
+        "--duration", "1",
+        "--unique", "2",
+        "--timeout", "30",
+        "--latency-ms", "5",
+        "--assemblyai-latency-ms", "5",
+        "--distribution", "fixed",
+        "--api-port", str(_free_port()),
+        "--stub-port", str(_free_port()),
+        "--output", str(output),
+    ]
+    subprocess.run(cmd, cwd=BACKEND_DIR, check=True, timeout=240, capture_output=True)
+    
+    report = json.loads(output.read_text())
+    for endpoint in ("text", "image"):
+        result = report["endpoints"][endpoint]
+        assert result["requests"] == 4
+        assert result["ok"] == result["requests"]
+        assert result["degraded"] == 0
@@ -0,0 +1,30 @@
+"""
+Sentinel AI - Local Model Tests
+Configured local tiers without a model are reported once, at startup.
+"""
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from ml.inference import audio_prescreen, image_forensics
+
+
+def test_missing_local_models_reported_once_at_startup(tmp_path, capsys):
+    with mock.patch.object(settings, "image_forensics_model_path", tmp_path / "image.json"), \
+            mock.patch.object(settings, "audio_prescreen_model_path", tmp_path / "audio.json"), \
+            mock.patch.object(settings, "image_forensics_mode", "fuse"), \
+            mock.patch.object(settings, "audio_prescreen_enabled", True), \
+            mock.patch.object(image_forensics, "_engine", None), \
+            mock.patch.object(audio_prescreen, "_prescreen", None):
+        with TestClient(app):
+            startup = capsys.readouterr().out
+            assert not image_forensics.get_forensics_engine().loaded
+            assert not audio_prescreen.get_audio_prescreen().loaded
+            
+    assert startup.count("Image forensics model not found") == 1
+    assert startup.count("Audio pre-screen model not found") == 1
+    assert "train_image_forensics" in startup
+    assert "train_audio_prescreen" in startup
+    assert "not found" not in capsys.readouterr().out
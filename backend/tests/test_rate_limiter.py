@@ -0,0 +1,38 @@
+"""
+Sentinel AI - Rate Limiter Tests
+Only backends with a request-rate cap use the Redis token bucket.
+"""
+from unittest import mock
+
+import redis
+
+from app.config import settings
+from app.utils.rate_limiter import UpstreamLimiter, _LocalBucket, _SharedBucket
+
+
+def test_unlimited_rate_makes_no_redis_calls(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_limiter_redis_enabled", True)
+    with mock.patch.object(redis, "from_url", side_effect=AssertionError("Redis used")) as from_url:
+        limiter = UpstreamLimiter("gemini", rate=0.0, burst=20, max_limit=4)
+        assert limiter.call(lambda: "ok") == "ok"
+        
+    from_url.assert_not_called()
+    assert type(limiter._bucket) is _LocalBucket
+
+
+def test_rate_cap_is_shared_through_redis(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_limiter_redis_enabled", True)
+    with mock.patch.object(redis, "from_url") as from_url:
+        from_url.return_value.register_script.return_value = mock.Mock(return_value=0)
+        limiter = UpstreamLimiter("gemini", rate=5.0, burst=20, max_limit=4)
+        assert limiter.call(lambda: "ok") == "ok"
+        
+    assert isinstance(limiter._bucket, _SharedBucket)
+    from_url.return_value.register_script.return_value.assert_called_once()
+
+
+def test_unlimited_rate_still_pauses_after_429():
+    bucket = _LocalBucket(rate=0.0, burst=1)
+    assert bucket.reserve() == 0.0
+    bucket.pause(5.0)
+    assert bucket.reserve() > 4.0
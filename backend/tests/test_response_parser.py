@@ -0,0 +1,46 @@
+"""
+Sentinel AI - Response Parser Tests
+Malformed scores surface as ResponseParseError or drop only their item.
+"""
+import json
+
+import pytest
+
+from app.utils.response_parser import ResponseParseError, TextBatchItem, TextVerdict, parse_items, parse_response
+
+
+def _verdict(**overrides) -> dict:
+    verdict = {"verdict": "Scam", "risk_score": 90, "urgency": 0.8, "reasoning": "Asks for a gift card"}
+    verdict.update(overrides)
+    return verdict
+
+
+def test_out_of_range_scores_are_clamped():
+    parsed = parse_response(json.dumps(_verdict(risk_score=140, urgency=-1)), TextVerdict)
+    assert parsed.risk_score == 100
+    assert parsed.urgency == 0.0
+
+
+@pytest.mark.parametrize("overrides", [
+    {"risk_score": None},
+    {"risk_score": [90]},
+    {"risk_score": {"value": 90}},
+    {"risk_score": "high"},
+    {"urgency": None},
+    {"urgency": [0.8]},
+])
+def test_non_numeric_score_is_a_parse_error(overrides):
+    with pytest.raises(ResponseParseError):
+        parse_response(json.dumps(_verdict(**overrides)), TextVerdict)
+
+
+def test_non_numeric_score_drops_only_its_item():
+    items = [
+        _verdict(id=1),
+        _verdict(id=2, risk_score=None),
+        _verdict(id=3, urgency={"level": "high"}),
+        _verdict(id=4, risk_score="10"),
+    ]
+    parsed = parse_items(json.dumps(items), TextBatchItem)
+    assert sorted(parsed) == [1, 4]
+    assert parsed[4].risk_score == 10
@@ -0,0 +1,36 @@
+"""
+Sentinel AI - Near-Duplicate Tests
+Text SimHash fingerprints over word shingles.
+"""
+from app.utils.similarity import HammingIndex, SIMHASH_SCHEME, simhash, similarity_to_distance
+
+
+def _index() -> HammingIndex:
+    return HammingIndex(bits=64, max_distance=similarity_to_distance(0.90), scheme=SIMHASH_SCHEME)
+
+
+def test_rotated_links_and_numbers_still_match():
+    index = _index()
+    index.add(simhash("URGENT: your account at www.bank.com is locked, call 555-1234 to verify now!"), {"verdict": "Scam"})
+    assert index.lookup(simhash("URGENT: your account at www.b4nk.net is locked, call 555-9876 to verify now!")) == {"verdict": "Scam"}
+
+
+def test_negation_does_not_match():
+    index = _index()
+    index.add(simhash("Please do not send money to this account until we call you back tomorrow."), {"verdict": "Safe"})
+    assert index.lookup(simhash("Please send money to this account until we call you back tomorrow.")) is None
+
+
+def test_reordering_does_not_match():
+    index = _index()
+    index.add(simhash("Your package is held at customs, pay the fee today to release it to you."), {"verdict": "Scam"})
+    assert index.lookup(simhash("Pay the fee today, your package is held at customs to release it to you.")) is None
+
+
+def test_index_from_another_scheme_is_not_loaded(tmp_path):
+    path = tmp_path / "index.json"
+    old = HammingIndex(bits=64, max_distance=6)
+    old.add(simhash("Please send money to this account until we call you back tomorrow."), {"verdict": "Scam"})
+    old.save(path)
+    
+    assert _index().load(path) == 0
@@ -0,0 +1,19 @@
+"""
+Sentinel AI - Text Limit Tests
+Single and batch text requests share MAX_TEXT_LENGTH.
+"""
+from app.config import settings
+from app.schemas.responses import TextAnalysisRequest, TextBatchRequest
+
+
+def test_schemas_use_max_text_length():
+    single = TextAnalysisRequest.model_json_schema()["properties"]["text"]
+    batch = TextBatchRequest.model_json_schema()["properties"]["texts"]["items"]
+    assert single["maxLength"] == settings.max_text_length
+    assert batch["maxLength"] == settings.max_text_length
+
+
+def test_over_long_texts_are_rejected(client):
+    too_long = "a" * (settings.max_text_length + 1)
+    assert client.post("/analyze/text", json={"text": too_long}).status_code == 422
+    assert client.post("/analyze/text/batch", json={"texts": ["hello there", too_long]}).status_code == 422
@@ -0,0 +1,65 @@
+"""Rule-based scam signals: they inform the model but do not replace it."""
+import json
+from unittest import mock
+
+from app.models.text_analyzer import get_text_analyzer
+from app.utils.scam_signals import extract_signals
+
+
+# Legitimate transactional messages that are dense in scam keywords
+TRANSACTIONAL = [
+    "IT Department help desk: your password expires today. Action required - please update "
+    "your password before the deadline. Invoice #4821 payment is attached for your records.",
+    "Amazon: payment received. Your refund for order #113-55 has been processed and your "
+    "package ships with UPS.",
+]
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _legitimate(contents, generation_config=None, request_options=None) -> _Response:
+    verdict = {
+        "verdict": "Legitimate",
+        "risk_score": 5,
+        "urgency": 0.1,
+        "financial_request": 0.0,
+        "impersonation": 0.0,
+        "reasoning": "Routine notification from a known sender."
+    }
+    # Batch prompts expect one numbered item per message
+    if "[2]" in str(contents):
+        return _Response(json.dumps([dict(verdict, id=i) for i in (1, 2)]))
+    return _Response(json.dumps(verdict))
+
+
+def test_keyword_dense_benign_messages_reach_model(client):
+    # Strong enough to have been answered by the rules alone before
+    assert extract_signals(TRANSACTIONAL[0])["scam_score"] >= 0.85
+    
+    analyzer = get_text_analyzer()
+    with mock.patch.object(analyzer.model, "generate_content", side_effect=_legitimate) as generate:
+        results = [client.post("/analyze/text", json={"text": text}).json() for text in TRANSACTIONAL]
+        
+    assert generate.call_count == len(TRANSACTIONAL)
+    for result in results:
+        assert result["verdict"] == "Safe"
+        assert result["degraded"] is False
+
+
+def test_rule_hits_do_not_override_model():
+    analyzer = get_text_analyzer()
+    signals = extract_signals(TRANSACTIONAL[1])
+    assert signals["impersonation"] >= 0.75
+    
+    model_scores = analyzer._to_scores(
+        "Legitimate", 5, "Order confirmation.",
+        {"urgency": 0.0, "financial_request": 0.1, "impersonation": 0.0}
+    )
+    merged = analyzer._merge_signals(model_scores, signals)
+    
+    assert merged["impersonation"] < 0.25
+    assert merged["financial_request"] < 0.25
+    assert merged["risk_score"] == model_scores["risk_score"]
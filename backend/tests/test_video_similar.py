@@ -0,0 +1,45 @@
+"""
+Sentinel AI - Video Near-Duplicate Tests
+Clips answered from the frame index keep their own duration and frame count.
+"""
+from unittest import mock
+
+import numpy as np
+
+from app.config import settings
+from app.models.video_analyzer import get_video_analyzer
+from app.utils import perceptual_hash
+from app.utils.perceptual_hash import add_frames, get_frame_index, phash
+
+
+def test_similar_clip_reports_its_own_duration(monkeypatch):
+    monkeypatch.setattr(settings, "perceptual_index_enabled", True)
+    monkeypatch.setattr(perceptual_hash, "_frame_index", None)
+    
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (64, 64, 3), dtype=np.uint8) for _ in range(4)]
+    stored = {
+        "real_probability": 0.9,
+        "deepfake_probability": 0.05,
+        "manipulated": 0.05,
+        "deepfake_likelihood": 0.05,
+        "reasoning": "Consistent lighting",
+        "frames_analyzed": 8,
+        "duration_seconds": 12.0,
+        "decode_ms": 40.0,
+    }
+    add_frames(get_frame_index(), [phash(frame) for frame in frames], stored)
+    
+    analyzer = get_video_analyzer()
+    info = {"duration_seconds": 600.0, "decode_ms": 250.0}
+    with mock.patch.object(analyzer, "_extract_frames", return_value=(frames, info)), \
+            mock.patch.object(analyzer.model, "generate_content") as generate:
+        result = analyzer.analyze("long.mp4")
+        
+    generate.assert_not_called()
+    assert result["tier"] == "similar"
+    assert result["real_probability"] == 0.9
+    assert result["duration_seconds"] == 600.0
+    assert result["frames_analyzed"] == 4
+    assert result["decode_ms"] == 250.0
+    assert stored["duration_seconds"] == 12.0
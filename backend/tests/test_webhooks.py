@@ -0,0 +1,45 @@
+"""
+Sentinel AI - Webhook Tests
+The AssemblyAI webhook only accepts callbacks carrying the shared secret.
+"""
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import webhooks
+from app.config import settings
+from app.utils.transcripts import WEBHOOK_AUTH_HEADER
+
+
+def _webhook_client() -> TestClient:
+    app = FastAPI()
+    app.include_router(webhooks.router, prefix="/webhooks")
+    return TestClient(app)
+
+
+def test_route_not_registered_without_secret(client):
+    assert not settings.assemblyai_webhooks_enabled
+    response = client.post("/webhooks/assemblyai", json={"transcript_id": "t1"})
+    assert response.status_code == 404
+
+
+def test_rejects_callbacks_without_configured_secret():
+    tracker = mock.Mock(notify=mock.AsyncMock())
+    with mock.patch.object(settings, "assemblyai_webhook_secret", None), \
+            mock.patch.object(webhooks, "get_transcript_tracker", return_value=tracker):
+        response = _webhook_client().post("/webhooks/assemblyai", json={"transcript_id": "t1"})
+    assert response.status_code == 401
+    tracker.notify.assert_not_called()
+
+
+def test_requires_matching_secret():
+    tracker = mock.Mock(notify=mock.AsyncMock())
+    with mock.patch.object(settings, "assemblyai_webhook_secret", "s3cret"), \
+            mock.patch.object(webhooks, "get_transcript_tracker", return_value=tracker):
+        client = _webhook_client()
+        wrong = client.post("/webhooks/assemblyai", json={"transcript_id": "t1"}, headers={WEBHOOK_AUTH_HEADER: "nope"})
+        right = client.post("/webhooks/assemblyai", json={"transcript_id": "t1"}, headers={WEBHOOK_AUTH_HEADER: "s3cret"})
+    assert wrong.status_code == 401
+    assert right.status_code == 200
+    tracker.notify.assert_awaited_once_with("t1")